@@ -5,30 +5,25 @@ from openpyxl import load_workbook
 import os
 from datetime import datetime
 
+import racine_depot  # noqa: F401  (racine du dépôt dans sys.path)
+from xlsx_loader import read_excel_cached
+from doublons_multicles import COLONNES_TOUTES, TYPES_PRECOMPTES, analyser_doublons, sans_doublons
+from controle_totaux import FEUILLE_CONTROLE, controles_de_feuilles, feuille_controle
+
 # Chemin du fichier
 fichier_entree = "precomptes_mupol.xlsx"
 # Générer un nom de fichier avec horodatage
 fichier_sortie = f"precomptes_mupol_traite_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
 
 print(f"Lecture du fichier {fichier_entree}...")
-# Lire le fichier Excel sans forcer les types (pour gérer les valeurs invalides)
-df_original = pd.read_excel(fichier_entree)
+# Lire seulement les 4 colonnes utilisées, typées à la lecture (TYPES_PRECOMPTES):
+# NO_MATRICULE et MT_MENSUALITE en numérique (valeurs invalides -> NaN), RECUP_NOM_AGENT en texte
+print("\nNettoyage et conversion des types de données...")
+df_original = read_excel_cached(fichier_entree, usecols=COLONNES_TOUTES, dtype=TYPES_PRECOMPTES)
 
 # Ajouter une colonne avec le numéro de ligne d'origine (en tenant compte de l'en-tête Excel)
 df_original['LIGNE_ORIGINE'] = range(2, len(df_original) + 2)
 
-# Nettoyer et convertir les types de données
-print("\nNettoyage et conversion des types de données...")
-
-# NO_MATRICULE : convertir en numérique
-df_original['NO_MATRICULE'] = pd.to_numeric(df_original['NO_MATRICULE'], errors='coerce')
-
-# RECUP_NOM_AGENT : s'assurer que c'est du texte
-df_original['RECUP_NOM_AGENT(NO_MATRICULE)'] = df_original['RECUP_NOM_AGENT(NO_MATRICULE)'].astype(str)
-
-# MT_MENSUALITE : convertir en numérique
-df_original['MT_MENSUALITE'] = pd.to_numeric(df_original['MT_MENSUALITE'], errors='coerce')
-
 # NOMBRE_AYANTS_DROIT : Garder les valeurs telles quelles (ne pas convertir pour préserver "Montant invalide" etc.)
 # Mais créer une version numérique pour les calculs si nécessaire
 df_original['NOMBRE_AYANTS_DROIT_NUM'] = pd.to_numeric(df_original['NOMBRE_AYANTS_DROIT'], errors='coerce')
@@ -41,7 +36,7 @@ print(df_original.dtypes)
 print(f"\nLignes avec 'Montant invalide' ou texte dans NOMBRE_AYANTS_DROIT : {df_original['NOMBRE_AYANTS_DROIT'].apply(lambda x: isinstance(x, str) and not str(x).replace('.','').replace('-','').isdigit()).sum()}")
 
 # Colonnes à vérifier pour les doublons complets
-colonnes_toutes = ['NO_MATRICULE', 'RECUP_NOM_AGENT(NO_MATRICULE)', 'MT_MENSUALITE', 'NOMBRE_AYANTS_DROIT']
+colonnes_toutes = COLONNES_TOUTES
 
 print("\nRecherche des doublons complets...")
 # Ne pas exclure de lignes - garder TOUTES les lignes y compris les totaux
@@ -52,7 +47,8 @@ print(f"Lignes analysées : {len(df_valides)}")
 
 # Trouver les doublons complets (garder toutes les occurrences)
 # dropna=False permet de ne pas considérer les NaN comme égaux
-mask_doublons = df_valides.duplicated(subset=colonnes_toutes, keep=False)
+resultats = analyser_doublons(df_valides, {'COMPLETS': colonnes_toutes})
+mask_doublons = resultats['COMPLETS']['doublon']
 df_doublons = df_valides[mask_doublons].copy()
 df_doublons = df_doublons.sort_values(by=colonnes_toutes)
 
@@ -63,7 +59,7 @@ df_doublons_export = df_doublons[cols_doublons]
 print(f"Doublons trouvés : {len(df_doublons)} lignes")
 
 # Créer le dataframe sans doublons (garder la première occurrence)
-df_sans_doublons = df_valides.drop_duplicates(subset=colonnes_toutes, keep='first').copy()
+df_sans_doublons = df_valides[sans_doublons(resultats, 'COMPLETS')].copy()
 # Sélectionner seulement les colonnes principales (sans NOMBRE_AYANTS_DROIT_NUM)
 df_sans_doublons_export = df_sans_doublons[colonnes_toutes]
 print(f"Lignes après suppression des doublons : {len(df_sans_doublons)}")
@@ -90,6 +86,13 @@ with pd.ExcelWriter(fichier_sortie, engine='openpyxl') as writer:
     df_sans_doublons_export.to_excel(writer, sheet_name='SANS_DOUBLONS', index=False)
     print(f"✓ Feuille 'SANS_DOUBLONS' créée ({len(df_sans_doublons)} lignes)")
 
+    # Feuille 4 : Totaux de contrôle des 3 feuilles (comparables sans relire les données, verifier_totaux.py)
+    controles = controles_de_feuilles({'DONNEES_INITIALES': df_original[colonnes_toutes],
+                                       'DOUBLONS': df_doublons_export, 'SANS_DOUBLONS': df_sans_doublons_export},
+                                      colonnes=['MT_MENSUALITE', 'NOMBRE_AYANTS_DROIT'], colonne_matricule='NO_MATRICULE')
+    feuille_controle(controles).to_excel(writer, sheet_name=FEUILLE_CONTROLE, index=False)
+    print(f"✓ Feuille '{FEUILLE_CONTROLE}' créée (totaux de contrôle)")
+
 # Ajuster la largeur des colonnes pour une meilleure lisibilité
 print("\nAjustement de la largeur des colonnes...")
 wb = load_workbook(fichier_sortie)
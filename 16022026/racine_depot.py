@@ -0,0 +1,12 @@
+"""
+Met la racine du dépôt dans sys.path, pour que les scripts de ce dossier
+importent les modules partagés (xlsx_loader, doublons_multicles,
+controle_totaux...): import racine_depot  # noqa: F401
+"""
+
+import os
+import sys
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RACINE not in sys.path:
+    sys.path.insert(0, RACINE)
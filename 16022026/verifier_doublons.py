@@ -1,8 +1,24 @@
-import pandas as pd
 import os
+import sys
+
+import racine_depot  # noqa: F401  (racine du dépôt dans sys.path)
+from xlsx_loader import read_excel_cached
+from doublons_multicles import COLONNES_PARTIELLES, COLONNES_TOUTES, analyser_doublons, doublons_seulement
 
 # Chemin du fichier
 fichier = "precomptes_mupol.xlsx"
+# Lignes affichées au maximum par tableau (0 = toutes), premier argument optionnel;
+# le détail complet est toujours dans les fichiers exportés
+max_affichage = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+
+def afficher(tableau):
+    if max_affichage and len(tableau) > max_affichage:
+        print(tableau.head(max_affichage).to_string(index=True))
+        print(f"... {len(tableau) - max_affichage} lignes de plus dans le fichier exporté")
+    else:
+        print(tableau.to_string(index=True))
+
 
 # Vérifier si le fichier existe
 if not os.path.exists(fichier):
@@ -11,14 +27,16 @@ if not os.path.exists(fichier):
 
 # Lire le fichier Excel
 print(f"Lecture du fichier {fichier}...")
-df = pd.read_excel(fichier)
+# Toutes les colonnes, sans forcer les types: les fichiers exportés gardent les lignes complètes
+# et les matricules tels quels
+df = read_excel_cached(fichier)
 
 print(f"\nNombre total de lignes : {len(df)}")
 print(f"\nColonnes disponibles : {list(df.columns)}")
 
 # Colonnes à vérifier
-colonnes_toutes = ['NO_MATRICULE', 'RECUP_NOM_AGENT(NO_MATRICULE)', 'MT_MENSUALITE', 'NOMBRE_AYANTS_DROIT']
-colonnes_partielles = ['NO_MATRICULE', 'MT_MENSUALITE', 'NOMBRE_AYANTS_DROIT']
+colonnes_toutes = COLONNES_TOUTES
+colonnes_partielles = COLONNES_PARTIELLES
 
 # Vérifier que les colonnes existent
 colonnes_manquantes = [col for col in colonnes_toutes if col not in df.columns]
@@ -26,18 +44,21 @@ if colonnes_manquantes:
     print(f"\nATTENTION : Colonnes manquantes : {colonnes_manquantes}")
     exit()
 
+# Doublons complets et partiels en une seule passe (doublons_multicles)
+resultats = analyser_doublons(df, {'COMPLETS': colonnes_toutes, 'PARTIELS': colonnes_partielles})
+
 print("\n" + "="*80)
 print("1. DOUBLONS COMPLETS (4 colonnes identiques)")
 print("="*80)
 
 # Trouver les doublons complets (les 4 colonnes)
-doublons_complets = df[df.duplicated(subset=colonnes_toutes, keep=False)]
+doublons_complets = df[resultats['COMPLETS']['doublon']]
 
 if len(doublons_complets) > 0:
     print(f"\n{len(doublons_complets)} lignes avec doublons complets trouvées :")
     print("\nDoublons complets (triés par NO_MATRICULE) :")
     doublons_complets_sorted = doublons_complets.sort_values(by=colonnes_toutes)
-    print(doublons_complets_sorted[colonnes_toutes].to_string(index=True))
+    afficher(doublons_complets_sorted[colonnes_toutes])
     
     # Sauvegarder dans un fichier Excel
     doublons_complets_sorted.to_excel("doublons_complets.xlsx", index=False)
@@ -50,7 +71,7 @@ print("2. DOUBLONS PARTIELS (3 colonnes identiques, RECUP_NOM_AGENT différent)"
 print("="*80)
 
 # Trouver les doublons partiels (les 3 colonnes sans RECUP_NOM_AGENT)
-doublons_partiels = df[df.duplicated(subset=colonnes_partielles, keep=False)]
+doublons_partiels = df[resultats['PARTIELS']['doublon']]
 
 if len(doublons_partiels) > 0:
     print(f"\n{len(doublons_partiels)} lignes avec doublons partiels trouvées :")
@@ -58,12 +79,12 @@ if len(doublons_partiels) > 0:
     # Exclure les doublons complets pour ne montrer que les partiels
     # (ceux où NO_MATRICULE, MT_MENSUALITE, NOMBRE_AYANTS_DROIT sont identiques
     # mais RECUP_NOM_AGENT est différent)
-    doublons_partiels_only = doublons_partiels[~doublons_partiels.duplicated(subset=colonnes_toutes, keep=False)]
+    doublons_partiels_only = df[doublons_seulement(resultats, 'PARTIELS', 'COMPLETS')]
     
     if len(doublons_partiels_only) > 0:
         print(f"\nDoublons partiels uniquement (sans les doublons complets) : {len(doublons_partiels_only)} lignes")
         doublons_partiels_sorted = doublons_partiels_only.sort_values(by=colonnes_partielles)
-        print(doublons_partiels_sorted[colonnes_toutes].to_string(index=True))
+        afficher(doublons_partiels_sorted[colonnes_toutes])
         
         # Sauvegarder dans un fichier Excel
         doublons_partiels_sorted.to_excel("doublons_partiels.xlsx", index=False)
@@ -74,7 +95,7 @@ if len(doublons_partiels) > 0:
     # Afficher tous les doublons partiels (y compris complets)
     print(f"\n\nTOUS les doublons partiels (y compris complets) : {len(doublons_partiels)} lignes")
     doublons_partiels_all_sorted = doublons_partiels.sort_values(by=colonnes_partielles)
-    print(doublons_partiels_all_sorted[colonnes_toutes].to_string(index=True))
+    afficher(doublons_partiels_all_sorted[colonnes_toutes])
     
     # Sauvegarder dans un fichier Excel
     doublons_partiels_all_sorted.to_excel("tous_doublons_partiels.xlsx", index=False)
@@ -1,31 +1,86 @@
+import glob
+import os
+import sys
+
 import pandas as pd
 
-# Lire les fichiers
-df_orig = pd.read_excel('precomptes_mupol.xlsx')
-df_traite = pd.read_excel('precomptes_mupol_traite_20260216_144708.xlsx', sheet_name='SANS_DOUBLONS')
-
-print('='*80)
-print('FICHIER ORIGINAL (precomptes_mupol.xlsx):')
-print('='*80)
-print(f'Lignes totales: {len(df_orig)}')
-print(f'Total MT_MENSUALITE: {df_orig["MT_MENSUALITE"].sum():.0f}')
-print(f'Total NOMBRE_AYANTS_DROIT (numérique): {pd.to_numeric(df_orig["NOMBRE_AYANTS_DROIT"], errors="coerce").sum():.0f}')
-
-print('\n' + '='*80)
-print('FICHIER SANS_DOUBLONS:')
-print('='*80)
-print(f'Lignes: {len(df_traite)}')
-print(f'Total MT_MENSUALITE: {df_traite["MT_MENSUALITE"].sum():.0f}')
-print(f'Total NOMBRE_AYANTS_DROIT (numérique): {pd.to_numeric(df_traite["NOMBRE_AYANTS_DROIT"], errors="coerce").sum():.0f}')
-
-print('\n' + '='*80)
-print('DIFFÉRENCE:')
-print('='*80)
-print(f'Lignes supprimées: {len(df_orig) - len(df_traite)}')
-print(f'MT_MENSUALITE perdue: {df_orig["MT_MENSUALITE"].sum() - df_traite["MT_MENSUALITE"].sum():.0f}')
-print(f'NOMBRE_AYANTS_DROIT perdu: {pd.to_numeric(df_orig["NOMBRE_AYANTS_DROIT"], errors="coerce").sum() - pd.to_numeric(df_traite["NOMBRE_AYANTS_DROIT"], errors="coerce").sum():.0f}')
-
-print('\n' + '='*80)
-print('DERNIÈRES LIGNES DU FICHIER SANS_DOUBLONS:')
-print('='*80)
-print(df_traite.tail(5)[['NO_MATRICULE', 'RECUP_NOM_AGENT(NO_MATRICULE)', 'MT_MENSUALITE', 'NOMBRE_AYANTS_DROIT']])
+import racine_depot  # noqa: F401  (racine du dépôt dans sys.path)
+from xlsx_loader import read_excel_cached
+from controle_totaux import afficher_comparaison, comparer_controles, lire_controle
+
+MOTIF_TRAITE = 'precomptes_mupol_traite_*.xlsx'
+
+
+def dernier_fichier_traite(motif=MOTIF_TRAITE):
+    """Fichier traité le plus récent (ajouter_feuilles_doublons.py horodate ses sorties)."""
+    fichiers = glob.glob(motif)
+    return max(fichiers, key=os.path.getmtime) if fichiers else None
+
+
+def _feuilles_controlees(fichier):
+    """Feuilles décrites par la feuille CONTROLE du classeur, None s'il n'en a pas."""
+    try:
+        return set(lire_controle(fichier)['FEUILLE'])
+    except KeyError:
+        return None
+
+
+def verifier_totaux(fichier_original='precomptes_mupol.xlsx', fichier_traite=None, feuille='SANS_DOUBLONS'):
+    """Compare les lignes et les totaux (MT_MENSUALITE, NOMBRE_AYANTS_DROIT) avant/après suppression des doublons.
+
+    Si le fichier traité a une feuille CONTROLE, seules les feuilles CONTROLE sont lues: celle
+    du fichier original s'il en a une, sinon la ligne DONNEES_INITIALES du fichier traité.
+    """
+    fichier_traite = fichier_traite or dernier_fichier_traite()
+    if fichier_traite is None:
+        print(f"❌ Aucun fichier traité ({MOTIF_TRAITE}) trouvé: le passer en argument.")
+        return
+    controlees = _feuilles_controlees(fichier_traite)
+    if controlees is not None and feuille in controlees:
+        if _feuilles_controlees(fichier_original) is not None:
+            comparaison = comparer_controles(fichier_original, fichier_traite, feuille_b=feuille)
+            origine = fichier_original
+        else:
+            comparaison = comparer_controles(fichier_traite, fichier_traite, 'DONNEES_INITIALES', feuille)
+            origine = f'{fichier_traite} [DONNEES_INITIALES]'
+        print('='*80)
+        print(f'TOTAUX DE CONTRÔLE: ORIGINAL -> {feuille}')
+        print('='*80)
+        afficher_comparaison(comparaison, origine, f'{fichier_traite} [{feuille}]')
+        return comparaison
+
+    # Pas de feuille CONTROLE: relire les fichiers (seulement les colonnes utilisées)
+    colonnes = ['NO_MATRICULE', 'RECUP_NOM_AGENT(NO_MATRICULE)', 'MT_MENSUALITE', 'NOMBRE_AYANTS_DROIT']
+    df_orig = read_excel_cached(fichier_original, usecols=colonnes)
+    df_traite = read_excel_cached(fichier_traite, sheet_name=feuille, usecols=colonnes)
+
+    print('='*80)
+    print(f'FICHIER ORIGINAL ({fichier_original}):')
+    print('='*80)
+    print(f'Lignes totales: {len(df_orig)}')
+    print(f'Total MT_MENSUALITE: {df_orig["MT_MENSUALITE"].sum():.0f}')
+    print(f'Total NOMBRE_AYANTS_DROIT (numérique): {pd.to_numeric(df_orig["NOMBRE_AYANTS_DROIT"], errors="coerce").sum():.0f}')
+
+    print('\n' + '='*80)
+    print(f'FICHIER {feuille}:')
+    print('='*80)
+    print(f'Lignes: {len(df_traite)}')
+    print(f'Total MT_MENSUALITE: {df_traite["MT_MENSUALITE"].sum():.0f}')
+    print(f'Total NOMBRE_AYANTS_DROIT (numérique): {pd.to_numeric(df_traite["NOMBRE_AYANTS_DROIT"], errors="coerce").sum():.0f}')
+
+    print('\n' + '='*80)
+    print('DIFFÉRENCE:')
+    print('='*80)
+    print(f'Lignes supprimées: {len(df_orig) - len(df_traite)}')
+    print(f'MT_MENSUALITE perdue: {df_orig["MT_MENSUALITE"].sum() - df_traite["MT_MENSUALITE"].sum():.0f}')
+    print(f'NOMBRE_AYANTS_DROIT perdu: {pd.to_numeric(df_orig["NOMBRE_AYANTS_DROIT"], errors="coerce").sum() - pd.to_numeric(df_traite["NOMBRE_AYANTS_DROIT"], errors="coerce").sum():.0f}')
+
+    print('\n' + '='*80)
+    print(f'DERNIÈRES LIGNES DU FICHIER {feuille}:')
+    print('='*80)
+    print(df_traite.tail(5)[colonnes])
+
+
+if __name__ == "__main__":
+    # Permet de passer le fichier original et le fichier traité en arguments
+    verifier_totaux(*sys.argv[1:3])
@@ -1,6 +1,57 @@
-import pandas as pd
 import sys
 
+import pandas as pd
+
+import racine_depot  # noqa: F401  (racine du dépôt dans sys.path)
+from xlsx_loader import read_excel_cached
+from doublons_multicles import analyser_doublons, doublons_seulement
+from controle_totaux import FEUILLE_CONTROLE, controles_de_feuilles, feuille_controle
+
+
+def enregistrer_avec_controle(df_entree, df_sortie, fichier_sortie, colonnes, nom_colonne):
+    """Écrit df_sortie (Sheet1) et une feuille CONTROLE: totaux du fichier lu (ENTREE) et du fichier écrit."""
+    controles = controles_de_feuilles({'ENTREE': df_entree, 'Sheet1': df_sortie}, colonnes=colonnes,
+                                      colonne_matricule=nom_colonne)
+    with pd.ExcelWriter(fichier_sortie) as writer:
+        df_sortie.to_excel(writer, sheet_name='Sheet1', index=False)
+        feuille_controle(controles).to_excel(writer, sheet_name=FEUILLE_CONTROLE, index=False)
+
+def trouver_vrais_doublons(df, nom_colonne, colonnes_a_comparer):
+    """
+    Trouve les vrais doublons (lignes identiques sur colonnes_a_comparer) parmi les
+    lignes dont le matricule apparaît plusieurs fois. Les deux jeux de clés (matricule
+    seul, matricule et toutes les colonnes) sont analysés en une passe par doublons_multicles.
+    
+    Returns:
+        tuple: (index des lignes à supprimer,
+                Series des ORDRE supprimés ('3, 7') indexée par ligne conservée,
+                DataFrame du détail: matricule, nb_occurrences, ligne_conservee, lignes_supprimees,
+                nombre de faux doublons: lignes sans ligne identique malgré un matricule répété)
+    """
+    analyse = analyser_doublons(df, {'MATRICULE': [nom_colonne], 'LIGNE_COMPLETE': colonnes_a_comparer},
+                                lignes=df[nom_colonne].notna())
+    ligne = analyse['LIGNE_COMPLETE']
+    conservees = (ligne['doublon'] & (ligne['occurrence'] == 1)).to_numpy()
+    supprimees = (ligne['occurrence'] > 1).to_numpy()
+    
+    ordres = df['ORDRE'][supprimees].astype('int64').astype(str)
+    ordres_par_groupe = ordres.groupby(ligne['groupe'][supprimees].to_numpy(), sort=False).agg(', '.join)
+    doublons_supprimes = pd.Series(ordres_par_groupe.reindex(ligne['groupe'][conservees].to_numpy()).to_numpy(),
+                                   index=df.index[conservees])
+    
+    # Ordre du détail: matricules par première apparition, puis lignes conservées dans l'ordre du fichier
+    details = pd.DataFrame({
+        'matricule': df[nom_colonne][conservees].to_numpy(),
+        'nb_occurrences': ligne['nb'][conservees].to_numpy(),
+        'ligne_conservee': df['ORDRE'][conservees].astype('int64').to_numpy(),
+        'lignes_supprimees': doublons_supprimes.to_numpy(),
+        '_tri': analyse['MATRICULE']['groupe'][conservees].to_numpy(),
+    })
+    details = details.sort_values('_tri', kind='stable').drop(columns='_tri').reset_index(drop=True)
+    nb_faux_doublons = int(doublons_seulement(analyse, 'MATRICULE', 'LIGNE_COMPLETE').sum())
+    return df.index[supprimees], doublons_supprimes, details, nb_faux_doublons
+
+
 def supprimer_doublons_adherents(fichier_excel='ADHERENTS_JAN2026.xlsx', nom_colonne='MATRICULE'):
     """
     Supprime les doublons exacts dans un fichier Excel ADHERENTS.
@@ -14,7 +65,7 @@ def supprimer_doublons_adherents(fichier_excel='ADHERENTS_JAN2026.xlsx', nom_col
     try:
         # Lire le fichier Excel
         print(f"Lecture du fichier: {fichier_excel}")
-        df = pd.read_excel(fichier_excel)
+        df = read_excel_cached(fichier_excel)
         
         # Convertir les colonnes numériques en nombres
         colonnes_numeriques = ['AYANTS_DROIT', 'MENSUALITE', 'MENSUALITEE', 'AYANT_DROIT']
@@ -47,84 +98,34 @@ def supprimer_doublons_adherents(fichier_excel='ADHERENTS_JAN2026.xlsx', nom_col
         df['DOUBLONS_SUPPRIMES'] = ''
         
         # Identifier les doublons basés sur le MATRICULE uniquement
-        df_non_null = df[df[nom_colonne].notna()].copy()
-        matricules_doublons = df_non_null[df_non_null[nom_colonne].duplicated(keep=False)][nom_colonne].unique()
+        df_non_null = df[df[nom_colonne].notna()]
+        nb_matricules_doublons = df_non_null[nom_colonne][df_non_null[nom_colonne].duplicated(keep=False)].nunique()
         
         print(f"\n🔍 Analyse des doublons potentiels...")
-        print(f"  - Nombre de matricules ayant plusieurs occurrences: {len(matricules_doublons)}")
+        print(f"  - Nombre de matricules ayant plusieurs occurrences: {nb_matricules_doublons}")
         
-        # Liste pour stocker les indices des lignes à supprimer
-        indices_a_supprimer = []
+        # Comparer toutes les colonnes SAUF 'DOUBLONS_SUPPRIMES' et 'ORDRE'
+        colonnes_a_comparer = [col for col in df.columns if col not in ['DOUBLONS_SUPPRIMES', 'ORDRE']]
+        indices_a_supprimer, doublons_supprimes, details_doublons, nb_faux_doublons = trouver_vrais_doublons(
+            df, nom_colonne, colonnes_a_comparer)
+        nb_vrais_doublons = len(indices_a_supprimer)
         
-        # Statistiques
-        nb_vrais_doublons = 0
-        nb_faux_doublons = 0
-        details_doublons = []
-        
-        # Pour chaque matricule en doublon
-        for matricule in matricules_doublons:
-            # Obtenir toutes les lignes avec ce matricule
-            lignes_matricule = df[df[nom_colonne] == matricule].copy()
-            
-            if len(lignes_matricule) < 2:
-                continue
-            
-            # Comparer toutes les colonnes SAUF 'DOUBLONS_SUPPRIMES' et 'ORDRE'
-            colonnes_a_comparer = [col for col in df.columns if col not in ['DOUBLONS_SUPPRIMES', 'ORDRE']]
-            
-            # Grouper les lignes identiques
-            # On utilise toutes les colonnes pour détecter si c'est un vrai doublon
-            lignes_matricule['groupe_hash'] = lignes_matricule[colonnes_a_comparer].apply(
-                lambda row: hash(tuple(str(x) for x in row)), axis=1
-            )
-            
-            # Pour chaque groupe de lignes identiques
-            groupes = lignes_matricule.groupby('groupe_hash')
-            
-            for groupe_hash, groupe_lignes in groupes:
-                if len(groupe_lignes) > 1:
-                    # C'est un vrai doublon (toutes les colonnes sont identiques)
-                    nb_vrais_doublons += len(groupe_lignes) - 1
-                    
-                    # Garder la première ligne, supprimer les autres
-                    indices_groupe = groupe_lignes.index.tolist()
-                    premiere_ligne_idx = indices_groupe[0]
-                    lignes_a_supprimer = indices_groupe[1:]
-                    
-                    # Récupérer les numéros ORDRE des lignes à supprimer
-                    ordres_supprimes = [str(int(df.loc[idx, 'ORDRE'])) for idx in lignes_a_supprimer]
-                    ordres_str = ', '.join(ordres_supprimes)
-                    
-                    # Mettre à jour la colonne DOUBLONS_SUPPRIMES de la ligne conservée
-                    df.at[premiere_ligne_idx, 'DOUBLONS_SUPPRIMES'] = ordres_str
-                    
-                    # Ajouter les indices à la liste de suppression
-                    indices_a_supprimer.extend(lignes_a_supprimer)
-                    
-                    # Détail pour l'affichage
-                    details_doublons.append({
-                        'matricule': matricule,
-                        'nb_occurrences': len(groupe_lignes),
-                        'ligne_conservee': int(df.loc[premiere_ligne_idx, 'ORDRE']),
-                        'lignes_supprimees': ordres_supprimes
-                    })
-                else:
-                    # Même matricule mais données différentes (faux doublon)
-                    nb_faux_doublons += 1
+        # Mettre à jour la colonne DOUBLONS_SUPPRIMES des lignes conservées
+        df.loc[doublons_supprimes.index, 'DOUBLONS_SUPPRIMES'] = doublons_supprimes
         
         # Supprimer les lignes en doublon
-        if indices_a_supprimer:
+        if len(indices_a_supprimer):
             print(f"\n📊 Résultats de l'analyse:")
             print(f"  - Vrais doublons trouvés (données identiques): {nb_vrais_doublons}")
             print(f"  - Faux doublons (même matricule, données différentes): {nb_faux_doublons}")
             print(f"  - Lignes à supprimer: {len(indices_a_supprimer)}")
             
             print(f"\n📋 Détail des doublons supprimés:")
-            for detail in details_doublons:
-                print(f"  - Matricule '{detail['matricule']}':")
-                print(f"    • {detail['nb_occurrences']} occurrences trouvées")
-                print(f"    • Ligne conservée: ORDRE {detail['ligne_conservee']}")
-                print(f"    • Lignes supprimées: ORDRE {', '.join(detail['lignes_supprimees'])}")
+            for detail in details_doublons.itertuples(index=False):
+                print(f"  - Matricule '{detail.matricule}':")
+                print(f"    • {detail.nb_occurrences} occurrences trouvées")
+                print(f"    • Ligne conservée: ORDRE {detail.ligne_conservee}")
+                print(f"    • Lignes supprimées: ORDRE {detail.lignes_supprimees}")
             
             # Supprimer les lignes
             df_nettoye = df.drop(indices_a_supprimer)
@@ -136,14 +137,13 @@ def supprimer_doublons_adherents(fichier_excel='ADHERENTS_JAN2026.xlsx', nom_col
             
             # Sauvegarder le fichier nettoyé
             fichier_sortie = fichier_excel.replace('.xlsx', '_nettoye.xlsx')
-            df_nettoye.to_excel(fichier_sortie, index=False)
+            enregistrer_avec_controle(df, df_nettoye, fichier_sortie, colonnes_a_comparer, nom_colonne)
             print(f"\n💾 Fichier nettoyé sauvegardé: {fichier_sortie}")
             print(f"   La colonne 'DOUBLONS_SUPPRIMES' contient les numéros ORDRE des lignes supprimées")
             
             # Créer un rapport détaillé des suppressions
-            if details_doublons:
-                rapport_df = pd.DataFrame(details_doublons)
-                rapport_df['lignes_supprimees'] = rapport_df['lignes_supprimees'].apply(lambda x: ', '.join(x))
+            if len(details_doublons):
+                rapport_df = details_doublons
                 fichier_rapport = fichier_excel.replace('.xlsx', '_rapport_suppressions.xlsx')
                 rapport_df.to_excel(fichier_rapport, index=False)
                 print(f"   Rapport détaillé: {fichier_rapport}")
@@ -158,7 +158,7 @@ def supprimer_doublons_adherents(fichier_excel='ADHERENTS_JAN2026.xlsx', nom_col
             
             # Sauvegarder quand même avec la colonne DOUBLONS_SUPPRIMES (vide)
             fichier_sortie = fichier_excel.replace('.xlsx', '_nettoye.xlsx')
-            df.to_excel(fichier_sortie, index=False)
+            enregistrer_avec_controle(df, df, fichier_sortie, colonnes_a_comparer, nom_colonne)
             print(f"\n💾 Fichier sauvegardé avec colonne 'DOUBLONS_SUPPRIMES': {fichier_sortie}")
             
             return True
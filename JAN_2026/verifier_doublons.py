@@ -1,18 +1,28 @@
-import pandas as pd
 import sys
 
-def verifier_doublons(fichier_excel, nom_colonne='col'):
+import pandas as pd
+
+import racine_depot  # noqa: F401  (racine du dépôt dans sys.path)
+from xlsx_loader import read_excel_cached
+from doublons_multicles import analyser_doublons
+
+MAX_AFFICHAGE = 20
+
+
+def verifier_doublons(fichier_excel, nom_colonne='col', max_affichage=MAX_AFFICHAGE):
     """
     Vérifie s'il y a des doublons dans une colonne spécifique d'un fichier Excel.
     
     Args:
         fichier_excel (str): Chemin vers le fichier Excel
         nom_colonne (str): Nom de la colonne à vérifier (par défaut 'col')
+        max_affichage (int): Nombre maximal de valeurs et de lignes affichées à l'écran
+            (0 = toutes); le détail complet est toujours dans le fichier exporté
     """
     try:
         # Lire le fichier Excel
         print(f"Lecture du fichier: {fichier_excel}")
-        df = pd.read_excel(fichier_excel)
+        df = read_excel_cached(fichier_excel)
         
         # Vérifier si la colonne existe
         if nom_colonne not in df.columns:
@@ -21,7 +31,7 @@ def verifier_doublons(fichier_excel, nom_colonne='col'):
             return False
         
         # Vérifier les doublons
-        doublons = df[df[nom_colonne].duplicated(keep=False)]
+        doublons = df[analyser_doublons(df, {nom_colonne: [nom_colonne]})[nom_colonne]['doublon']]
         
         if doublons.empty:
             print(f"✅ Aucun doublon trouvé dans la colonne '{nom_colonne}'!")
@@ -29,21 +39,33 @@ def verifier_doublons(fichier_excel, nom_colonne='col'):
             return True
         else:
             nb_doublons = len(doublons)
-            valeurs_doublons = df[nom_colonne][df[nom_colonne].duplicated(keep=False)].unique()
+            # Occurrences de chaque valeur en une passe, dans l'ordre de première apparition
+            occurrences = doublons.groupby(nom_colonne, sort=False, dropna=False).size()
             
             print(f"❌ {nb_doublons} doublons trouvés dans la colonne '{nom_colonne}'!")
-            print(f"\nValeurs en doublon:")
-            for valeur in valeurs_doublons:
-                count = (df[nom_colonne] == valeur).sum()
+            if max_affichage and len(occurrences) > max_affichage:
+                affiche = occurrences.sort_values(ascending=False, kind='stable').head(max_affichage)
+                print(f"\nValeurs en doublon (les {max_affichage} plus fréquentes sur {len(occurrences)}):")
+            else:
+                affiche = occurrences
+                print("\nValeurs en doublon:")
+            for valeur, count in affiche.items():
                 print(f"  - '{valeur}': {count} occurrences")
             
-            print(f"\nDétail des lignes avec doublons:")
-            print(doublons[[nom_colonne]].to_string())
+            if max_affichage and nb_doublons > max_affichage:
+                print(f"\nDétail des lignes avec doublons ({max_affichage} premières sur {nb_doublons}):")
+                print(doublons[[nom_colonne]].head(max_affichage).to_string())
+            else:
+                print("\nDétail des lignes avec doublons:")
+                print(doublons[[nom_colonne]].to_string())
             
-            # Sauvegarder les doublons dans un fichier séparé
+            # Sauvegarder les doublons dans un fichier séparé (détail complet + feuille RESUME)
             fichier_sortie = fichier_excel.replace('.xlsx', '_doublons.xlsx')
-            doublons.to_excel(fichier_sortie, index=False)
+            with pd.ExcelWriter(fichier_sortie) as writer:
+                doublons.to_excel(writer, sheet_name='Sheet1', index=False)
+                occurrences.rename('Occurrences').reset_index().to_excel(writer, sheet_name='RESUME', index=False)
             print(f"\n📄 Les doublons ont été exportés vers: {fichier_sortie}")
+            print("   Feuille 'RESUME': nombre d'occurrences de chaque valeur en doublon")
             
             return False
             
@@ -58,15 +80,18 @@ if __name__ == "__main__":
     # Chemin par défaut
     fichier = "resultat_jan_2026.xlsx"
     colonne = "col"
+    max_affichage = MAX_AFFICHAGE
     
-    # Permet de passer le fichier et la colonne en arguments
+    # Permet de passer le fichier, la colonne et le nombre de valeurs affichées en arguments
     if len(sys.argv) > 1:
         fichier = sys.argv[1]
     if len(sys.argv) > 2:
         colonne = sys.argv[2]
+    if len(sys.argv) > 3:
+        max_affichage = int(sys.argv[3])
     
     print("=" * 60)
     print("VÉRIFICATION DES DOUBLONS")
     print("=" * 60)
     
-    verifier_doublons(fichier, colonne)
+    verifier_doublons(fichier, colonne, max_affichage)
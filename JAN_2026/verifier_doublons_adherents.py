@@ -1,18 +1,42 @@
-import pandas as pd
 import sys
 
-def verifier_doublons_adherents(fichier_excel='ADHERENTS_JAN2026.xlsx', nom_colonne='MATRICULE'):
+import pandas as pd
+
+import racine_depot  # noqa: F401  (racine du dépôt dans sys.path)
+from xlsx_loader import read_excel_cached
+from doublons_multicles import analyser_doublons
+
+MAX_AFFICHAGE = 20
+
+
+def resume_doublons(doublons, nom_colonne):
+    """
+    Résumé des valeurs en doublon en une passe groupby, trié par valeur:
+    nombre d'occurrences et lignes Excel (index + 2) de chaque valeur.
+    """
+    lignes = pd.Series(doublons.index + 2, index=doublons.index)  # +2 car ligne 1 = en-tête, index commence à 0
+    groupes = lignes.groupby(doublons[nom_colonne], sort=True)
+    resume = pd.DataFrame({'Occurrences': groupes.size(),
+                           'Lignes_Excel': groupes.agg(lambda s: s.tolist())})
+    resume.index.name = nom_colonne
+    return resume
+
+
+def verifier_doublons_adherents(fichier_excel='ADHERENTS_JAN2026.xlsx', nom_colonne='MATRICULE',
+                                max_affichage=MAX_AFFICHAGE):
     """
     Vérifie s'il y a des doublons dans la colonne MATRICULE d'un fichier Excel ADHERENTS.
     
     Args:
         fichier_excel (str): Chemin vers le fichier Excel
         nom_colonne (str): Nom de la colonne à vérifier (par défaut 'MATRICULE')
+        max_affichage (int): Nombre maximal de valeurs détaillées à l'écran, les plus fréquentes
+            (0 = toutes); le détail complet est toujours dans le fichier exporté
     """
     try:
         # Lire le fichier Excel
         print(f"Lecture du fichier: {fichier_excel}")
-        df = pd.read_excel(fichier_excel)
+        df = read_excel_cached(fichier_excel)
         
         # Vérifier si la colonne existe
         if nom_colonne not in df.columns:
@@ -21,40 +45,47 @@ def verifier_doublons_adherents(fichier_excel='ADHERENTS_JAN2026.xlsx', nom_colo
             return False
         
         # Afficher les informations générales
-        print(f"\nInformations générales:")
+        print("\nInformations générales:")
         print(f"  - Total de lignes: {len(df)}")
         print(f"  - Valeurs non nulles dans '{nom_colonne}': {df[nom_colonne].notna().sum()}")
         print(f"  - Valeurs nulles dans '{nom_colonne}': {df[nom_colonne].isna().sum()}")
         
-        # Vérifier les doublons (en excluant les valeurs nulles)
-        df_non_null = df[df[nom_colonne].notna()]
-        doublons = df_non_null[df_non_null[nom_colonne].duplicated(keep=False)]
+        # Vérifier les doublons (en excluant les valeurs nulles), en une passe (doublons_multicles)
+        analyse = analyser_doublons(df, {nom_colonne: [nom_colonne]}, lignes=df[nom_colonne].notna())[nom_colonne]
+        doublons = df[analyse['doublon']]
         
         if doublons.empty:
             print(f"\n✅ Aucun doublon trouvé dans la colonne '{nom_colonne}'!")
             return True
         else:
             nb_doublons = len(doublons)
-            valeurs_doublons = df_non_null[nom_colonne][df_non_null[nom_colonne].duplicated(keep=False)].unique()
+            resume = resume_doublons(doublons, nom_colonne)
             
             print(f"\n❌ {nb_doublons} doublons trouvés dans la colonne '{nom_colonne}'!")
-            print(f"\nNombre de valeurs distinctes en doublon: {len(valeurs_doublons)}")
-            print(f"\nValeurs en doublon:")
+            print(f"\nNombre de valeurs distinctes en doublon: {len(resume)}")
             
-            # Trier les valeurs pour un affichage plus clair
-            for valeur in sorted(valeurs_doublons):
-                count = (df[nom_colonne] == valeur).sum()
-                indices = df[df[nom_colonne] == valeur].index.tolist()
-                lignes_excel = [idx + 2 for idx in indices]  # +2 car ligne 1 = en-tête, index commence à 0
-                print(f"  - '{valeur}': {count} occurrences (lignes Excel: {lignes_excel})")
+            # Au-delà de max_affichage valeurs, n'afficher que les plus fréquentes
+            if max_affichage and len(resume) > max_affichage:
+                affiche = resume.sort_values('Occurrences', ascending=False, kind='stable').head(max_affichage)
+                print(f"\nValeurs en doublon (les {max_affichage} plus fréquentes sur {len(resume)}):")
+            else:
+                affiche = resume
+                print("\nValeurs en doublon:")
+            
+            for valeur, ligne in affiche.iterrows():
+                print(f"  - '{valeur}': {ligne['Occurrences']} occurrences (lignes Excel: {ligne['Lignes_Excel']})")
             
-            print(f"\nDétail complet des lignes avec doublons:")
             # Afficher toutes les colonnes importantes pour les doublons
             colonnes_afficher = [col for col in df.columns if col in [nom_colonne, 'NOM', 'PRENOM', 'DATE_NAISSANCE', 'nom', 'prenom']]
+            lignes_affichees = doublons[doublons[nom_colonne].isin(affiche.index)]
+            if len(affiche) < len(resume):
+                print("\nDétail des lignes des valeurs affichées (détail complet dans le fichier exporté):")
+            else:
+                print("\nDétail complet des lignes avec doublons:")
             if colonnes_afficher:
-                print(doublons[colonnes_afficher].to_string())
+                print(lignes_affichees[colonnes_afficher].to_string())
             else:
-                print(doublons.to_string())
+                print(lignes_affichees.to_string())
             
             # Préparer le DataFrame des doublons avec les colonnes supplémentaires
             doublons_export = doublons.copy()
@@ -63,7 +94,7 @@ def verifier_doublons_adherents(fichier_excel='ADHERENTS_JAN2026.xlsx', nom_colo
             doublons_export['Ligne_Excel'] = doublons_export.index + 2  # +2 car ligne 1 = en-tête
             
             # Ajouter la colonne "Occurrence" (numéro d'occurrence pour chaque matricule)
-            doublons_export['Occurrence'] = doublons_export.groupby(nom_colonne).cumcount() + 1
+            doublons_export['Occurrence'] = analyse['occurrence'][analyse['doublon']]
             
             # Réorganiser les colonnes pour mettre les nouvelles colonnes au début après le matricule
             cols = list(doublons_export.columns)
@@ -83,9 +114,14 @@ def verifier_doublons_adherents(fichier_excel='ADHERENTS_JAN2026.xlsx', nom_colo
             
             # Sauvegarder les doublons dans un fichier séparé
             fichier_sortie = fichier_excel.replace('.xlsx', '_doublons.xlsx')
-            doublons_export.to_excel(fichier_sortie, index=False)
+            resume_export = resume.reset_index()
+            resume_export['Lignes_Excel'] = resume_export['Lignes_Excel'].map(lambda l: ', '.join(map(str, l)))
+            with pd.ExcelWriter(fichier_sortie) as writer:
+                doublons_export.to_excel(writer, sheet_name='Sheet1', index=False)
+                resume_export.to_excel(writer, sheet_name='RESUME', index=False)
             print(f"\n📄 Les doublons ont été exportés vers: {fichier_sortie}")
-            print(f"   Colonnes ajoutées: 'Occurrence' (numéro de l'occurrence), 'Ligne_Excel' (numéro de ligne dans le fichier)")
+            print("   Colonnes ajoutées: 'Occurrence' (numéro de l'occurrence), 'Ligne_Excel' (numéro de ligne dans le fichier)")
+            print("   Feuille 'RESUME': occurrences et lignes Excel de chaque valeur en doublon")
             
             return False
             
@@ -100,15 +136,18 @@ if __name__ == "__main__":
     # Chemin par défaut
     fichier = "ADHERENTS_JAN2026.xlsx"
     colonne = "MATRICULE"
+    max_affichage = MAX_AFFICHAGE
     
-    # Permet de passer le fichier et la colonne en arguments
+    # Permet de passer le fichier, la colonne et le nombre de valeurs affichées en arguments
     if len(sys.argv) > 1:
         fichier = sys.argv[1]
     if len(sys.argv) > 2:
         colonne = sys.argv[2]
+    if len(sys.argv) > 3:
+        max_affichage = int(sys.argv[3])
     
     print("=" * 70)
     print("VÉRIFICATION DES DOUBLONS - FICHIER ADHERENTS")
     print("=" * 70)
     
-    verifier_doublons_adherents(fichier, colonne)
+    verifier_doublons_adherents(fichier, colonne, max_affichage)
@@ -1,8 +1,21 @@
 """
 Script d'extraction complète du tableau avec toutes les colonnes
 Gère les lignes multiples pour une même Designation
+
+Les colonnes (noms, bords, signature de la ligne d'en-tête) sont enregistrées
+comme gabarit de mise en page par famille de documents (nom du PDF sans l'année),
+dans ~/.cache/pdf_to_excel/nomenclature_layouts.json (variable PDF_TO_EXCEL_LAYOUTS):
+les exécutions suivantes et l'édition de l'année suivante reprennent le gabarit.
+La ligne d'en-tête de chaque page est comparée à la signature du gabarit (textes
+et positions X des mots); les colonnes ne sont réapprises que sur les pages dont
+la mise en page a changé.
 """
 
+import bisect
+import json
+import os
+import tempfile
+
 import pdfplumber
 import pandas as pd
 from openpyxl import load_workbook
@@ -10,152 +23,247 @@ from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
 from openpyxl.utils import get_column_letter
 import re
 
-def extract_full_table(pdf_path):
+# Words are extracted once per page with these settings, then reused for every step
+WORD_SETTINGS = {'x_tolerance': 2, 'y_tolerance': 2}
+# Words whose tops are within this distance form one line (pdfplumber's 'text' row strategy)
+LINE_TOLERANCE = 1
+# Gabarits de mise en page par famille de documents
+LAYOUTS_VERSION = 1
+DEFAULT_LAYOUTS_PATH = os.environ.get(
+    'PDF_TO_EXCEL_LAYOUTS', os.path.join(os.path.expanduser('~'), '.cache', 'pdf_to_excel', 'nomenclature_layouts.json'))
+# Écart maximal (points) entre un mot de la ligne d'en-tête et le même mot dans la signature du gabarit
+SIGNATURE_TOLERANCE = 1.0
+MAX_LAYOUTS_PER_FAMILY = 10
+FOCUS_COLUMNS = ['N°', 'Designation', 'DCI']
+
+def group_lines(words):
+    """
+    Regroupe les mots en lignes (tops à moins de LINE_TOLERANCE), de haut en bas, mots triés par x0
+    """
+    lines = []
+    last_top = None
+    for word in sorted(words, key=lambda w: w['top']):
+        if last_top is None or word['top'] - last_top > LINE_TOLERANCE:
+            lines.append([])
+        lines[-1].append(word)
+        last_top = word['top']
+    return [sorted(line, key=lambda w: w['x0']) for line in lines]
+
+def line_text(line_words):
+    return ' '.join(w['text'] for w in line_words).lower()
+
+def detect_columns(lines):
+    """
+    Positions X des colonnes d'après la première ligne contenant 'designation', None sinon
+    """
+    for line_words in lines:
+        text = line_text(line_words)
+        if 'designation' in text or 'désignation' in text:
+            page_positions = {}
+            for word in line_words:
+                w = word['text'].strip().lower()
+                if w in ['n°', 'n', 'no', 'num'] or 'n°' in w:
+                    page_positions['N°'] = word['x0']
+                elif 'designation' in w or 'désignation' in w:
+                    page_positions['Designation'] = word['x0']
+                elif 'dci' in w:
+                    page_positions['DCI'] = word['x0']
+                elif 'dosage' in w:
+                    page_positions['Dosage'] = word['x0']
+                elif "admin" in w or "administr" in w:
+                    page_positions["Administration"] = word['x0']
+                elif 'fabricant' in w:
+                    page_positions['Fabricant'] = word['x0']
+                elif 'pght' in w:
+                    page_positions['PGHT'] = word['x0']
+                elif 'cfa' in w:
+                    page_positions['CFA'] = word['x0']
+                elif 'code' in w:
+                    page_positions['Code'] = word['x0']
+                elif 'amm' in w:
+                    page_positions['AMM'] = word['x0']
+                elif 'expiration' in w or "d'exp" in w:
+                    page_positions['Expiration'] = word['x0']
+            return dict(sorted(page_positions.items(), key=lambda x: x[1])) or None
+    return None
+
+def find_header_line(lines):
+    """
+    Index de la ligne d'en-tête (contient 'designation' et 'dci'), None si la page n'en a pas
+    """
+    for idx, line_words in enumerate(lines):
+        text = line_text(line_words)
+        if 'designation' in text and 'dci' in text:
+            return idx
+    return None
+
+def document_family(pdf_path):
+    """
+    Famille d'un document: nom du fichier sans chiffres ni ponctuation
+    ('NOMENCLATURE_NATIONALE_ANRP _ 2024.pdf' -> 'nomenclature_nationale_anrp')
+    """
+    name = os.path.splitext(os.path.basename(pdf_path))[0].lower()
+    return re.sub(r'[\W\d_]+', '_', name).strip('_')
+
+def learn_layout(header_words, page_width):
+    """
+    Gabarit appris sur une ligne d'en-tête: colonnes, bords (milieux entre x0) et signature, None sans N°/Designation/DCI
+    """
+    column_positions = detect_columns([header_words])
+    if not column_positions or not all(col in column_positions for col in FOCUS_COLUMNS):
+        return None
+    x_positions = list(column_positions.values())
+    edges = [max(0, x_positions[0] - 5)]
+    for i in range(len(x_positions) - 1):
+        edges.append((x_positions[i] + x_positions[i + 1]) / 2)
+    edges.append(page_width - 2)
+    return {
+        'columns': list(column_positions),
+        'edges': edges,
+        'signature': [[w['text'].lower(), round(w['x0'], 2)] for w in header_words],
+        'page_width': round(page_width, 2),
+    }
+
+def layout_matches(layout, header_words, page_width):
+    """
+    Vérification rapide: mêmes mots d'en-tête aux mêmes positions X (à SIGNATURE_TOLERANCE près), même largeur de page
+    """
+    signature = layout['signature']
+    if len(signature) != len(header_words) or abs(layout['page_width'] - page_width) > SIGNATURE_TOLERANCE:
+        return False
+    return all(text == w['text'].lower() and abs(x0 - w['x0']) <= SIGNATURE_TOLERANCE
+               for (text, x0), w in zip(signature, header_words))
+
+def load_layouts(path):
+    """
+    Gabarits enregistrés {famille: [gabarits]}, vide si le fichier est absent ou illisible
+    """
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get('version') != LAYOUTS_VERSION:
+        return {}
+    return data.get('families', {})
+
+def save_layouts(path, layouts):
+    """
+    Écrit les gabarits de façon atomique (fichier temporaire + os.replace)
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'version': LAYOUTS_VERSION, 'families': layouts}, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp, path)
+    except Exception:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+def split_cells(line_words, column_edges):
+    """
+    Répartit les mots d'une ligne entre les colonnes (centre du mot entre deux bords), textes joints par des espaces
+    """
+    cells = [[] for _ in range(len(column_edges) - 1)]
+    for word in line_words:
+        i = bisect.bisect_right(column_edges, (word['x0'] + word['x1']) / 2) - 1
+        if 0 <= i < len(cells):
+            cells[i].append(word['text'])
+    return [' '.join(cell) for cell in cells]
+
+def extract_full_table(pdf_path, layouts_path=DEFAULT_LAYOUTS_PATH, family=None):
     """
     Extrait le tableau complet avec des colonnes fixées par les positions de l'en-tête
+
+    Les mots de chaque page sont extraits une seule fois: ils servent à situer la ligne
+    d'en-tête, à la comparer au gabarit et à construire les lignes (mots répartis entre
+    les bords de colonnes), sans passer par page.extract_table qui les recalculait.
+    Les gabarits de la famille ``family`` (défaut: document_family) sont lus dans
+    ``layouts_path`` et les nouveaux y sont enregistrés (None: pas de persistance).
     """
     all_data = []
-    column_positions = None
-    column_names = []
-    column_edges = None
-    focus_columns = ['N°', 'Designation', 'DCI']
+    family = family or document_family(pdf_path)
+    layouts = load_layouts(layouts_path) if layouts_path else {}
+    known = layouts.setdefault(family, [])
+    layout = known[-1] if known else None
+    learned = 0
+    reused = 0
+    checked = False
+    if layout:
+        print(f"📐 Gabarit de mise en page '{family}': {len(known)} connu(s)")
     
     try:
         with pdfplumber.open(pdf_path) as pdf:
             print(f"📄 Nombre de pages: {len(pdf.pages)}")
             
             for page_num, page in enumerate(pdf.pages, start=1):
-                # Détecter l'en-tête et les positions des colonnes
-                if column_positions is None:
-                    words = page.extract_words(x_tolerance=2, y_tolerance=2)
-                    if words:
-                        lines_dict = {}
-                        for word in words:
-                            y_pos = round(word['top'])
-                            lines_dict.setdefault(y_pos, []).append(word)
-                        
-                        for y_pos, line_words in sorted(lines_dict.items()):
-                            line_text = ' '.join([w['text'] for w in line_words]).lower()
-                            if 'designation' in line_text or 'désignation' in line_text:
-                                sorted_words = sorted(line_words, key=lambda w: w['x0'])
-                                page_positions = {}
-                                for word in sorted_words:
-                                    w = word['text'].strip().lower()
-                                    if w in ['n°', 'n', 'no', 'num'] or 'n°' in w:
-                                        page_positions['N°'] = word['x0']
-                                    elif 'designation' in w or 'désignation' in w:
-                                        page_positions['Designation'] = word['x0']
-                                    elif 'dci' in w:
-                                        page_positions['DCI'] = word['x0']
-                                    elif 'dosage' in w:
-                                        page_positions['Dosage'] = word['x0']
-                                    elif "admin" in w or "administr" in w:
-                                        page_positions["Administration"] = word['x0']
-                                    elif 'fabricant' in w:
-                                        page_positions['Fabricant'] = word['x0']
-                                    elif 'pght' in w:
-                                        page_positions['PGHT'] = word['x0']
-                                    elif 'cfa' in w:
-                                        page_positions['CFA'] = word['x0']
-                                    elif 'code' in w:
-                                        page_positions['Code'] = word['x0']
-                                    elif 'amm' in w:
-                                        page_positions['AMM'] = word['x0']
-                                    elif 'expiration' in w or "d'exp" in w:
-                                        page_positions['Expiration'] = word['x0']
-                                
-                                if page_positions:
-                                    column_positions = dict(sorted(page_positions.items(), key=lambda x: x[1]))
-                                    column_names = list(column_positions.keys())
-                                    # Calculer les bords de colonnes (milieux entre x0)
-                                    x_positions = list(column_positions.values())
-                                    edges = [max(0, x_positions[0] - 5)]
-                                    for i in range(len(x_positions) - 1):
-                                        edges.append((x_positions[i] + x_positions[i + 1]) / 2)
-                                    edges.append(page.width - 2)
-                                    column_edges = edges
-                                    print(f"📋 Colonnes détectées: {column_names}")
-                                    print(f"   Positions X: {column_positions}")
-                                break
-                
-                if not column_edges:
-                    continue
-                
-                # Extraction manuelle par lignes, avec colonnes explicites
-                words = page.extract_words(x_tolerance=2, y_tolerance=2)
+                words = page.extract_words(**WORD_SETTINGS)
                 if not words:
                     continue
-                
-                # Grouper par ligne
-                lines_dict = {}
-                for word in words:
-                    y_pos = round(word['top'])
-                    lines_dict.setdefault(y_pos, []).append(word)
+                lines = group_lines(words)
                 
                 # Trouver la ligne d'en-tête sur cette page
-                header_y = None
-                for y_pos, line_words in sorted(lines_dict.items()):
-                    line_text = ' '.join([w['text'] for w in line_words]).lower()
-                    if 'designation' in line_text and 'dci' in line_text:
-                        header_y = y_pos
-                        break
-                if header_y is None:
+                header_idx = find_header_line(lines)
+                if header_idx is None:
                     continue
+                header_words = lines[header_idx]
                 
-                # Extraire le tableau avec colonnes explicites
-                if 'N°' not in column_names or 'Designation' not in column_names or 'DCI' not in column_names:
-                    continue
+                # Vérifier la signature d'en-tête; ne réapprendre les colonnes que si la mise en page a changé
+                if layout is None or not layout_matches(layout, header_words, page.width):
+                    previous = layout
+                    layout = next((t for t in reversed(known) if layout_matches(t, header_words, page.width)), None)
+                    if layout is None:
+                        layout = learn_layout(header_words, page.width)
+                    if layout is None:
+                        # En-tête sans N°/Designation/DCI reconnus: garder la mise en page précédente
+                        if previous is None:
+                            continue
+                        layout = previous
+                        print(f"⚠️ Page {page_num}: colonnes non reconnues dans l'en-tête, mise en page précédente conservée")
+                    elif layout not in known:
+                        known.append(layout)
+                        learned += 1
+                        if checked:
+                            print(f"🔄 Page {page_num}: mise en page différente, colonnes réapprises")
+                        print(f"📋 Colonnes détectées: {layout['columns']}")
+                        print(f"   Bords X: {[round(x, 1) for x in layout['edges']]}")
+                    else:
+                        reused += 1
+                        if checked:
+                            print(f"🔄 Page {page_num}: mise en page connue reprise ({layout['columns']})")
+                else:
+                    reused += 1
+                checked = True
+                
+                column_names = layout['columns']
+                column_edges = layout['edges']
                 
                 n_idx = column_names.index('N°')
                 d_idx = column_names.index('Designation')
                 dci_idx = column_names.index('DCI')
                 
-                table_settings = {
-                    'vertical_strategy': 'explicit',
-                    'horizontal_strategy': 'text',
-                    'explicit_vertical_lines': column_edges,
-                    'snap_tolerance': 3,
-                    'join_tolerance': 3,
-                    'min_words_vertical': 1,
-                    'min_words_horizontal': 1,
-                }
-                
-                table = page.extract_table(table_settings)
-                if not table:
-                    continue
-                
-                # Trouver la ligne d'en-tête dans la table
-                header_row_idx = None
-                for idx, row in enumerate(table):
-                    row_text = ' '.join([str(c).lower() if c else '' for c in row])
-                    if ('design' in row_text and 'dci' in row_text) or ('designation' in row_text and 'dci' in row_text):
-                        header_row_idx = idx
-                        break
-                if header_row_idx is None:
-                    continue
-                
                 current_row = None
-                for row in table[header_row_idx + 1:]:
-                    if not row or not any(cell for cell in row):
+                for line_words in lines[header_idx + 1:]:
+                    row = split_cells(line_words, column_edges)
+                    if not any(cell for cell in row):
                         continue
                     
-                    row_text = ' '.join([str(c).lower() if c else '' for c in row])
+                    row_text = ' '.join(c.lower() for c in row)
                     if any(k in row_text for k in ['dosage', 'administrati', 'fabricant', 'classe', "d'amm", 'expiration']) and not re.search(r'\d', row_text):
                         continue
                     
-                    # Normaliser la longueur de ligne
-                    if len(row) < len(column_names):
-                        row = row + [''] * (len(column_names) - len(row))
-                    if len(row) > len(column_names):
-                        row = row[:len(column_names)]
-                    
-                    numero = str(row[n_idx]).replace('\n', ' ').strip() if row[n_idx] else ''
-                    designation = str(row[d_idx]).replace('\n', ' ').strip() if row[d_idx] else ''
-                    dci = str(row[dci_idx]).replace('\n', ' ').strip() if row[dci_idx] else ''
+                    numero = row[n_idx].strip()
+                    designation = row[d_idx].strip()
+                    dci = row[dci_idx].strip()
                     
                     row_data = {'Page': page_num, 'N°': numero, 'Designation': designation, 'DCI': dci}
                     
-                    if not any(row_data[col] for col in focus_columns):
+                    if not any(row_data[col] for col in FOCUS_COLUMNS):
                         continue
                     
                     # Lignes de continuation
@@ -181,6 +289,15 @@ def extract_full_table(pdf_path):
         traceback.print_exc()
         return []
     
+    print(f"📐 Gabarit: {reused} page(s) vérifiée(s) sans réapprentissage, {learned} mise(s) en page apprise(s)")
+    if learned and layouts_path:
+        layouts[family] = known[-MAX_LAYOUTS_PER_FAMILY:]
+        try:
+            save_layouts(layouts_path, layouts)
+            print(f"💾 Gabarits enregistrés: {layouts_path}")
+        except OSError as e:
+            print(f"⚠️ Gabarits non enregistrés: {e}")
+    
     return all_data
 
 def normalize_columns(data):
@@ -346,7 +463,7 @@ def format_excel(excel_path):
     except Exception as e:
         print(f"⚠️ Erreur mise en forme: {e}")
 
-def pdf_to_excel(pdf_path, excel_path):
+def pdf_to_excel(pdf_path, excel_path, layouts_path=DEFAULT_LAYOUTS_PATH, family=None):
     """
     Convertit le PDF en Excel avec toutes les colonnes
     """
@@ -355,7 +472,7 @@ def pdf_to_excel(pdf_path, excel_path):
     print("=" * 60)
     
     # Extraction
-    data = extract_full_table(pdf_path)
+    data = extract_full_table(pdf_path, layouts_path, family)
     
     if not data:
         print("❌ Aucune donnée trouvée!")
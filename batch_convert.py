@@ -0,0 +1,188 @@
+"""
+Conversion par lot d'un dossier de relevés PDF avec pdf_to_excel_dec2025.
+
+- Un pool de processus (multiprocessing.Pool) convertit les PDF; chaque processus
+  importe Camelot/pandas une seule fois et enchaîne plusieurs documents, puis est
+  recyclé après --max-tasks-per-child documents (libère la mémoire de Camelot).
+- Un manifeste JSON (pdf_to_excel_manifest.json dans le dossier de sortie)
+  garde pour chaque PDF: empreinte sha256 du contenu, paramètres de conversion,
+  fichier de sortie et durées. Au lancement suivant, les PDF dont l'empreinte et
+  les paramètres n'ont pas changé (et dont la sortie existe encore) sont ignorés.
+
+Usage: python batch_convert.py JAN_2026/ [-o sorties/] [-j 4] [--force]
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import multiprocessing as mp
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from camelot_cache import DEFAULT_CACHE_DIR, file_sha256
+
+MANIFEST_NAME = 'pdf_to_excel_manifest.json'
+MANIFEST_VERSION = 1
+
+
+def load_manifest(path):
+    """Manifest entries keyed by PDF path (relative to the input folder); empty if absent/unreadable."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get('version') != MANIFEST_VERSION:
+        return {}
+    return data.get('files', {})
+
+
+def save_manifest(path, entries):
+    """Atomically write the manifest (temp file + os.replace)."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'files': entries}, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp, path)
+    except Exception:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def find_pdfs(input_dir, recursive=False):
+    pattern = os.path.join(input_dir, '**', '*') if recursive else os.path.join(input_dir, '*')
+    return sorted(p for p in glob.glob(pattern, recursive=recursive)
+                  if os.path.isfile(p) and p.lower().endswith('.pdf'))
+
+
+def output_path_for(pdf_path, input_dir, output_dir):
+    rel = os.path.relpath(pdf_path, input_dir)
+    return os.path.join(output_dir, os.path.splitext(rel)[0] + '.xlsx')
+
+
+def is_up_to_date(entry, sha256, params):
+    return (entry is not None and entry.get('status') == 'ok' and entry.get('sha256') == sha256
+            and entry.get('params') == params and os.path.isfile(entry.get('output', '')))
+
+
+def _convert_one(task):
+    """Pool task: convert one PDF, capturing its console output. Returns a result dict."""
+    from pdf_to_excel_dec2025 import pdf_to_excel_robust
+
+    rel, pdf_path, excel_path, params = task
+    os.makedirs(os.path.dirname(os.path.abspath(excel_path)), exist_ok=True)
+    log = io.StringIO()
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    saved = None
+    error = None
+    with contextlib.redirect_stdout(log):
+        try:
+            saved = pdf_to_excel_robust(pdf_path, excel_path, **params)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+    return {'rel': rel, 'output': saved, 'error': error, 'log': log.getvalue(), 'pid': os.getpid(),
+            'seconds': round(time.perf_counter() - start, 3),
+            'cpu_seconds': round(time.process_time() - cpu_start, 3)}
+
+
+def batch_convert(input_dir, output_dir=None, jobs=None, max_tasks_per_child=10, recursive=False,
+                  force=False, verbose=False, **params):
+    """Convert every PDF of input_dir, skipping those unchanged since the manifest was written.
+
+    ``params`` are passed to pdf_to_excel_robust and recorded in the manifest.
+    Returns the manifest entries.
+    """
+    output_dir = output_dir or input_dir
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    entries = load_manifest(manifest_path)
+
+    pdfs = find_pdfs(input_dir, recursive)
+    if not pdfs:
+        print(f"❌ Aucun PDF trouvé dans {input_dir}")
+        return entries
+
+    # Only settings that change the output are part of the skip key
+    settings = {k: v for k, v in params.items() if k != 'cache_dir'}
+    tasks = []
+    hashes = {}
+    for pdf_path in pdfs:
+        rel = os.path.relpath(pdf_path, input_dir)
+        hashes[rel] = file_sha256(pdf_path)
+        if not force and is_up_to_date(entries.get(rel), hashes[rel], settings):
+            print(f"⏭️ Inchangé, ignoré: {rel}")
+            continue
+        tasks.append((rel, pdf_path, output_path_for(pdf_path, input_dir, output_dir), params))
+
+    print(f"📂 {len(pdfs)} PDF trouvé(s), {len(tasks)} à convertir, {len(pdfs) - len(tasks)} inchangé(s)")
+    if not tasks:
+        return entries
+
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(tasks)))
+    print(f"⚙️ {jobs} processus, recyclés après {max_tasks_per_child} document(s)")
+    start = time.perf_counter()
+    failures = 0
+    with mp.Pool(processes=jobs, maxtasksperchild=max_tasks_per_child) as pool:
+        for done, result in enumerate(pool.imap_unordered(_convert_one, tasks), start=1):
+            rel = result['rel']
+            ok = result['output'] is not None and result['error'] is None
+            failures += not ok
+            if verbose or not ok:
+                print(result['log'], end='')
+            status = '✅' if ok else '❌'
+            print(f"{status} [{done}/{len(tasks)}] {rel} -> {result['output'] or result['error'] or 'échec'} "
+                  f"({result['seconds']:.1f}s, pid {result['pid']})")
+            entries[rel] = {'sha256': hashes[rel], 'params': settings,
+                            'output': os.path.abspath(result['output']) if result['output'] else None,
+                            'status': 'ok' if ok else 'error', 'error': result['error'],
+                            'seconds': result['seconds'], 'cpu_seconds': result['cpu_seconds'],
+                            'converted_at': datetime.now().isoformat(timespec='seconds')}
+            # Saved after each document so an interrupted batch keeps its progress
+            save_manifest(manifest_path, entries)
+
+    wall = time.perf_counter() - start
+    print(f"🏁 {len(tasks) - failures} converti(s), {failures} échec(s) en {wall:.1f}s. Manifeste: {manifest_path}")
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convertir tous les PDF d'un dossier (pdf_to_excel_dec2025), "
+                                                 "en ignorant ceux déjà convertis avec les mêmes paramètres.")
+    parser.add_argument('input_dir', help='Dossier contenant les PDF')
+    parser.add_argument('-o', '--output-dir', dest='output_dir', default=None,
+                        help='Dossier des fichiers Excel et du manifeste (défaut: dossier des PDF)')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='Nombre de processus (défaut: nombre de CPU)')
+    parser.add_argument('--max-tasks-per-child', type=int, default=10, dest='max_tasks_per_child',
+                        help='Documents convertis par processus avant recyclage')
+    parser.add_argument('-r', '--recursive', action='store_true', help='Parcourir aussi les sous-dossiers')
+    parser.add_argument('--force', action='store_true', help='Reconvertir même les PDF inchangés')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Afficher la sortie complète de chaque conversion')
+    parser.add_argument('-p', '--pages', default='all', help='Pages à analyser (ex: 1-3,5 or all)')
+    parser.add_argument('--include-text', action='store_true', dest='include_text',
+                        help="Inclure le texte non-tabulaire (colonne 'Extra_Text')")
+    parser.add_argument('--adaptive', action='store_true', help='Choix du mode Camelot page par page')
+    parser.add_argument('--header-mode', default='patterns', choices=['patterns', 'auto', 'both'], dest='header_mode',
+                        help='Suppression des en-têtes répétés (voir pdf_to_excel_dec2025)')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, dest='cache_dir',
+                        help='Activer le cache des tables Camelot dans ce dossier '
+                             '(désactivé par défaut, sauf si PDF_TO_EXCEL_CACHE est définie)')
+    parser.add_argument('--no-cache', action='store_true', dest='no_cache', help='Désactiver le cache Camelot même si PDF_TO_EXCEL_CACHE est définie')
+    args = parser.parse_args()
+
+    batch_convert(args.input_dir, args.output_dir, jobs=args.jobs, max_tasks_per_child=args.max_tasks_per_child,
+                  recursive=args.recursive, force=args.force, verbose=args.verbose,
+                  pages=args.pages, include_text=args.include_text, adaptive=args.adaptive,
+                  header_mode=args.header_mode, cache_dir=None if args.no_cache else args.cache_dir)
+
+
+if __name__ == '__main__':
+    main()
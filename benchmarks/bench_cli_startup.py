@@ -0,0 +1,71 @@
+"""
+Benchmark du temps de démarrage de pdf_to_excel_cli.py, sous-commande par
+sous-commande (`<commande> --help`, interpréteur neuf à chaque essai), et des
+modules lourds effectivement chargés. Sert de garde-fou: une sous-commande qui
+n'ouvre pas de PDF ne doit pas importer Camelot.
+
+Usage: python benchmarks/bench_cli_startup.py [-r 5]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLI = os.path.join(REPO_DIR, 'pdf_to_excel_cli.py')
+HEAVY_MODULES = ('camelot', 'cv2', 'matplotlib', 'pdfminer', 'pdfplumber', 'pandas', 'openpyxl')
+
+CASES = [
+    ('--help', [CLI, '--help']),
+    ('convert --help', [CLI, 'convert', '--help']),
+    ('nomenclature --help', [CLI, 'nomenclature', '--help']),
+    ('doublons --help', [CLI, 'doublons', '--help']),
+    ('totaux --help', [CLI, 'totaux', '--help']),
+    ('graph --help', [CLI, 'graph', '--help']),
+    ('ancien: import camelot', ['-c', 'import camelot, pandas']),
+]
+
+# Runs the target like `python script args`, then reports which heavy modules got imported
+_PROBE = """
+import runpy, sys
+sys.argv = sys.argv[1:]
+try:
+    if sys.argv[0] == '-c':
+        exec(sys.argv[1])
+    else:
+        runpy.run_path(sys.argv[0], run_name='__main__')
+except SystemExit:
+    pass
+print('HEAVY:' + ','.join(m for m in %r if m in sys.modules))
+""" % (HEAVY_MODULES,)
+
+
+def measure(argv, repeat):
+    best = None
+    heavy = ''
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, '-c', _PROBE] + argv, capture_output=True, text=True, cwd=REPO_DIR)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        for line in proc.stdout.splitlines():
+            if line.startswith('HEAVY:'):
+                heavy = line[len('HEAVY:'):]
+    return best, heavy
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Temps de démarrage des sous-commandes de pdf_to_excel_cli.py.")
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='Essais par commande (meilleur temps retenu)')
+    args = parser.parse_args()
+
+    print(f"{'commande':<28}{'démarrage (s)':>15}  modules lourds chargés")
+    for label, argv in CASES:
+        best, heavy = measure(argv, args.repeat)
+        print(f"{label:<28}{best:>15.3f}  {heavy or '-'}")
+
+
+if __name__ == '__main__':
+    main()
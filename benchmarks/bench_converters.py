@@ -0,0 +1,157 @@
+"""
+Benchmark de bout en bout des convertisseurs pdf_to_excel_dec2025 et
+pdf_to_excel_aout2025 sur des relevés synthétiques (make_statement_pdf).
+
+Chaque conversion tourne dans un processus neuf (imports compris) qui mesure:
+pages/s, pic de mémoire (RSS max via le module resource) et temps par étape
+(extraction Camelot, nettoyage/fusion, en-têtes répétés, écriture Excel).
+Les résultats sont enregistrés en JSON pour comparer deux versions du code
+(--compare ancien.json).
+
+Usage: python benchmarks/bench_converters.py --pages 10 100 [-o resultats.json] [--compare base.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+
+CONVERTERS = ('dec2025', 'aout2025')
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None where resource is unavailable, e.g. Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def _stage(stages, name, fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    stages[name] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def run_child(converter, pdf_path, excel_path):
+    """Run one conversion stage by stage in this process and return its measurements."""
+    stages = {}
+    start = time.perf_counter()
+    if converter == 'dec2025':
+        import pdf_to_excel_dec2025 as conv
+    else:
+        import pdf_to_excel_aout2025 as conv
+    stages['import'] = round(time.perf_counter() - start, 3)
+
+    tables = _stage(stages, 'extract', conv.read_tables_with_fallback, pdf_path)
+    n_tables = tables.n if tables else 0
+    df = _stage(stages, 'sanitize', conv.sanitize_and_merge_tables, tables or [])
+    n_rows_raw = len(df)
+    if hasattr(conv, 'remove_repeated_header_rows_and_blocks'):
+        df = _stage(stages, 'headers', conv.remove_repeated_header_rows_and_blocks, df)
+    _stage(stages, 'excel', conv.export_to_excel, df, excel_path)
+    return {'stages': stages, 'total': round(time.perf_counter() - start, 3), 'tables': n_tables,
+            'rows_raw': n_rows_raw, 'rows': len(df), 'peak_rss_mb': peak_rss_mb()}
+
+
+def run_one(converter, pdf_path, n_pages, workdir):
+    """Run a conversion in a fresh interpreter; returns its measurement dict."""
+    excel_path = os.path.join(workdir, f"{converter}_{n_pages}.xlsx")
+    cmd = [sys.executable, os.path.abspath(__file__), '--child', converter, pdf_path, excel_path]
+    proc = subprocess.run(cmd, capture_output=True, text=True, cwd=REPO_DIR)
+    lines = [line for line in proc.stdout.splitlines() if line.startswith('{')]
+    if proc.returncode != 0 or not lines:
+        return {'error': (proc.stderr or proc.stdout).strip().splitlines()[-1:] or ['échec']}
+    result = json.loads(lines[-1])
+    result['pages_per_sec'] = round(n_pages / result['total'], 2) if result['total'] else None
+    return result
+
+
+def ensure_corpus(corpus_dir, page_counts, seed):
+    from make_statement_pdf import generate_statement
+
+    os.makedirs(corpus_dir, exist_ok=True)
+    paths = {}
+    for n in page_counts:
+        path = os.path.join(corpus_dir, f"releve_{n}p_seed{seed}.pdf")
+        if not os.path.isfile(path):
+            print(f"🛠️ Génération du relevé synthétique {n} pages...")
+            generate_statement(path, n, seed=seed)
+        paths[n] = path
+    return paths
+
+
+def print_results(results, baseline=None):
+    base_index = {(r['converter'], r['pages']): r for r in (baseline or {}).get('runs', [])}
+    print(f"{'convertisseur':<14}{'pages':>7}{'total (s)':>11}{'pages/s':>9}{'RSS (Mo)':>10}{'lignes':>8}  étapes (s)")
+    for r in results['runs']:
+        if 'error' in r:
+            print(f"{r['converter']:<14}{r['pages']:>7}  ❌ {r['error'][0]}")
+            continue
+        rss = f"{r['peak_rss_mb']:.0f}" if r['peak_rss_mb'] is not None else '-'
+        stages = ' '.join(f"{k}={v:.2f}" for k, v in r['stages'].items())
+        line = (f"{r['converter']:<14}{r['pages']:>7}{r['total']:>11.2f}{r['pages_per_sec']:>9.2f}"
+                f"{rss:>10}{r['rows']:>8}  {stages}")
+        base = base_index.get((r['converter'], r['pages']))
+        if base and 'total' in base and r['total']:
+            line += f"  (x{base['total'] / r['total']:.2f} vs référence)"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de bout en bout des convertisseurs sur relevés synthétiques.")
+    parser.add_argument('--pages', type=int, nargs='+', default=[10, 100], help='Tailles de relevé (pages, 10 à 5000)')
+    parser.add_argument('--converters', nargs='+', default=list(CONVERTERS), choices=CONVERTERS,
+                        help='Convertisseurs à mesurer')
+    parser.add_argument('--corpus-dir', default=os.path.join(tempfile.gettempdir(), 'pdf_to_excel_corpus'),
+                        dest='corpus_dir', help='Dossier des PDF synthétiques (réutilisés entre les lancements)')
+    parser.add_argument('--seed', type=int, default=0, help='Graine du générateur')
+    parser.add_argument('-o', '--output', default=None,
+                        help='Fichier JSON des résultats (défaut: bench_converters_<date>.json)')
+    parser.add_argument('--compare', default=None, help='JSON d\'un lancement précédent à comparer')
+    parser.add_argument('--child', nargs=3, metavar=('CONVERTER', 'PDF', 'XLSX'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        converter, pdf_path, excel_path = args.child
+        # Converters print progress; only the final JSON line is read by the parent
+        print(json.dumps(run_child(converter, pdf_path, excel_path)))
+        return
+
+    corpus = ensure_corpus(args.corpus_dir, args.pages, args.seed)
+    results = {'date': datetime.now().isoformat(timespec='seconds'), 'python': platform.python_version(),
+               'platform': platform.platform(), 'seed': args.seed, 'runs': []}
+    with tempfile.TemporaryDirectory() as workdir:
+        for n in args.pages:
+            for converter in args.converters:
+                print(f"⏱️ {converter} sur {n} pages...")
+                run = run_one(converter, corpus[n], n, workdir)
+                results['runs'].append({'converter': converter, 'pages': n, **run})
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+
+    output = args.output or f"bench_converters_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"💾 Résultats enregistrés: {output}")
+
+
+if __name__ == '__main__':
+    main()
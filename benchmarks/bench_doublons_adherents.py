@@ -0,0 +1,121 @@
+"""
+Benchmark du moteur vectorisé de supprimer_doublons_adherents
+(trouver_vrais_doublons sur doublons_multicles: codes exacts par colonne, un groupby par
+jeu de clés) contre la boucle d'origine (un filtre du tableau entier et un hash
+Python ligne à ligne par matricule en doublon), sur un fichier ADHERENTS synthétique.
+
+La boucle d'origine étant quadratique, elle n'est exécutée que sur les
+--reference-rows premières lignes, où l'on vérifie que les mêmes lignes sont
+supprimées, avec la même colonne DOUBLONS_SUPPRIMES et le même rapport.
+
+Usage: python benchmarks/bench_doublons_adherents.py [-n 1000000] [--reference-rows 20000]
+"""
+
+import argparse
+import importlib.util
+import os
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_supprimer_doublons():
+    path = os.path.join(REPO_DIR, 'JAN_2026', 'supprimer_doublons_adherents.py')
+    spec = importlib.util.spec_from_file_location('supprimer_doublons_adherents', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def reference_vrais_doublons(df, nom_colonne, colonnes_a_comparer):
+    """Original per-matricule loop, kept as the reference for equivalence."""
+    df_non_null = df[df[nom_colonne].notna()].copy()
+    matricules_doublons = df_non_null[df_non_null[nom_colonne].duplicated(keep=False)][nom_colonne].unique()
+    indices_a_supprimer = []
+    doublons_supprimes = {}
+    details = []
+    nb_faux_doublons = 0
+    for matricule in matricules_doublons:
+        lignes_matricule = df[df[nom_colonne] == matricule].copy()
+        if len(lignes_matricule) < 2:
+            continue
+        lignes_matricule['groupe_hash'] = lignes_matricule[colonnes_a_comparer].apply(
+            lambda row: hash(tuple(str(x) for x in row)), axis=1
+        )
+        for groupe_hash, groupe_lignes in lignes_matricule.groupby('groupe_hash'):
+            if len(groupe_lignes) > 1:
+                indices_groupe = groupe_lignes.index.tolist()
+                ordres_supprimes = [str(int(df.loc[idx, 'ORDRE'])) for idx in indices_groupe[1:]]
+                doublons_supprimes[indices_groupe[0]] = ', '.join(ordres_supprimes)
+                indices_a_supprimer.extend(indices_groupe[1:])
+                details.append((matricule, len(groupe_lignes), int(df.loc[indices_groupe[0], 'ORDRE']),
+                                ', '.join(ordres_supprimes)))
+            else:
+                nb_faux_doublons += 1
+    return indices_a_supprimer, doublons_supprimes, details, nb_faux_doublons
+
+
+def synthetic_adherents(n_rows, seed=0):
+    """ADHERENTS-like frame: ~8% exact copies, ~4% same MATRICULE with other data, a few empty MATRICULE."""
+    rng = random.Random(seed)
+    noms = ['KOUASSI', 'KONAN', 'YAO', 'KOFFI', 'TRAORE', 'DIALLO', 'BAMBA', "N'GUESSAN"]
+    prenoms = ['JEAN', 'MARIE', 'AMINATA', 'SEYDOU', 'AWA', 'PAUL', 'FATOU', 'ISSA']
+    rows = []
+    for i in range(n_rows):
+        r = rng.random()
+        if rows and r < 0.08:
+            rows.append(list(rows[rng.randrange(max(0, len(rows) - 5000), len(rows))]))
+        elif rows and r < 0.12:
+            row = list(rows[rng.randrange(max(0, len(rows) - 5000), len(rows))])
+            row[4] = rng.choice([5000, 7500.0, 10000, 12500])
+            rows.append(row)
+        else:
+            matricule = np.nan if r > 0.995 else rng.randint(100000, 999999)
+            rows.append([matricule, rng.choice(noms), rng.choice(prenoms),
+                         f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{rng.randint(1960, 2000)}",
+                         rng.choice([5000, 7500.0, 10000, 12500]), rng.randint(0, 6)])
+    df = pd.DataFrame(rows, columns=['MATRICULE', 'NOM', 'PRENOM', 'DATE_NAISSANCE', 'MENSUALITE', 'AYANTS_DROIT'])
+    df.insert(0, 'ORDRE', range(1, len(df) + 1))
+    df['DOUBLONS_SUPPRIMES'] = ''
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la suppression des vrais doublons (vectorisé vs boucle).")
+    parser.add_argument('-n', '--rows', type=int, default=1_000_000, help='Nombre de lignes synthétiques')
+    parser.add_argument('--reference-rows', type=int, default=20_000, dest='reference_rows',
+                        help="Lignes sur lesquelles comparer avec la boucle d'origine (0 = pas de comparaison)")
+    args = parser.parse_args()
+
+    module = load_supprimer_doublons()
+    df = synthetic_adherents(args.rows)
+    colonnes = [c for c in df.columns if c not in ['DOUBLONS_SUPPRIMES', 'ORDRE']]
+    print(f"ADHERENTS synthétique: {len(df)} lignes x {df.shape[1]} colonnes")
+
+    start = time.perf_counter()
+    indices, doublons_supprimes, details, nb_faux = module.trouver_vrais_doublons(df, 'MATRICULE', colonnes)
+    t_fast = time.perf_counter() - start
+    print(f"vectorisé : {t_fast:8.2f}s  ({len(indices)} lignes supprimées, {nb_faux} faux doublons, "
+          f"{len(df) / t_fast:,.0f} lignes/s)")
+
+    if args.reference_rows:
+        sub = df.head(args.reference_rows)
+        start = time.perf_counter()
+        fast = module.trouver_vrais_doublons(sub, 'MATRICULE', colonnes)
+        t_fast_sub = time.perf_counter() - start
+        start = time.perf_counter()
+        ref = reference_vrais_doublons(sub, 'MATRICULE', colonnes)
+        t_ref = time.perf_counter() - start
+        # The loop ordered groups of one matricule by Python's randomized hash(): compare details as sets
+        same = (sorted(fast[0]) == sorted(ref[0]) and fast[1].to_dict() == ref[1]
+                and set(fast[2].itertuples(index=False, name=None)) == set(ref[2]) and fast[3] == ref[3])
+        print(f"d'origine ({len(sub)} lignes): {t_ref:8.2f}s contre {t_fast_sub:.3f}s vectorisé "
+              f"(x{t_ref / t_fast_sub:.0f}) | Résultats identiques: {same}")
+
+
+if __name__ == '__main__':
+    main()
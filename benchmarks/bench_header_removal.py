@@ -0,0 +1,123 @@
+"""
+Benchmark de remove_repeated_header_rows_and_blocks (version vectorisée) contre
+l'implémentation d'origine (iterrows + boucle de fenêtres), sur un relevé
+synthétique de type Mutuelle Police. Vérifie que les mêmes lignes sont supprimées.
+
+Usage: python benchmarks/bench_header_removal.py [-n 120000]
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_to_excel_dec2025 import remove_repeated_header_rows_and_blocks  # noqa: E402
+
+
+def reference_remove_repeated_header_rows_and_blocks(df_in):
+    """Original row-loop implementation, kept as the reference for equivalence."""
+    block_patterns = [
+        re.compile(r"^\s*\d+\s*-\s*Mutuelle\s+Police", re.IGNORECASE),
+        re.compile(r"\bRetenues\b", re.IGNORECASE),
+        re.compile(r"\bReste\s+a\s+recouvrer\b", re.IGNORECASE),
+        re.compile(r"\bAgent\b.*\bReferences\b.*\bMontant", re.IGNORECASE),
+        re.compile(r"\bAnterieures\b.*\bMois\b.*\bTotal\b", re.IGNORECASE),
+    ]
+    n = len(df_in)
+    drop_indices = set()
+    joined_rows = []
+    non_empty_counts = []
+    numeric_counts = []
+    num_like_re = re.compile(r'^[\d\s,./-]+$')
+    for idx, row in df_in.iterrows():
+        non_empty = [str(x).strip() for x in row.tolist() if x is not None and str(x).strip() != '']
+        non_empty_counts.append(len(non_empty))
+        joined_rows.append(' '.join(non_empty))
+        numeric_counts.append(sum(1 for tok in non_empty if num_like_re.match(tok.replace('\xa0', ' '))))
+    for i in range(0, n - len(block_patterns) + 1):
+        ok = True
+        for j, pat in enumerate(block_patterns):
+            text = joined_rows[i + j]
+            if non_empty_counts[i + j] > 6 or not text or numeric_counts[i + j] > 2 or not pat.search(text):
+                ok = False
+                break
+        if ok:
+            for j in range(len(block_patterns)):
+                drop_indices.add(i + j)
+    single_patterns = [
+        re.compile(r"^\s*\d+\s*-\s*Mutuelle\s+Police", re.IGNORECASE),
+        re.compile(r"\bRetenues\b", re.IGNORECASE),
+        re.compile(r"\bReste\s+a\s+recouvrer\b", re.IGNORECASE),
+        re.compile(r"\bAgent\b", re.IGNORECASE),
+        re.compile(r"\bAnterieures\b", re.IGNORECASE),
+    ]
+    for idx, text in enumerate(joined_rows):
+        if idx in drop_indices or not text or numeric_counts[idx] > 2:
+            continue
+        if non_empty_counts[idx] <= 4 and any(p.search(text) for p in single_patterns):
+            drop_indices.add(idx)
+    keep = [i for i in range(n) if i not in drop_indices]
+    return df_in.loc[keep].reset_index(drop=True)
+
+
+def synthetic_statement(n_rows, seed=0):
+    """Merged-statement-like frame: data rows, 5-line header blocks, stray header lines, NaN/None cells."""
+    rng = random.Random(seed)
+    cols = ['Agent', 'References', 'Montant', 'Anterieures', 'Mois', 'Total', 'Page_2']
+    header_block = [
+        ['{} - Mutuelle Police Nationale', '', '', '', '', '', None],
+        ['', '', 'Retenues', '', '', '', None],
+        ['', '', '', 'Reste a recouvrer', '', '', None],
+        ['Agent', 'References', 'Montant', '', '', '', None],
+        ['', '', '', 'Anterieures', 'Mois', 'Total', None],
+    ]
+    rows = []
+    while len(rows) < n_rows:
+        r = rng.random()
+        if r < 0.025:
+            section = rng.randint(1, 30)
+            for line in header_block:
+                rows.append([c.format(section) if isinstance(c, str) else c for c in line])
+        elif r < 0.03:
+            rows.append(['', 'Retenues', '', '', '', '', float('nan')])
+        elif r < 0.035:
+            # header-looking words in a data row (too many numeric tokens: must be kept)
+            rows.append(['Agent X', '1234567', '8 160 000', '1 000', '2 000', '3 000', None])
+        else:
+            rows.append([f"AGENT {rng.randint(1, 99999)} NOM", str(rng.randint(10 ** 6, 10 ** 7 - 1)),
+                         f"{rng.randint(1, 99)} {rng.randint(100, 999)} 000", f"{rng.randint(1, 9)}\xa0000",
+                         '' if rng.random() < 0.3 else f"{rng.randint(1, 9)} 000",
+                         f"{rng.randint(10, 99)} 000", float('nan') if rng.random() < 0.1 else None])
+    return pd.DataFrame(rows[:n_rows], columns=cols)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du nettoyage des en-têtes répétés (vectorisé vs boucle).")
+    parser.add_argument('-n', '--rows', type=int, default=120_000, help='Nombre de lignes synthétiques')
+    parser.add_argument('--skip-reference', action='store_true', help="Ne pas exécuter l'implémentation d'origine")
+    args = parser.parse_args()
+
+    df = synthetic_statement(args.rows)
+    print(f"Relevé synthétique: {len(df)} lignes x {df.shape[1]} colonnes")
+
+    start = time.perf_counter()
+    fast = remove_repeated_header_rows_and_blocks(df)
+    t_fast = time.perf_counter() - start
+    print(f"vectorisé : {t_fast:8.2f}s  ({len(df) - len(fast)} lignes supprimées, {len(df) / t_fast:,.0f} lignes/s)")
+
+    if not args.skip_reference:
+        start = time.perf_counter()
+        ref = reference_remove_repeated_header_rows_and_blocks(df)
+        t_ref = time.perf_counter() - start
+        print(f"d'origine : {t_ref:8.2f}s  ({len(df) - len(ref)} lignes supprimées, {len(df) / t_ref:,.0f} lignes/s)")
+        print(f"Gain: x{t_ref / t_fast:.1f} | Lignes identiques: {fast.equals(ref)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark du coût de --include-text dans pdf_to_excel_dec2025.
+
+Compare, sur un même PDF:
+- tables seules: camelot.read_pdf (stream)
+- avant: camelot.read_pdf puis extract_trailing_text (réouverture pdfplumber)
+- après: pdf_layout.read_pdf_with_text (une seule analyse de mise en page par page)
+
+Usage: python benchmarks/bench_include_text.py JAN_2026.pdf [-p 1-50] [-r 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import camelot  # noqa: E402
+
+import pdf_layout  # noqa: E402
+from pdf_to_excel_dec2025 import extract_trailing_text  # noqa: E402
+
+
+def _best_of(fn, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du coût de --include-text (avant/après couche partagée).")
+    parser.add_argument('pdf', help='Chemin vers le PDF à mesurer')
+    parser.add_argument('-p', '--pages', default='all', help='Pages à analyser (ex: 1-50 ou all)')
+    parser.add_argument('-r', '--repeat', type=int, default=1, help='Nombre de répétitions (meilleur temps retenu)')
+    args = parser.parse_args()
+
+    t_tables, tables = _best_of(lambda: camelot.read_pdf(args.pdf, pages=args.pages, flavor='stream'), args.repeat)
+    t_text, lines_before = _best_of(lambda: extract_trailing_text(args.pdf, pages=args.pages), args.repeat)
+    t_shared, (shared_tables, text_by_page) = _best_of(
+        lambda: pdf_layout.read_pdf_with_text(args.pdf, pages=args.pages, flavor='stream'), args.repeat)
+    lines_after = [line for p in sorted(text_by_page) for line in text_by_page[p]]
+
+    t_before = t_tables + t_text
+    n_pages = len(text_by_page)
+    print(f"PDF: {args.pdf} ({n_pages} pages, {tables.n} tables)")
+    print(f"{'mode':<34}{'temps (s)':>10}{'pages/s':>10}{'surcoût texte':>16}")
+    print(f"{'tables seules':<34}{t_tables:>10.2f}{n_pages / t_tables:>10.2f}{'-':>16}")
+    print(f"{'avant (camelot + pdfplumber)':<34}{t_before:>10.2f}{n_pages / t_before:>10.2f}"
+          f"{(t_before / t_tables - 1) * 100:>15.1f}%")
+    print(f"{'après (mise en page partagée)':<34}{t_shared:>10.2f}{n_pages / t_shared:>10.2f}"
+          f"{(t_shared / t_tables - 1) * 100:>15.1f}%")
+    same_tables = shared_tables.n == tables.n and all(a.df.equals(b.df) for a, b in zip(shared_tables, tables))
+    print(f"Tables identiques: {same_tables} | Texte identique: {lines_before == lines_after}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""
+Benchmark de NOMENCLATURE_ANRP_2024/pdf_to_excel_complet.extract_full_table:
+une extraction de mots par page (en-tête, ligne d'en-tête et lignes construites
+à partir de la même liste) contre l'implémentation d'origine (extract_words sur
+la première page, à nouveau sur chaque page, puis page.extract_table qui
+recalcule les mots et parcourt les caractères cellule par cellule).
+Vérifie que les mêmes lignes sont extraites et affiche les pages/s.
+
+Sans le PDF officiel, --synthetic N génère une nomenclature de N pages
+(benchmarks/make_nomenclature_pdf.py) dans un dossier temporaire.
+
+Usage: python benchmarks/bench_nomenclature.py ["NOMENCLATURE_NATIONALE_ANRP _ 2024.pdf"] [-r 1]
+       python benchmarks/bench_nomenclature.py --synthetic 300
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import re
+import sys
+import tempfile
+import time
+
+import pdfplumber
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'NOMENCLATURE_ANRP_2024'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from make_nomenclature_pdf import generate_nomenclature  # noqa: E402
+from pdf_to_excel_complet import detect_columns, extract_full_table  # noqa: E402
+
+DEFAULT_PDF = os.path.join(ROOT, 'NOMENCLATURE_NATIONALE_ANRP _ 2024.pdf')
+
+
+def _reference_column_edges(page):
+    """Header detection of the original implementation (words grouped by rounded top)."""
+    lines_dict = {}
+    for word in page.extract_words(x_tolerance=2, y_tolerance=2):
+        lines_dict.setdefault(round(word['top']), []).append(word)
+    lines = [sorted(line_words, key=lambda w: w['x0']) for _y, line_words in sorted(lines_dict.items())]
+    positions = detect_columns(lines)
+    if not positions:
+        return None, None
+    x_positions = list(positions.values())
+    edges = [max(0, x_positions[0] - 5)]
+    edges += [(x_positions[i] + x_positions[i + 1]) / 2 for i in range(len(x_positions) - 1)]
+    edges.append(page.width - 2)
+    return list(positions), edges
+
+
+def reference_extract_full_table(pdf_path):
+    """Original per-page flow (extract_words twice, then extract_table), kept as the reference for equivalence."""
+    all_data = []
+    column_names, column_edges = [], None
+    with pdfplumber.open(pdf_path) as pdf:
+        for page_num, page in enumerate(pdf.pages, start=1):
+            if column_edges is None:
+                column_names, column_edges = _reference_column_edges(page)
+            if not column_edges:
+                continue
+            words = page.extract_words(x_tolerance=2, y_tolerance=2)
+            if not words:
+                continue
+            lines_dict = {}
+            for word in words:
+                lines_dict.setdefault(round(word['top']), []).append(word)
+            if not any('designation' in ' '.join(w['text'] for w in line_words).lower()
+                       and 'dci' in ' '.join(w['text'] for w in line_words).lower()
+                       for line_words in lines_dict.values()):
+                continue
+            if not {'N°', 'Designation', 'DCI'} <= set(column_names):
+                continue
+            n_idx, d_idx, dci_idx = (column_names.index(c) for c in ('N°', 'Designation', 'DCI'))
+            table = page.extract_table({'vertical_strategy': 'explicit', 'horizontal_strategy': 'text',
+                                        'explicit_vertical_lines': column_edges, 'snap_tolerance': 3,
+                                        'join_tolerance': 3, 'min_words_vertical': 1, 'min_words_horizontal': 1})
+            if not table:
+                continue
+            header_row_idx = None
+            for idx, row in enumerate(table):
+                row_text = ' '.join([str(c).lower() if c else '' for c in row])
+                if 'design' in row_text and 'dci' in row_text:
+                    header_row_idx = idx
+                    break
+            if header_row_idx is None:
+                continue
+            current_row = None
+            for row in table[header_row_idx + 1:]:
+                if not row or not any(cell for cell in row):
+                    continue
+                row_text = ' '.join([str(c).lower() if c else '' for c in row])
+                if any(k in row_text for k in ['dosage', 'administrati', 'fabricant', 'classe', "d'amm", 'expiration']) \
+                        and not re.search(r'\d', row_text):
+                    continue
+                row = (row + [''] * len(column_names))[:len(column_names)]
+                numero, designation, dci = (str(row[i]).replace('\n', ' ').strip() if row[i] else ''
+                                            for i in (n_idx, d_idx, dci_idx))
+                row_data = {'Page': page_num, 'N°': numero, 'Designation': designation, 'DCI': dci}
+                if not (numero or designation or dci):
+                    continue
+                if not numero and current_row:
+                    for col, value in (('Designation', designation), ('DCI', dci)):
+                        if value:
+                            current_row[col] = f"{current_row[col]} | {value}" if current_row[col] else value
+                else:
+                    if current_row:
+                        all_data.append(current_row)
+                    current_row = row_data
+            if current_row:
+                all_data.append(current_row)
+    return all_data
+
+
+def _best_of(fn, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'extraction de la nomenclature ANRP (mots extraits une fois par page).")
+    parser.add_argument('pdf', nargs='?', default=DEFAULT_PDF, help='PDF de la nomenclature (défaut: le PDF 2024 du dépôt)')
+    parser.add_argument('--synthetic', type=int, default=None, metavar='PAGES',
+                        help='Mesurer une nomenclature synthétique de PAGES pages au lieu du PDF')
+    parser.add_argument('-r', '--repeat', type=int, default=1, help='Nombre de répétitions (meilleur temps retenu)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = args.pdf
+        if args.synthetic:
+            pdf_path = os.path.join(tmp, f'nomenclature_{args.synthetic}.pdf')
+            print(f"Génération d'une nomenclature synthétique de {args.synthetic} pages...")
+            generate_nomenclature(pdf_path, args.synthetic)
+        elif not os.path.isfile(pdf_path):
+            parser.error(f"PDF introuvable: {pdf_path} (utiliser --synthetic PAGES)")
+        with pdfplumber.open(pdf_path) as pdf:
+            n_pages = len(pdf.pages)
+
+        t_before, rows_before = _best_of(lambda: reference_extract_full_table(pdf_path), args.repeat)
+        # Without layout templates: columns learned from the first header, as the reference does
+        t_after, rows_after = _best_of(lambda: extract_full_table(pdf_path, layouts_path=None), args.repeat)
+
+    print(f"PDF: {pdf_path} ({n_pages} pages, {len(rows_after)} lignes)")
+    print(f"{'mode':<40}{'temps (s)':>10}{'pages/s':>10}")
+    print(f"{'avant (3 extractions + extract_table)':<40}{t_before:>10.2f}{n_pages / t_before:>10.2f}")
+    print(f"{'après (mots extraits une fois)':<40}{t_after:>10.2f}{n_pages / t_after:>10.2f}")
+    print(f"Accélération: x{t_before / t_after:.2f} | Lignes identiques: {rows_before == rows_after}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Contrôle de non-régression des sous-totaux par section de la feuille CONTROLE
+(--controle) sur un relevé synthétique (make_statement_pdf), dont le
+générateur connaît les vraies sections: lignes agent et somme de la colonne
+Total de chaque "N - Mutuelle Police Nationale".
+
+Les deux chemins de conversion (en mémoire et --stream) doivent trouver toutes
+les sections avec la somme Total attendue; en flux, le nombre de lignes de
+chaque section doit aussi être exact (en mémoire, les lignes d'en-tête de
+colonnes restées dans le tableau sont comptées avec leur section).
+Code de sortie 1 en cas d'écart.
+
+Usage: python benchmarks/check_controle_sections.py [-n 12] [--seed 0]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from controle_totaux import SECTION_TOTALE, lire_controle  # noqa: E402
+from make_statement_pdf import generate_statement  # noqa: E402
+from pdf_to_excel_dec2025 import pdf_to_excel_robust  # noqa: E402
+from pdf_to_excel_streaming import pdf_to_excel_streaming  # noqa: E402
+
+
+def sections_controle(chemin, total_attendu):
+    """{section: (lignes, somme Total)} of a CONTROLE sheet; the Total column is the one summing to ``total_attendu``."""
+    controle = lire_controle(chemin)
+    sommes = controle[(controle['SECTION'] == SECTION_TOTALE) & (controle['MESURE'] == 'SOMME')]
+    colonnes = sommes.loc[sommes['VALEUR'].astype(float) == total_attendu, 'COLONNE'].tolist()
+    colonne = colonnes[0] if colonnes else None
+    sections = {}
+    for section, lignes in controle[(controle['SECTION'] != SECTION_TOTALE) & (controle['MESURE'] == 'LIGNES')][
+            ['SECTION', 'VALEUR']].itertuples(index=False):
+        somme = controle.loc[(controle['SECTION'] == section) & (controle['MESURE'] == 'SOMME')
+                             & (controle['COLONNE'] == colonne), 'VALEUR']
+        sections[section] = (int(lignes), float(somme.iloc[0]) if len(somme) else None)
+    return sections
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sous-totaux par section de CONTROLE sur un relevé synthétique.")
+    parser.add_argument('-n', '--pages', type=int, default=12, help='Pages du relevé synthétique')
+    parser.add_argument('--seed', type=int, default=0, help='Graine du générateur')
+    args = parser.parse_args()
+
+    attendu = {}
+    ecarts = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = os.path.join(tmp, 'releve.pdf')
+        generate_statement(pdf_path, args.pages, seed=args.seed, section_totals=attendu)
+        total = sum(somme for _lignes, somme in attendu.values())
+        for mode, convert in (('mémoire', pdf_to_excel_robust), ('flux', pdf_to_excel_streaming)):
+            excel_path = os.path.join(tmp, f'releve_{mode}.xlsx')
+            with contextlib.redirect_stdout(io.StringIO()):
+                convert(pdf_path, excel_path, controle=True)
+            trouve = sections_controle(excel_path, total)
+            print(f"{mode}: {len(trouve)} section(s) trouvée(s), {len(attendu)} attendue(s)")
+            for numero, (lignes, somme) in attendu.items():
+                lignes_lues, somme_lue = trouve.pop(f'section {numero}', (None, None))
+                ok = somme_lue == somme and (mode != 'flux' or lignes_lues == lignes)
+                ecarts += not ok
+                print(f"  {'✅' if ok else '❌'} section {numero}: lignes {lignes_lues} (attendu {lignes}), "
+                      f"Total {somme_lue} (attendu {somme})")
+            for section, (lignes_lues, _somme) in trouve.items():
+                ecarts += 1
+                print(f"  ❌ {section} inattendue: {lignes_lues} ligne(s)")
+    print(f"{'✅ Sous-totaux par section conformes' if not ecarts else f'❌ {ecarts} écart(s)'}")
+    sys.exit(1 if ecarts else 0)
+
+
+if __name__ == '__main__':
+    main()
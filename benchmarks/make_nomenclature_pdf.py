@@ -0,0 +1,107 @@
+"""
+Générateur de nomenclature synthétique type ANRP (PDF), pour mesurer
+NOMENCLATURE_ANRP_2024/pdf_to_excel_complet.py sans le document officiel.
+
+Chaque page commence par un titre courant dans la marge gauche et reprend la
+ligne d'en-tête (N°, Designation, DCI, Dosage, Voie d'administration,
+Fabricant, PGHT, Code, Expiration) suivie des produits; une désignation sur
+trois continue sur une seconde ligne sans N°, et chaque page se termine par
+"Page X de Y". Avec --drift-page, les colonnes changent de place à partir
+d'une page (mise en page révisée). Le PDF est produit avec le backend PDF de
+matplotlib (texte réel, extractible par pdfplumber).
+
+Usage: python benchmarks/make_nomenclature_pdf.py -n 300 -o corpus/nomenclature_300.pdf
+"""
+
+import argparse
+import random
+
+import matplotlib
+
+matplotlib.use('pdf')
+import matplotlib.pyplot as plt  # noqa: E402
+from matplotlib.backends.backend_pdf import PdfPages  # noqa: E402
+
+MIN_PAGES = 1
+MAX_PAGES = 2000
+A4_LANDSCAPE = (11.69, 8.27)
+# Column x positions leave each value inside its column (the extractor's edges are midpoints between headers)
+HEADER = [(0.03, 'N°'), (0.07, 'Designation'), (0.36, 'DCI'), (0.52, 'Dosage'), (0.59, "Voie d'administration"),
+          (0.71, 'Fabricant'), (0.80, 'PGHT'), (0.85, 'Code'), (0.93, 'Expiration')]
+# Layout after --drift-page: Dosage and Voie d'administration swapped and moved, as in a revised edition
+HEADER_DRIFT = [(0.03, 'N°'), (0.07, 'Designation'), (0.34, 'DCI'), (0.50, "Voie d'administration"),
+                (0.62, 'Dosage'), (0.71, 'Fabricant'), (0.80, 'PGHT'), (0.85, 'Code'), (0.93, 'Expiration')]
+FONT_SIZE = 6
+LINE_STEP = 0.022
+SUBSTANCES = ['PARACETAMOL', 'AMOXICILLINE', 'IBUPROFENE', 'METFORMINE', 'OMEPRAZOLE', 'CIPROFLOXACINE',
+              'AMLODIPINE', 'ARTEMETHER', 'LUMEFANTRINE', 'DICLOFENAC', 'CEFTRIAXONE', 'SALBUTAMOL']
+FORMES = ['CPR', 'GELULE', 'SIROP', 'INJ', 'SUSP BUV', 'POMMADE']
+VOIES = ['Orale', 'Injectable', 'Cutanee', 'Inhalee']
+FABRICANTS = ['SANOFI', 'PFIZER', 'CIPLA', 'SERVIER', 'BIOGARAN', 'MYLAN', 'SANDOZ']
+
+
+def _product(fig, y, numero, rng, header=HEADER):
+    """Write one product (one or two lines) in the columns of ``header``; returns the y of the next line."""
+    substance = rng.choice(SUBSTANCES)
+    dosage = f"{rng.choice([5, 10, 20, 100, 250, 500, 1000])}MG"
+    values = {'N°': str(numero), 'Designation': f"{substance} {rng.choice(FORMES)} B/{rng.choice([10, 20, 30])}",
+              'DCI': substance, 'Dosage': dosage, "Voie d'administration": rng.choice(VOIES),
+              'Fabricant': rng.choice(FABRICANTS), 'PGHT': f"{rng.randint(500, 90000)}",
+              'Code': f"{rng.randint(10 ** 7, 10 ** 8 - 1)}",
+              'Expiration': f"{rng.randint(1, 12):02d}/{rng.randint(2025, 2030)}"}
+    for x, label in header:
+        fig.text(x, y, values[label], fontsize=FONT_SIZE)
+    if rng.random() < 0.33:
+        y -= LINE_STEP
+        fig.text(header[1][0], y, f"{rng.choice(['ADULTE', 'ENFANT', 'NOURRISSON'])} {rng.choice(FORMES)}",
+                 fontsize=FONT_SIZE)
+        fig.text(header[2][0], y, rng.choice(SUBSTANCES), fontsize=FONT_SIZE)
+    return y - LINE_STEP
+
+
+def generate_nomenclature(path, n_pages, seed=0, drift_page=None):
+    """
+    Write an ``n_pages`` nomenclature to ``path``, in the HEADER_DRIFT layout from page ``drift_page`` on.
+    Returns the number of products written.
+    """
+    if not MIN_PAGES <= n_pages <= MAX_PAGES:
+        raise ValueError(f"n_pages doit être entre {MIN_PAGES} et {MAX_PAGES}")
+    rng = random.Random(seed)
+    numero = 0
+    with PdfPages(path) as pdf:
+        for p in range(1, n_pages + 1):
+            fig = plt.figure(figsize=A4_LANDSCAPE)
+            # Running head in the left margin, left of the N° column
+            fig.text(0.005, 0.975, "ANRP - Nomenclature nationale 2024", fontsize=6)
+            y = 0.95
+            if p == 1:
+                fig.text(0.30, y, "NOMENCLATURE NATIONALE DES MEDICAMENTS ANRP 2024", fontsize=10)
+                y -= 0.04
+            header = HEADER_DRIFT if drift_page and p >= drift_page else HEADER
+            for x, label in header:
+                fig.text(x, y, label, fontsize=7)
+            y -= LINE_STEP * 1.5
+            while y > 0.06:
+                numero += 1
+                y = _product(fig, y, numero, rng, header)
+            fig.text(0.45, 0.02, f"Page {p} de {n_pages}", fontsize=7)
+            pdf.savefig(fig)
+            plt.close(fig)
+    return numero
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Générer une nomenclature ANRP synthétique (PDF).")
+    parser.add_argument('-n', '--pages', type=int, default=300, help=f'Nombre de pages ({MIN_PAGES} à {MAX_PAGES})')
+    parser.add_argument('-o', '--output', default='nomenclature_synthetique.pdf', help='Chemin du PDF généré')
+    parser.add_argument('--seed', type=int, default=0, help='Graine aléatoire (documents reproductibles)')
+    parser.add_argument('--drift-page', type=int, default=None, dest='drift_page',
+                        help="Page à partir de laquelle les colonnes changent de place (mise en page révisée)")
+    args = parser.parse_args()
+
+    n_products = generate_nomenclature(args.output, args.pages, args.seed, args.drift_page)
+    print(f"✅ {args.output}: {args.pages} page(s), {n_products} produit(s)")
+
+
+if __name__ == '__main__':
+    main()
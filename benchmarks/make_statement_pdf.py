@@ -0,0 +1,110 @@
+"""
+Générateur de relevés synthétiques type Mutuelle Police (PDF), pour mesurer les
+convertisseurs sans les relevés de paie réels.
+
+Chaque page commence par le bloc d'en-tête de 5 lignes ("N - Mutuelle Police
+Nationale", "Retenues", "Reste a recouvrer", "Agent References Montant",
+"Anterieures Mois Total") suivi de lignes agent / référence / montants. Une
+nouvelle section (nouveau bloc d'en-tête) peut aussi commencer en milieu de
+page. Le PDF est produit avec le backend PDF de matplotlib (texte réel,
+extractible par Camelot en mode stream).
+
+Usage: python benchmarks/make_statement_pdf.py -n 100 -o corpus/releve_100.pdf
+"""
+
+import argparse
+import random
+
+import matplotlib
+
+matplotlib.use('pdf')
+import matplotlib.pyplot as plt  # noqa: E402
+from matplotlib.backends.backend_pdf import PdfPages  # noqa: E402
+
+MIN_PAGES = 10
+MAX_PAGES = 5000
+A4 = (8.27, 11.69)
+COLUMNS_X = [0.05, 0.30, 0.55, 0.70, 0.85]
+LINE_STEP = 0.02
+
+
+def _amount(rng, low, high):
+    """French-formatted amount: thousands separated by spaces."""
+    return f"{rng.randint(low, high):,}".replace(',', ' ')
+
+
+def _header_block(fig, y, section):
+    fig.text(0.05, y, f"{section} - Mutuelle Police Nationale", fontsize=8)
+    fig.text(0.50, y - 0.015, "Retenues", fontsize=8)
+    fig.text(0.60, y - 0.030, "Reste a recouvrer", fontsize=8)
+    for x, label in zip(COLUMNS_X[:3], ('Agent', 'References', 'Montant')):
+        fig.text(x, y - 0.045, label, fontsize=8)
+    for x, label in zip(COLUMNS_X[2:], ('Anterieures', 'Mois', 'Total')):
+        fig.text(x, y - 0.060, label, fontsize=8)
+    return y - 0.080
+
+
+def _data_row(fig, y, rng):
+    """Write one agent row; returns its Total amount."""
+    monthly = rng.randint(1, 99) * 1000
+    previous = rng.randint(0, 9) * 1000
+    values = [f"AGENT {rng.randint(1, 99999)} NOM", str(rng.randint(10 ** 6, 10 ** 7 - 1)),
+              _amount(rng, 100_000, 99_000_000), _amount(rng, monthly, monthly),
+              _amount(rng, monthly + previous, monthly + previous)]
+    for x, text in zip(COLUMNS_X, values):
+        fig.text(x, y, text, fontsize=7)
+    return monthly + previous
+
+
+def generate_statement(path, n_pages, rows_per_page=40, section_pages=5, seed=0, section_totals=None):
+    """Write an ``n_pages`` statement to ``path``. Returns the number of data rows written.
+
+    With ``section_totals`` (a dict), fills it with {section number: [agent rows, sum of the Total column]}.
+    """
+    if not MIN_PAGES <= n_pages <= MAX_PAGES:
+        raise ValueError(f"n_pages doit être entre {MIN_PAGES} et {MAX_PAGES}")
+    rng = random.Random(seed)
+    section = 1
+    n_rows = 0
+    with PdfPages(path) as pdf:
+        for p in range(n_pages):
+            fig = plt.figure(figsize=A4)
+            if p and p % section_pages == 0:
+                section += 1
+            y = _header_block(fig, 0.97, section)
+            # About one page in four starts a new section halfway down
+            split = rows_per_page // 2 if rng.random() < 0.25 else None
+            for r in range(rows_per_page):
+                if r == split:
+                    section += 1
+                    y = _header_block(fig, y - 0.01, section)
+                total = _data_row(fig, y, rng)
+                if section_totals is not None:
+                    counts = section_totals.setdefault(section, [0, 0])
+                    counts[0] += 1
+                    counts[1] += total
+                y -= LINE_STEP
+                n_rows += 1
+                if y < 0.03:
+                    break
+            pdf.savefig(fig)
+            plt.close(fig)
+    return n_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Générer un relevé Mutuelle Police synthétique (PDF).")
+    parser.add_argument('-n', '--pages', type=int, default=100, help=f'Nombre de pages ({MIN_PAGES} à {MAX_PAGES})')
+    parser.add_argument('-o', '--output', default='releve_synthetique.pdf', help='Chemin du PDF généré')
+    parser.add_argument('--rows-per-page', type=int, default=40, dest='rows_per_page', help='Lignes agent par page')
+    parser.add_argument('--section-pages', type=int, default=5, dest='section_pages',
+                        help='Pages par section avant un nouveau numéro de section')
+    parser.add_argument('--seed', type=int, default=0, help='Graine aléatoire (relevés reproductibles)')
+    args = parser.parse_args()
+
+    n_rows = generate_statement(args.output, args.pages, args.rows_per_page, args.section_pages, args.seed)
+    print(f"✅ {args.output}: {args.pages} page(s), {n_rows} ligne(s) agent")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+"""
+Cache disque des résultats Camelot, adressé par contenu.
+
+Une entrée = une page d'un PDF pour un flavor et des paramètres Camelot donnés.
+Clé: sha256(contenu du PDF) + numéro de page + flavor + paramètres + version de Camelot.
+Chaque entrée stocke les grilles des tables de la page (JSON compressé gzip),
+y compris les pages sans table, pour que les relances n'appellent plus Camelot.
+
+Sûr en multi-processus: écriture dans un fichier temporaire puis os.replace
+(atomique), lecture tolérante aux entrées disparues/corrompues. Éviction LRU
+par taille: chaque lecture réussie rafraîchit le mtime de l'entrée et les plus
+anciennes sont supprimées quand le cache dépasse max_bytes.
+
+Désactivé par défaut (les entrées contiennent le contenu des relevés): activé
+par --cache-dir ou la variable d'environnement PDF_TO_EXCEL_CACHE.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+
+import pandas as pd
+
+CACHE_VERSION = 1
+TEXT_FLAVOR = 'text'
+# None: no cache unless a directory is given explicitly
+DEFAULT_CACHE_DIR = os.environ.get('PDF_TO_EXCEL_CACHE') or None
+DEFAULT_MAX_BYTES = int(os.environ.get('PDF_TO_EXCEL_CACHE_MAX_MB', '500')) * 1024 * 1024
+
+_hash_memo = {}
+
+
+class CachedTable:
+    """Minimal stand-in for camelot.core.Table rebuilt from a cached grid.
+
+    Exposes what the converters use (df, page, order, flavor, parsing_report)
+    and sorts like Camelot tables, by (page, order).
+    """
+
+    def __init__(self, grid, page, order, flavor, accuracy, whitespace):
+        self.df = pd.DataFrame(grid)
+        self.shape = self.df.shape
+        self.page = page
+        self.order = order
+        self.flavor = flavor
+        self.accuracy = accuracy
+        self.whitespace = whitespace
+
+    @property
+    def parsing_report(self):
+        return {'accuracy': self.accuracy, 'whitespace': self.whitespace,
+                'order': self.order, 'page': self.page}
+
+    def __lt__(self, other):
+        return (int(self.page), self.order) < (int(other.page), other.order)
+
+    def __repr__(self):
+        return f"<CachedTable page={self.page} order={self.order} shape={self.shape}>"
+
+
+def file_sha256(path):
+    """Content hash of a file, memoized per (path, size, mtime) for the process."""
+    st = os.stat(path)
+    memo_key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    if memo_key not in _hash_memo:
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                h.update(block)
+        _hash_memo[memo_key] = h.hexdigest()
+    return _hash_memo[memo_key]
+
+
+def _camelot_version():
+    try:
+        import camelot
+        return camelot.__version__
+    except Exception:
+        return 'unknown'
+
+
+def entry_key(pdf_hash, page, flavor, params=None):
+    payload = json.dumps({'v': CACHE_VERSION, 'camelot': _camelot_version(), 'pdf': pdf_hash,
+                          'page': int(page), 'flavor': flavor, 'params': params or {}},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _entry_path(cache_dir, key):
+    return os.path.join(cache_dir, key[:2], key + '.json.gz')
+
+
+def table_to_record(table):
+    """Compact form of one table: its cell grid plus parsing_report figures."""
+    report = table.parsing_report
+    return {'order': report['order'], 'accuracy': report['accuracy'], 'whitespace': report['whitespace'],
+            'flavor': getattr(table, 'flavor', None), 'grid': table.df.astype(str).values.tolist()}
+
+
+def record_to_table(record, page):
+    return CachedTable(record['grid'], int(page), record['order'], record.get('flavor'),
+                       record['accuracy'], record['whitespace'])
+
+
+def load_page(cache_dir, key):
+    """Return the cached table records of a page, or None on a miss."""
+    path = _entry_path(cache_dir, key)
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            records = json.load(f)
+    except (OSError, ValueError, EOFError):
+        return None
+    try:
+        os.utime(path)  # LRU: a hit makes the entry the most recent
+    except OSError:
+        pass
+    return records
+
+
+def store_page(cache_dir, key, records):
+    """Atomically write a page entry (temp file + os.replace)."""
+    path = _entry_path(cache_dir, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as f:
+            f.write(json.dumps(records, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+        os.replace(tmp, path)
+    except Exception:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def enforce_size_limit(cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+    """Evict least recently used entries until the cache fits in max_bytes."""
+    entries = []
+    total = 0
+    for root, _dirs, files in os.walk(cache_dir):
+        for name in files:
+            if not name.endswith('.json.gz'):
+                continue
+            path = os.path.join(root, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+    evicted = 0
+    for _mtime, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            evicted += 1
+        except OSError:
+            pass  # already evicted by another process
+        total -= size
+    return evicted
+
+
+def cached_read_pdf(pdf_path, page_numbers, flavor, read_fn, cache_dir,
+                    params=None, max_bytes=DEFAULT_MAX_BYTES, text_sink=None):
+    """Return the tables of ``page_numbers`` for ``flavor``, parsing only uncached pages.
+
+    ``read_fn(pages_spec)`` performs the actual Camelot read for a page spec such as
+    '3,4,9'. When ``text_sink`` is a dict, page text lines are cached as well (under
+    the pseudo-flavor 'text'): read_fn is expected to fill ``text_sink`` for the pages
+    it parses, and cached pages get their lines copied into it.
+    Returns (tables sorted by page/order, number of pages served from cache).
+    """
+    pdf_hash = file_sha256(pdf_path)
+    keys = {p: entry_key(pdf_hash, p, flavor, params) for p in page_numbers}
+    text_keys = {p: entry_key(pdf_hash, p, TEXT_FLAVOR) for p in page_numbers} if text_sink is not None else {}
+    tables = []
+    missing = []
+    for p in page_numbers:
+        records = load_page(cache_dir, keys[p])
+        lines = load_page(cache_dir, text_keys[p]) if text_keys else []
+        if records is None or lines is None:
+            missing.append(p)
+        else:
+            tables.extend(record_to_table(r, p) for r in records)
+            if text_keys:
+                text_sink[p] = lines
+
+    if missing:
+        fresh = read_fn(','.join(str(p) for p in missing))
+        by_page = {p: [] for p in missing}
+        for t in fresh:
+            by_page.setdefault(int(t.page), []).append(table_to_record(t))
+        for p, records in by_page.items():
+            if p in keys:
+                store_page(cache_dir, keys[p], records)
+                tables.extend(record_to_table(r, p) for r in records)
+                if text_keys and p in text_sink:
+                    store_page(cache_dir, text_keys[p], text_sink[p])
+        enforce_size_limit(cache_dir, max_bytes)
+
+    return sorted(tables), len(page_numbers) - len(missing)
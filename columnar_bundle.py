@@ -0,0 +1,172 @@
+"""
+Format colonnaire intermédiaire, relu en mémoire mappée.
+
+Relire le classeur produit par le convertisseur avec pd.read_excel est de loin
+l'étape la plus lente des vérifications de doublons, de totaux et des
+graphiques. Avec --columnar, le convertisseur écrit en plus, à côté du
+classeur, un dossier <sortie>.cols/ contenant le même tableau:
+
+- schema.json: nombre de lignes, noms, types et fichiers de chaque colonne;
+- colonnes numériques: un tableau NumPy .npy (plus un masque .npy des valeurs
+  manquantes pour les entiers/décimaux nullables Int64, Float64...);
+- colonnes texte: encodage par dictionnaire, codes entiers .npy (-1 = valeur
+  manquante) et valeurs distinctes dans un .json.
+
+load_bundle rouvre les .npy avec np.load(mmap_mode='r'): les colonnes
+numériques et les codes ne sont pas copiés, seul le dictionnaire des textes est
+lu. Sans pyarrow (absent de requirements.txt), Parquet n'est pas disponible;
+ce format n'utilise que NumPy, pandas et json.
+
+    python columnar_bundle.py resultat_jan_2026.cols    # résumé et temps de chargement
+"""
+
+import argparse
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+BUNDLE_VERSION = 1
+SCHEMA_NAME = 'schema.json'
+
+
+def bundle_path_for(excel_path):
+    """Bundle directory written next to an Excel output: resultat.xlsx -> resultat.cols"""
+    return os.path.splitext(excel_path)[0] + '.cols'
+
+
+def _text_values(values):
+    """Object column -> (codes int32, dictionary list); missing values get code -1."""
+    present = values.notna()
+    # Camelot cells are strings; anything else in an object column is stored as its text
+    text = values.where(present.to_numpy(), None)
+    if pd.api.types.infer_dtype(text, skipna=True) not in ('string', 'empty'):
+        text = text.map(lambda v: v if v is None or isinstance(v, str) else str(v))
+    codes, uniques = pd.factorize(text, use_na_sentinel=True)
+    return codes.astype(np.int32), [str(u) for u in uniques]
+
+
+def _write_column(values, directory, stem):
+    """Write one column, returning its schema entry (without the name)."""
+    dtype = values.dtype
+    files = {}
+
+    def save(key, array):
+        files[key] = f'{stem}.{key}.npy'
+        np.save(os.path.join(directory, files[key]), np.ascontiguousarray(array), allow_pickle=False)
+
+    if isinstance(dtype, pd.CategoricalDtype):
+        save('codes', values.cat.codes.to_numpy().astype(np.int32))
+        dictionary = [str(c) for c in values.cat.categories]
+        kind = 'category'
+    elif isinstance(dtype, pd.api.extensions.ExtensionDtype) and pd.api.types.is_numeric_dtype(dtype):
+        array = values.array
+        mask = array.isna()
+        if pd.api.types.is_bool_dtype(dtype):
+            save('values', np.asarray(array.to_numpy(dtype=bool, na_value=False)))
+        else:
+            save('values', np.asarray(array.to_numpy(dtype=dtype.numpy_dtype, na_value=0)))
+        save('mask', np.asarray(mask))
+        dictionary = None
+        kind = 'masked'
+    elif isinstance(dtype, np.dtype) and dtype.kind in 'biufcmM':
+        save('values', values.to_numpy())
+        dictionary = None
+        kind = 'numpy'
+    else:
+        codes, dictionary = _text_values(values.astype(object))
+        save('codes', codes)
+        kind = 'text'
+    entry = {'kind': kind, 'dtype': str(dtype), 'files': files}
+    if dictionary is not None:
+        entry['dictionary'] = f'{stem}.dict.json'
+        with open(os.path.join(directory, entry['dictionary']), 'w', encoding='utf-8') as f:
+            json.dump(dictionary, f, ensure_ascii=False)
+    return entry
+
+
+def write_bundle(df, path):
+    """Write ``df`` as a columnar bundle directory at ``path`` (replaced atomically). Returns the path.
+
+    The index is not stored: the loader returns a RangeIndex, like the Excel sheet.
+    """
+    tmp = path + '.tmp'
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    columns = []
+    for i, col in enumerate(df.columns):
+        entry = _write_column(df.iloc[:, i], tmp, f'col_{i:04d}')
+        columns.append({'name': str(col), **entry})
+    schema = {'version': BUNDLE_VERSION, 'rows': len(df), 'columns': columns}
+    with open(os.path.join(tmp, SCHEMA_NAME), 'w', encoding='utf-8') as f:
+        json.dump(schema, f, ensure_ascii=False, indent=2)
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp, path)
+    return path
+
+
+def read_schema(path):
+    with open(os.path.join(path, SCHEMA_NAME), encoding='utf-8') as f:
+        schema = json.load(f)
+    if schema.get('version') != BUNDLE_VERSION:
+        raise ValueError(f"Version de format colonnaire non prise en charge: {schema.get('version')}")
+    return schema
+
+
+def _load_column(path, entry, text_as_category):
+    # view(np.ndarray): plain arrays for pandas, still backed by the mapped file
+    files = {key: np.load(os.path.join(path, name), mmap_mode='r', allow_pickle=False).view(np.ndarray)
+             for key, name in entry['files'].items()}
+    kind = entry['kind']
+    if kind == 'numpy':
+        return files['values']
+    if kind == 'masked':
+        dtype = pd.api.types.pandas_dtype(entry['dtype'])
+        return dtype.construct_array_type()(files['values'], files['mask'])
+    with open(os.path.join(path, entry['dictionary']), encoding='utf-8') as f:
+        dictionary = json.load(f)
+    if kind == 'category' or text_as_category:
+        return pd.Categorical.from_codes(files['codes'], categories=pd.Index(dictionary, dtype=object))
+    # Code -1 (missing) picks the trailing NaN
+    lookup = np.array(dictionary + [np.nan], dtype=object)
+    return lookup[files['codes']]
+
+
+def load_bundle(path, columns=None, text_as_category=False):
+    """Load a bundle as a DataFrame, memory-mapping the .npy files.
+
+    Numeric columns are read-only views on the mapped files (no copy). Text columns
+    are rebuilt as object columns with NaN for missing cells, like the converter's
+    frame; ``text_as_category=True`` keeps them dictionary-encoded instead, which
+    avoids materializing one Python string per cell. ``columns`` restricts loading
+    to the named columns, in that order.
+    """
+    schema = read_schema(path)
+    entries = {entry['name']: entry for entry in schema['columns']}
+    names = list(columns) if columns is not None else [entry['name'] for entry in schema['columns']]
+    missing = [name for name in names if name not in entries]
+    if missing:
+        raise KeyError(f"Colonnes absentes du format colonnaire {path}: {', '.join(missing)}")
+    data = {name: _load_column(path, entries[name], text_as_category) for name in names}
+    # copy=False keeps one block per mapped array instead of consolidating (copying) them
+    return pd.DataFrame(data, columns=names, index=pd.RangeIndex(schema['rows']), copy=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Résumé et temps de chargement d'un format colonnaire (.cols).")
+    parser.add_argument('bundle', help='Dossier <sortie>.cols écrit par pdf_to_excel_dec2025.py --columnar')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    df = load_bundle(args.bundle)
+    elapsed = time.perf_counter() - start
+    print(f"📦 {args.bundle}: {len(df)} lignes, {len(df.columns)} colonnes, chargé en {elapsed * 1000:.1f} ms")
+    for entry in read_schema(args.bundle)['columns']:
+        print(f"   {entry['name']}: {entry['dtype']} ({entry['kind']})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,259 @@
+"""
+Totaux de contrôle calculés pendant l'écriture, enregistrés dans une feuille CONTROLE.
+
+Le convertisseur (--controle) et les outils de doublons accumulent, lot par lot
+pendant qu'ils produisent leurs lignes:
+
+- le nombre de lignes;
+- la somme de chaque colonne numérique (nombres, ou texte au format français
+  "8 160 000" / "1 250,50", lu comme frame_dtypes.parse_french_numbers) et le
+  nombre de valeurs numériques sommées;
+- des sous-totaux par section (lignes et sommes): pour un relevé PDF, la section
+  est le numéro du bloc d'en-tête "N - Mutuelle Police";
+- une somme de contrôle des matricules: somme modulo 2^64 d'une empreinte 64 bits
+  de chaque matricule (indépendante de l'ordre des lignes, 2085524, 2085524.0 et
+  "2 085 524" donnent la même empreinte), avec le nombre de matricules renseignés.
+
+La feuille CONTROLE contient une ligne par mesure: FEUILLE, SECTION, MESURE,
+COLONNE, VALEUR. Deux classeurs se comparent ensuite sur leurs seules feuilles
+CONTROLE, sans relire aucune ligne de données:
+
+    python controle_totaux.py original.xlsx traite.xlsx [--feuille-a Sheet1] [--feuille-b SANS_DOUBLONS]
+"""
+
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+FEUILLE_CONTROLE = 'CONTROLE'
+COLONNES_CONTROLE = ['FEUILLE', 'SECTION', 'MESURE', 'COLONNE', 'VALEUR']
+SECTION_TOTALE = 'TOTAL'
+SANS_SECTION = 'sans section'
+# Matricule column when none is given: first column whose name contains one of these
+NOMS_MATRICULE = ('MATRICULE', 'REFERENCE')
+TOLERANCE = 1e-6
+
+
+def colonne_matricule_par_defaut(colonnes):
+    for nom in NOMS_MATRICULE:
+        for col in colonnes:
+            if nom in str(col).upper():
+                return col
+    return None
+
+
+def valeurs_numeriques(serie):
+    """Numbers of a column as float64 (NaN for non-numeric cells), French-formatted text parsed."""
+    from frame_dtypes import parse_french_numbers
+
+    if pd.api.types.is_bool_dtype(serie):
+        return np.full(len(serie), np.nan)
+    if pd.api.types.is_numeric_dtype(serie):
+        return pd.to_numeric(serie, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    valeurs = serie.astype(object)
+    genre = pd.api.types.infer_dtype(valeurs, skipna=True)
+    if genre in ('integer', 'floating', 'mixed-integer-float', 'decimal'):
+        return pd.to_numeric(valeurs, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    if genre not in ('string', 'mixed', 'mixed-integer'):
+        return np.full(len(serie), np.nan)
+    textes = np.array([isinstance(v, str) for v in valeurs], dtype=bool)
+    nombres = pd.to_numeric(valeurs.where(~textes), errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    if textes.any():
+        lus = parse_french_numbers(valeurs[textes])[0]
+        nombres[textes] = lus.astype('Float64').to_numpy(dtype='float64', na_value=np.nan)
+    return nombres
+
+
+def empreintes_matricules(serie):
+    """64-bit hash of each matricule (numbers by value, text stripped) and the mask of filled ones."""
+    nombres = valeurs_numeriques(serie)
+    texte = serie.astype('string').str.strip()
+    entiers = np.isfinite(nombres) & (np.mod(nombres, 1) == 0)
+    normalises = texte.astype(object).to_numpy()
+    normalises[entiers] = [str(int(v)) for v in nombres[entiers]]
+    decimaux = np.isfinite(nombres) & ~entiers
+    normalises[decimaux] = [repr(float(v)) for v in nombres[decimaux]]
+    renseignes = (texte.notna() & texte.ne('')).to_numpy(dtype=bool)
+    empreintes = pd.util.hash_array(np.where(renseignes, normalises, '').astype(object), categorize=False)
+    return empreintes, renseignes
+
+
+def _nombre(valeur):
+    """float sum -> int when integral, for readable cells."""
+    return int(valeur) if float(valeur).is_integer() and abs(valeur) < 2 ** 53 else float(valeur)
+
+
+class ControleTotaux:
+    """Control totals accumulated batch by batch with ``ajouter(frame, sections)``.
+
+    ``colonnes`` restricts the summed columns (default: every column holding numbers);
+    ``colonne_matricule`` is the column of the matricule checksum (default: first column
+    named like MATRICULE or REFERENCE, none if there is no such column).
+    """
+
+    def __init__(self, colonnes=None, colonne_matricule=None):
+        self.colonnes = list(colonnes) if colonnes is not None else None
+        self.colonne_matricule = colonne_matricule
+        self.lignes = 0
+        self.sommes = {}
+        self.comptes = {}
+        self.sections = {}
+        self.matricules = 0
+        self.checksum = np.uint64(0)
+
+    def ajouter(self, frame, sections=None):
+        """Add the rows of ``frame``; ``sections`` gives the section label of each row (None: no section)."""
+        self.lignes += len(frame)
+        if self.colonne_matricule is None:
+            self.colonne_matricule = colonne_matricule_par_defaut(frame.columns)
+        colonnes = [c for c in (self.colonnes or frame.columns) if c in frame.columns]
+        nombres = {}
+        for col in colonnes:
+            valeurs = valeurs_numeriques(frame[col])
+            presents = ~np.isnan(valeurs)
+            if presents.any() or col in self.sommes:
+                self.sommes[col] = self.sommes.get(col, 0.0) + float(valeurs[presents].sum())
+                self.comptes[col] = self.comptes.get(col, 0) + int(presents.sum())
+                nombres[col] = valeurs
+        if sections is not None and len(frame):
+            # One label for rows without a section (NaN keys would never match across batches)
+            labels = pd.Series(sections, dtype=object).fillna(SANS_SECTION).to_numpy(dtype=object)
+            par_section = pd.DataFrame(nombres, index=np.arange(len(frame))).groupby(labels, sort=False)
+            tailles = par_section.size()
+            sommes = par_section.sum(min_count=1)
+            for label, taille in tailles.items():
+                lignes, totaux = self.sections.setdefault(label, [0, {}])
+                self.sections[label][0] = lignes + int(taille)
+                for col in nombres:
+                    valeur = sommes.at[label, col]
+                    if not pd.isna(valeur):
+                        totaux[col] = totaux.get(col, 0.0) + float(valeur)
+        if self.colonne_matricule in frame.columns:
+            empreintes, renseignes = empreintes_matricules(frame[self.colonne_matricule])
+            self.matricules += int(renseignes.sum())
+            # Sum modulo 2^64 of the hashes: independent of row order and of how rows are batched
+            with np.errstate(over='ignore'):
+                self.checksum = np.uint64(self.checksum + empreintes[renseignes].sum(dtype=np.uint64))
+        return self
+
+    def renommer(self, noms):
+        """Rename summed columns (raw name -> final name), e.g. once streamed headers are finalized."""
+        self.sommes = {noms.get(c, c): v for c, v in self.sommes.items()}
+        self.comptes = {noms.get(c, c): v for c, v in self.comptes.items()}
+        self.sections = {s: [n, {noms.get(c, c): v for c, v in t.items()}] for s, (n, t) in self.sections.items()}
+        if self.colonne_matricule is not None:
+            self.colonne_matricule = noms.get(self.colonne_matricule, self.colonne_matricule)
+        return self
+
+    def lignes_controle(self, feuille):
+        """Rows of the CONTROLE sheet for data sheet ``feuille``."""
+        lignes = [(feuille, SECTION_TOTALE, 'LIGNES', '', self.lignes)]
+        for col, somme in self.sommes.items():
+            lignes.append((feuille, SECTION_TOTALE, 'SOMME', str(col), _nombre(somme)))
+            lignes.append((feuille, SECTION_TOTALE, 'VALEURS_NUMERIQUES', str(col), self.comptes[col]))
+        if self.colonne_matricule is not None:
+            lignes.append((feuille, SECTION_TOTALE, 'MATRICULES', str(self.colonne_matricule), self.matricules))
+            lignes.append((feuille, SECTION_TOTALE, 'CONTROLE_MATRICULES', str(self.colonne_matricule),
+                           f'{int(self.checksum):016x}'))
+        for section, (n, totaux) in self.sections.items():
+            label = str(section)
+            lignes.append((feuille, label, 'LIGNES', '', n))
+            for col, somme in totaux.items():
+                lignes.append((feuille, label, 'SOMME', str(col), _nombre(somme)))
+        return lignes
+
+
+def feuille_controle(controles):
+    """CONTROLE sheet from {data sheet name: ControleTotaux}."""
+    lignes = [ligne for feuille, controle in controles.items() for ligne in controle.lignes_controle(feuille)]
+    return pd.DataFrame(lignes, columns=COLONNES_CONTROLE)
+
+
+def controles_de_feuilles(feuilles, colonnes=None, colonne_matricule=None):
+    """{sheet: ControleTotaux} of DataFrames already in memory (one batch per sheet)."""
+    return {nom: ControleTotaux(colonnes, colonne_matricule).ajouter(df) for nom, df in feuilles.items()}
+
+
+def lire_controle(chemin):
+    """CONTROLE sheet of a workbook, read alone (the data sheets are not parsed)."""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(chemin, read_only=True, data_only=True)
+    try:
+        if FEUILLE_CONTROLE not in wb.sheetnames:
+            raise KeyError(f"{chemin}: pas de feuille {FEUILLE_CONTROLE}")
+        lignes = list(wb[FEUILLE_CONTROLE].iter_rows(min_row=2, values_only=True))
+    finally:
+        wb.close()
+    controle = pd.DataFrame([l[:len(COLONNES_CONTROLE)] for l in lignes if any(v is not None for v in l)],
+                            columns=COLONNES_CONTROLE)
+    controle['COLONNE'] = controle['COLONNE'].fillna('').astype(str)
+    return controle
+
+
+def _choisir_feuille(controle, feuille, chemin):
+    feuilles = list(dict.fromkeys(controle['FEUILLE']))
+    if feuille is None:
+        if len(feuilles) != 1:
+            raise ValueError(f"{chemin}: plusieurs feuilles contrôlées ({', '.join(map(str, feuilles))}), "
+                             f"préciser la feuille à comparer")
+        feuille = feuilles[0]
+    if feuille not in feuilles:
+        raise KeyError(f"{chemin}: feuille {feuille} absente de {FEUILLE_CONTROLE}")
+    return controle[controle['FEUILLE'] == feuille].drop(columns='FEUILLE')
+
+
+def comparer_controles(chemin_a, chemin_b, feuille_a=None, feuille_b=None):
+    """Compare the CONTROLE sheets of two workbooks: one row per measure with A, B, ECART and STATUT."""
+    a = _choisir_feuille(lire_controle(chemin_a), feuille_a, chemin_a)
+    b = _choisir_feuille(lire_controle(chemin_b), feuille_b, chemin_b)
+    comparaison = a.merge(b, on=['SECTION', 'MESURE', 'COLONNE'], how='outer', suffixes=('_A', '_B'), sort=False)
+    comparaison = comparaison.rename(columns={'VALEUR_A': 'A', 'VALEUR_B': 'B'})
+    num_a = pd.to_numeric(comparaison['A'], errors='coerce')
+    num_b = pd.to_numeric(comparaison['B'], errors='coerce')
+    numeriques = num_a.notna() & num_b.notna() & (comparaison['MESURE'] != 'CONTROLE_MATRICULES')
+    comparaison['ECART'] = (num_b - num_a).where(numeriques)
+    egal_num = (num_b - num_a).abs() <= TOLERANCE * np.maximum(1.0, np.maximum(num_a.abs(), num_b.abs()))
+    egal = np.where(numeriques, egal_num, comparaison['A'].astype(str) == comparaison['B'].astype(str))
+    comparaison['STATUT'] = np.select([comparaison['A'].isna(), comparaison['B'].isna(), egal],
+                                      ['absent de A', 'absent de B', 'identique'], 'différent')
+    return comparaison
+
+
+def afficher_comparaison(comparaison, chemin_a, chemin_b, max_sections=20):
+    """Print totals first, then section rows that differ (at most ``max_sections``)."""
+    print(f"A = {chemin_a}\nB = {chemin_b}")
+    totaux = comparaison[comparaison['SECTION'] == SECTION_TOTALE]
+    print(totaux.drop(columns='SECTION').to_string(index=False))
+    sections = comparaison[(comparaison['SECTION'] != SECTION_TOTALE) & (comparaison['STATUT'] != 'identique')]
+    n_sections = comparaison.loc[comparaison['SECTION'] != SECTION_TOTALE, 'SECTION'].nunique()
+    if n_sections:
+        print(f"\nSous-totaux par section: {n_sections} section(s), {len(sections)} mesure(s) différente(s)")
+        if len(sections):
+            print(sections.head(max_sections).to_string(index=False))
+            if len(sections) > max_sections:
+                print(f"... {len(sections) - max_sections} de plus")
+    differences = int((comparaison['STATUT'] != 'identique').sum())
+    if differences:
+        print(f"\n⚠️ {differences} mesure(s) de contrôle différente(s)")
+    else:
+        print("\n✅ Totaux de contrôle identiques")
+    return differences
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Comparer deux classeurs par leurs feuilles CONTROLE, sans relire les données.")
+    parser.add_argument('fichier_a', help='Premier classeur (référence)')
+    parser.add_argument('fichier_b', help='Second classeur')
+    parser.add_argument('--feuille-a', default=None, dest='feuille_a',
+                        help='Feuille contrôlée à comparer dans A (nécessaire si CONTROLE en décrit plusieurs)')
+    parser.add_argument('--feuille-b', default=None, dest='feuille_b', help='Feuille contrôlée à comparer dans B')
+    args = parser.parse_args()
+    comparaison = comparer_controles(args.fichier_a, args.fichier_b, args.feuille_a, args.feuille_b)
+    sys.exit(1 if afficher_comparaison(comparaison, args.fichier_a, args.fichier_b) else 0)
+
+
+if __name__ == '__main__':
+    main()
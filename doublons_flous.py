@@ -0,0 +1,281 @@
+"""
+Doublons approchés sur le nom d'agent (RECUP_NOM_AGENT(NO_MATRICULE)).
+
+Les contrôles exacts ne voient pas deux lignes dont le nom ne diffère que par
+des accents, des espaces, une initiale ("KOUASSI J." / "KOUASSI JEAN") ou une
+faute de frappe. Comparer chaque nom à tous les autres est en O(n²); on
+procède donc par blocs:
+
+1. les noms sont normalisés (accents retirés, majuscules, ponctuation -> espace,
+   espaces multiples réduits);
+2. les lignes sont regroupées en blocs candidats selon une ou plusieurs clés:
+   - matricule: préfixe de NO_MATRICULE (--prefixe chiffres);
+   - montant: même MT_MENSUALITE;
+   - phonetique: code Soundex du mot le plus long du nom;
+   - tokens: mots du nom triés (inversion nom/prénom, espaces, accents);
+   un bloc plus grand que --max-bloc est redécoupé par clé phonétique (par
+   première lettre du nom pour les blocs phonétiques), puis ignoré s'il reste
+   trop grand (compté dans les statistiques);
+3. seules les paires d'un même bloc sont comparées (difflib, meilleur score entre
+   noms normalisés, mots triés et initiales développées), gardées au-dessus du
+   seuil de similarité.
+
+Les paires candidates vont dans la feuille PAIRES_A_REVOIR (avec LIGNE_ORIGINE
+des deux lignes), les statistiques de blocs (tailles, comparaisons faites et
+évitées) dans STATS_BLOCS.
+
+    python doublons_flous.py precomptes_mupol.xlsx [--seuil 0.85] [--blocs matricule montant phonetique]
+"""
+
+import argparse
+import difflib
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+COLONNE_NOM = 'RECUP_NOM_AGENT(NO_MATRICULE)'
+COLONNE_MATRICULE = 'NO_MATRICULE'
+COLONNE_MONTANT = 'MT_MENSUALITE'
+STRATEGIES = ('matricule', 'montant', 'phonetique', 'tokens')
+DEFAULT_STRATEGIES = ('matricule', 'montant', 'phonetique')
+DEFAULT_SEUIL = 0.85
+DEFAULT_PREFIXE = 5
+DEFAULT_MAX_BLOC = 200
+
+_ALPHABET = {c: k for k, c in enumerate('ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 ')}
+
+_SOUNDEX = {c: str(d) for d, letters in enumerate(['AEIOUYHW', 'BFPV', 'CGJKQSXZ', 'DT', 'L', 'MN', 'R'])
+            for c in letters}
+
+
+def normaliser_noms(noms):
+    """Vectorized name normalization: accents removed, upper case, punctuation -> space, single spaces."""
+    s = pd.Series(noms, copy=False).astype('string').fillna('')
+    s = s.str.normalize('NFKD').str.encode('ascii', 'ignore').str.decode('ascii')
+    s = s.str.upper().str.replace(r'[^A-Z0-9]+', ' ', regex=True).str.strip()
+    return s.astype(object)
+
+
+def soundex(mot):
+    """Soundex code of an upper-case ASCII word ('' for an empty word)."""
+    lettres = [c for c in mot if c.isalpha()]
+    if not lettres:
+        return ''
+    code = lettres[0]
+    precedent = _SOUNDEX.get(lettres[0], '')
+    for c in lettres[1:]:
+        chiffre = _SOUNDEX.get(c, '')
+        if chiffre not in ('', '0') and chiffre != precedent:
+            code += chiffre
+        if c not in 'HW':
+            precedent = chiffre
+    return (code + '000')[:4]
+
+
+def cle_phonetique(nom):
+    mots = nom.split()
+    return soundex(max(mots, key=len)) if mots else ''
+
+
+def cle_tokens(nom):
+    return ' '.join(sorted(m for m in nom.split() if len(m) > 1))
+
+
+def _developper_initiales(mots_a, mots_b):
+    """Replace single-letter words of ``mots_a`` by a word of ``mots_b`` starting with that letter."""
+    out = []
+    for mot in mots_a:
+        if len(mot) == 1:
+            mot = next((m for m in mots_b if len(m) > 1 and m[0] == mot), mot)
+        out.append(mot)
+    return out
+
+
+def similarite(a, b):
+    """Best difflib ratio between normalized names, sorted words and initials expanded against the other name."""
+    if a == b:
+        return 1.0
+    mots_a, mots_b = a.split(), b.split()
+    meilleur = difflib.SequenceMatcher(None, a, b, autojunk=False).ratio()
+    tries_a, tries_b = ' '.join(sorted(mots_a)), ' '.join(sorted(mots_b))
+    if (tries_a, tries_b) != (a, b):
+        meilleur = max(meilleur, difflib.SequenceMatcher(None, tries_a, tries_b, autojunk=False).ratio())
+    if any(len(m) == 1 for m in mots_a + mots_b):
+        meilleur = max(meilleur, difflib.SequenceMatcher(
+            None, ' '.join(sorted(_developper_initiales(mots_a, mots_b))),
+            ' '.join(sorted(_developper_initiales(mots_b, mots_a))), autojunk=False).ratio())
+    return meilleur
+
+
+def _comptes_caracteres(noms):
+    """Character counts (A-Z, 0-9, space) of each normalized name, one row per name."""
+    comptes = np.zeros((len(noms), len(_ALPHABET)), dtype=np.int16)
+    for k, nom in enumerate(noms):
+        for c in nom:
+            comptes[k, _ALPHABET[c]] += 1
+    return comptes
+
+
+def cles_de_blocs(df, noms, strategie, prefixe=DEFAULT_PREFIXE):
+    """Block key of each row for one strategy (None = row not blocked)."""
+    if strategie == 'matricule':
+        matricules = pd.to_numeric(df[COLONNE_MATRICULE], errors='coerce')
+        # Rounded before the cast (a non-integral matricule would not cast); out-of-range values get no key
+        matricules = matricules.where(matricules.abs() < 1e18).round()
+        texte = matricules.astype('Int64').astype('string')
+        return texte.str.slice(0, prefixe).where(matricules.notna()).astype(object)
+    if strategie == 'montant':
+        montants = pd.to_numeric(df[COLONNE_MONTANT], errors='coerce')
+        return montants.astype(object).where(montants.notna(), None)
+    uniques = pd.unique(noms)
+    fonction = cle_phonetique if strategie == 'phonetique' else cle_tokens
+    table = {nom: fonction(nom) or None for nom in uniques}
+    return noms.map(table)
+
+
+def _blocs(positions_par_cle, sous_cles, max_bloc):
+    """Yield (positions, skipped): blocks of >= 2 rows, oversized ones split on ``sous_cles``."""
+    for positions in positions_par_cle:
+        if len(positions) < 2:
+            continue
+        if len(positions) <= max_bloc:
+            yield positions, False
+            continue
+        cles = sous_cles[positions]
+        for cle in pd.unique(cles):
+            sous_bloc = positions[cles == cle]
+            if len(sous_bloc) >= 2:
+                yield sous_bloc, len(sous_bloc) > max_bloc
+
+
+def paires_candidates(df, colonne_nom=COLONNE_NOM, strategies=DEFAULT_STRATEGIES, seuil=DEFAULT_SEUIL,
+                      prefixe=DEFAULT_PREFIXE, max_bloc=DEFAULT_MAX_BLOC):
+    """
+    Return (pairs, stats): pairs of row positions whose names are similar (>= ``seuil``) within at
+    least one block, as a DataFrame (pos_1, pos_2, SIMILARITE, BLOCS), and per-strategy block stats.
+
+    Oversized blocks are split on the phonetic key (on the first letter of the name for the
+    phonetique strategy). Pairs whose raw names are identical are left to the exact duplicate checks.
+    Within a block, the common-character bound 2*common/(len_a+len_b), an upper bound of every
+    difflib ratio without initials, is computed for all pairs at once; difflib only scores the pairs
+    that pass it, once per distinct pair of normalized names.
+    """
+    n = len(df)
+    codes_bruts = pd.factorize(df[colonne_nom].astype('string').fillna(''))[0]
+    noms = pd.Series(normaliser_noms(df[colonne_nom]).to_numpy(), index=np.arange(n))
+    codes, uniques = pd.factorize(noms)
+    comptes = _comptes_caracteres(uniques)
+    longueurs = comptes.sum(axis=1)
+    initiales_seules = np.array([any(len(m) == 1 for m in nom.split()) for nom in uniques], dtype=bool)
+    phonetiques = np.asarray(cles_de_blocs(df, noms, 'phonetique').fillna(''), dtype=object)
+    premieres_lettres = noms.str[:1].to_numpy()
+    total = n * (n - 1) // 2
+    toutes_comparees = []
+    gardees = {}
+    par_noms = {}
+    stats = []
+    for strategie in strategies:
+        start = time.perf_counter()
+        cles = pd.Series(np.asarray(cles_de_blocs(df, noms, strategie, prefixe), dtype=object))
+        cles = cles[cles.notna()]
+        groupes = list(cles.groupby(cles.to_numpy(), sort=False).indices.values())
+        tailles = [len(g) for g in groupes]
+        sous_cles = premieres_lettres if strategie == 'phonetique' else phonetiques
+        comparees = ignores = n_blocs = 0
+        positions_par_cle = (cles.index.to_numpy()[g] for g in groupes)
+        for positions, trop_grand in _blocs(positions_par_cle, sous_cles, max_bloc):
+            if trop_grand:
+                ignores += 1
+                continue
+            n_blocs += 1
+            positions = np.sort(positions)
+            gauche, droite = np.triu_indices(len(positions), k=1)
+            i, j = positions[gauche], positions[droite]
+            differents = codes_bruts[i] != codes_bruts[j]
+            i, j = i[differents], j[differents]
+            comparees += len(i)
+            toutes_comparees.append(i.astype(np.int64) * n + j)
+            ca, cb = codes[i], codes[j]
+            communs = np.minimum(comptes[ca], comptes[cb]).sum(axis=1)
+            borne = 2 * communs / np.maximum(longueurs[ca] + longueurs[cb], 1)
+            possibles = (borne >= seuil) | initiales_seules[ca] | initiales_seules[cb]
+            for pi, pj, ua, ub in zip(i[possibles].tolist(), j[possibles].tolist(),
+                                      ca[possibles].tolist(), cb[possibles].tolist()):
+                if (pi, pj) in gardees:
+                    if gardees[(pi, pj)][1][-1] != strategie:
+                        gardees[(pi, pj)][1].append(strategie)
+                    continue
+                cle_noms = (ua, ub) if ua <= ub else (ub, ua)
+                score = par_noms.get(cle_noms)
+                if score is None:
+                    score = par_noms[cle_noms] = similarite(uniques[ua], uniques[ub])
+                if score >= seuil:
+                    gardees[(pi, pj)] = (score, [strategie])
+        stats.append({'STRATEGIE': strategie, 'LIGNES_BLOQUEES': len(cles), 'BLOCS': len(tailles),
+                      'BLOCS_COMPARES': n_blocs, 'TAILLE_MAX': max(tailles, default=0),
+                      'TAILLE_MOYENNE': round(float(np.mean(tailles)), 2) if tailles else 0.0,
+                      'BLOCS_TROP_GRANDS_IGNORES': ignores, 'COMPARAISONS': comparees,
+                      'COMPARAISONS_EVITEES': total - comparees, 'SECONDES': round(time.perf_counter() - start, 3)})
+    distinctes = len(np.unique(np.concatenate(toutes_comparees))) if toutes_comparees else 0
+    stats.append({'STRATEGIE': 'TOTAL (paires distinctes)', 'LIGNES_BLOQUEES': n,
+                  'COMPARAISONS': distinctes, 'COMPARAISONS_EVITEES': total - distinctes})
+    stats = pd.DataFrame(stats).astype({'BLOCS': 'Int64', 'BLOCS_COMPARES': 'Int64', 'TAILLE_MAX': 'Int64',
+                                        'BLOCS_TROP_GRANDS_IGNORES': 'Int64'})
+    paires = pd.DataFrame([(i, j, s, '+'.join(blocs)) for (i, j), (s, blocs) in gardees.items()],
+                          columns=['pos_1', 'pos_2', 'SIMILARITE', 'BLOCS'])
+    paires = paires.astype({'pos_1': np.int64, 'pos_2': np.int64, 'SIMILARITE': float})
+    paires = paires.sort_values(['SIMILARITE', 'pos_1', 'pos_2'], ascending=[False, True, True], ignore_index=True)
+    return paires, stats
+
+
+def feuille_revue(df, paires, colonnes):
+    """Review sheet: LIGNE_ORIGINE and the given columns of both rows of each pair, side by side."""
+    revue = pd.DataFrame({'SIMILARITE': paires['SIMILARITE'].round(3), 'BLOCS': paires['BLOCS']})
+    for suffixe, pos in (('_1', paires['pos_1'].to_numpy()), ('_2', paires['pos_2'].to_numpy())):
+        revue['LIGNE_ORIGINE' + suffixe] = pos + 2
+        for col in colonnes:
+            revue[col + suffixe] = df[col].to_numpy()[pos]
+    ordre = ['SIMILARITE'] + [c + s for c in ['LIGNE_ORIGINE'] + list(colonnes) for s in ('_1', '_2')] + ['BLOCS']
+    return revue[ordre]
+
+
+def doublons_flous(fichier, fichier_sortie=None, colonne_nom=COLONNE_NOM, strategies=DEFAULT_STRATEGIES,
+                   seuil=DEFAULT_SEUIL, prefixe=DEFAULT_PREFIXE, max_bloc=DEFAULT_MAX_BLOC, feuille=0):
+    """Read ``fichier``, find fuzzy name duplicates block by block and write the review workbook."""
+    from xlsx_loader import read_excel_cached
+    from xlsx_writer import write_formatted_xlsx
+
+    fichier_sortie = fichier_sortie or os.path.splitext(fichier)[0] + '_doublons_flous.xlsx'
+    print(f"Lecture du fichier {fichier}...")
+    df = read_excel_cached(fichier, sheet_name=feuille)
+    print(f"🔎 Doublons approchés sur '{colonne_nom}' ({len(df)} lignes, blocs: {', '.join(strategies)}, "
+          f"seuil {seuil})")
+    paires, stats = paires_candidates(df, colonne_nom, strategies, seuil, prefixe, max_bloc)
+    print(stats.drop(columns=['SECONDES']).to_string(index=False))
+    colonnes = [c for c in (COLONNE_MATRICULE, colonne_nom, COLONNE_MONTANT, 'NOMBRE_AYANTS_DROIT') if c in df.columns]
+    revue = feuille_revue(df, paires, colonnes)
+    write_formatted_xlsx(fichier_sortie, {'PAIRES_A_REVOIR': revue, 'STATS_BLOCS': stats}, max_width=50)
+    print(f"\n✅ {len(paires)} paire(s) à revoir enregistrée(s) dans {fichier_sortie}")
+    return fichier_sortie
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Doublons approchés sur le nom d'agent, comparés par blocs.")
+    parser.add_argument('fichier', nargs='?', default='precomptes_mupol.xlsx', help='Classeur à analyser')
+    parser.add_argument('-o', '--output', default=None, help='Classeur de revue (défaut: <fichier>_doublons_flous.xlsx)')
+    parser.add_argument('--colonne', default=COLONNE_NOM, help='Colonne du nom')
+    parser.add_argument('--blocs', nargs='+', choices=STRATEGIES, default=list(DEFAULT_STRATEGIES),
+                        help='Clés de blocage (une paire est comparée si elle partage au moins un bloc)')
+    parser.add_argument('--seuil', type=float, default=DEFAULT_SEUIL, help='Similarité minimale (0-1)')
+    parser.add_argument('--prefixe', type=int, default=DEFAULT_PREFIXE,
+                        help='Chiffres du préfixe de NO_MATRICULE (blocs matricule)')
+    parser.add_argument('--max-bloc', type=int, default=DEFAULT_MAX_BLOC, dest='max_bloc',
+                        help='Taille maximale de bloc comparé (au-delà: redécoupage phonétique, puis ignoré)')
+    args = parser.parse_args()
+    doublons_flous(args.fichier, args.output, args.colonne, tuple(args.blocs), args.seuil, args.prefixe, args.max_bloc)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+"""
+Détection des doublons sur plusieurs jeux de clés à la fois.
+
+Les scripts de 16022026 et JAN_2026 cherchaient chacun leurs doublons à part
+(4 colonnes complètes, 3 colonnes partielles, MATRICULE seul, MATRICULE et
+toutes les colonnes), en relisant le classeur et en recalculant duplicated().
+Ici:
+
+- chaque colonne est codée une seule fois (pd.factorize: un code entier par
+  valeur distincte, égalité exacte comme duplicated()), puis le groupe d'un jeu
+  de clés est la combinaison des codes de ses colonnes: une seule passe sur les
+  données, quel que soit le nombre de jeux, sans collision possible;
+- pour chaque jeu: doublon oui/non, groupe (position de la première ligne du
+  groupe), numéro d'occurrence et taille du groupe, en un groupby;
+- les relations entre jeux se déduisent de ces résultats: quand les colonnes
+  d'un jeu A sont incluses dans celles d'un jeu B, tout doublon B est un
+  doublon A (B est un sur-ensemble de A), et « A seulement » = doublon A mais
+  pas B (doublons partiels uniquement, faux doublons de matricule...);
+- toutes les feuilles de résultat vont dans un seul classeur, avec la colonne
+  LIGNE_ORIGINE (numéro de ligne dans le classeur lu, en-tête = ligne 1), et une
+  feuille CONTROLE (controle_totaux) avec les totaux de contrôle du classeur lu
+  (ENTREE) et de chaque feuille de lignes.
+
+    python doublons_multicles.py precomptes_mupol.xlsx -o doublons.xlsx \\
+        --jeu COMPLETS=NO_MATRICULE,RECUP_NOM_AGENT(NO_MATRICULE),MT_MENSUALITE,NOMBRE_AYANTS_DROIT \\
+        --jeu PARTIELS=NO_MATRICULE,MT_MENSUALITE,NOMBRE_AYANTS_DROIT
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+# Key sets of precomptes_mupol.xlsx (16022026)
+COLONNES_TOUTES = ['NO_MATRICULE', 'RECUP_NOM_AGENT(NO_MATRICULE)', 'MT_MENSUALITE', 'NOMBRE_AYANTS_DROIT']
+COLONNES_PARTIELLES = ['NO_MATRICULE', 'MT_MENSUALITE', 'NOMBRE_AYANTS_DROIT']
+JEUX_PRECOMPTES = {'COMPLETS': COLONNES_TOUTES, 'PARTIELS': COLONNES_PARTIELLES}
+# Types applied when reading them (xlsx_loader: 'numeric' = to_numeric(errors='coerce'));
+# NOMBRE_AYANTS_DROIT is left as read, to keep texts such as "Montant invalide"
+TYPES_PRECOMPTES = {'NO_MATRICULE': 'numeric', 'RECUP_NOM_AGENT(NO_MATRICULE)': str, 'MT_MENSUALITE': 'numeric'}
+
+COLONNE_LIGNE = 'LIGNE_ORIGINE'
+MAX_LARGEUR = 50
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+def codes_colonnes(df, colonnes):
+    """Integer code of each value of each column (exact equality, missing values equal), every column coded once."""
+    return {col: pd.factorize(df[col], use_na_sentinel=False)[0].astype(np.int64) for col in dict.fromkeys(colonnes)}
+
+
+def combiner_codes(codes, colonnes):
+    """Exact group id of a key set from its column codes (re-coded after each column, so never overflows)."""
+    g = np.zeros(len(next(iter(codes.values()))), dtype=np.int64)
+    for col in colonnes:
+        c = codes[col]
+        g = pd.factorize(g * (int(c.max(initial=-1)) + 1) + c)[0].astype(np.int64)
+    return g
+
+
+def combiner_empreintes(empreintes, colonnes):
+    """Row hash of a key set from its column hashes (order-sensitive, vectorized)."""
+    h = np.zeros(len(next(iter(empreintes.values()))), dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for col in colonnes:
+            h ^= empreintes[col] + _MIX + (h << np.uint64(6)) + (h >> np.uint64(2))
+    return h
+
+
+def analyser_doublons(df, jeux, lignes=None):
+    """Duplicate analysis of ``df`` for each key set (dict name -> columns), columns coded once.
+
+    ``lignes`` (boolean mask) restricts the analysis to some rows; the others are never
+    duplicates (e.g. rows with a MATRICULE). Returns a dict name -> DataFrame indexed like
+    ``df``: doublon (bool, like duplicated(keep=False)), groupe (position of the group's
+    first row, -1 outside ``lignes``), occurrence (1, 2...) and nb (group size).
+    """
+    toutes = [col for colonnes in jeux.values() for col in colonnes]
+    manquantes = [col for col in dict.fromkeys(toutes) if col not in df.columns]
+    if manquantes:
+        raise KeyError(f"Colonnes manquantes: {manquantes}")
+    garder = np.ones(len(df), dtype=bool) if lignes is None else np.asarray(lignes, dtype=bool)
+    positions = np.flatnonzero(garder)
+    codes = codes_colonnes(df.iloc[positions], toutes)
+    resultats = {}
+    for nom, colonnes in jeux.items():
+        groupes = pd.Series(positions).groupby(combiner_codes(codes, colonnes), sort=False)
+        nb = np.zeros(len(df), dtype=np.int64)
+        groupe = np.full(len(df), -1, dtype=np.int64)
+        occurrence = np.zeros(len(df), dtype=np.int64)
+        nb[positions] = groupes.transform('size').to_numpy()
+        groupe[positions] = groupes.transform('first').to_numpy()
+        occurrence[positions] = groupes.cumcount().to_numpy() + 1
+        resultats[nom] = pd.DataFrame({'doublon': nb > 1, 'groupe': groupe, 'occurrence': occurrence, 'nb': nb},
+                                      index=df.index)
+    return resultats
+
+
+def relations(jeux):
+    """Pairs (A, B) where the columns of key set A are a strict subset of those of B: B duplicates are A duplicates."""
+    return [(a, b) for a, cols_a in jeux.items() for b, cols_b in jeux.items()
+            if a != b and set(cols_a) < set(cols_b)]
+
+
+def doublons_seulement(resultats, petit, grand):
+    """Rows duplicated on key set ``petit`` but not on its superset ``grand`` (e.g. partial-only duplicates)."""
+    return resultats[petit]['doublon'] & ~resultats[grand]['doublon']
+
+
+def sans_doublons(resultats, nom):
+    """Mask of rows kept when dropping ``nom`` duplicates (first occurrence kept, like drop_duplicates)."""
+    return resultats[nom]['occurrence'] <= 1
+
+
+def avec_ligne_origine(df, colonnes=None):
+    """Copy of ``df`` (or of some columns) with LIGNE_ORIGINE first: Excel row of each line (header = 1)."""
+    cols = list(df.columns) if colonnes is None else list(colonnes)
+    out = df[cols].copy()
+    out.insert(0, COLONNE_LIGNE, np.arange(len(df)) + 2)
+    return out
+
+
+def feuilles_resultats(df, jeux, resultats, colonnes=None, principal=None):
+    """
+    Result sheets for one workbook: RESUME, DOUBLONS_<jeu> (sorted by keys), <A>_SEULEMENT
+    for each subset relation and SANS_DOUBLONS on ``principal`` (default: the first key set).
+    """
+    donnees = avec_ligne_origine(df, colonnes)
+    principal = principal or next(iter(jeux))
+    resume = []
+    feuilles = {}
+    for nom, colonnes_jeu in jeux.items():
+        r = resultats[nom]
+        lignes = donnees[r['doublon'].to_numpy()]
+        lignes.insert(1, 'OCCURRENCE', r['occurrence'][r['doublon']].to_numpy())
+        feuilles[f'DOUBLONS_{nom}'[:31]] = lignes.sort_values(by=list(colonnes_jeu), kind='stable')
+        resume.append({'FEUILLE': f'DOUBLONS_{nom}'[:31], 'COLONNES': ', '.join(colonnes_jeu),
+                       'LIGNES': int(r['doublon'].sum()), 'GROUPES': int(r['groupe'][r['doublon']].nunique()),
+                       'LIGNES_EN_TROP': int((r['occurrence'] > 1).sum())})
+    for petit, grand in relations(jeux):
+        masque = doublons_seulement(resultats, petit, grand).to_numpy()
+        nom_feuille = f'{petit}_SEULEMENT'[:31] if len(relations(jeux)) == 1 else f'{petit}_SANS_{grand}'[:31]
+        feuilles[nom_feuille] = donnees[masque].sort_values(by=list(jeux[petit]), kind='stable')
+        resume.append({'FEUILLE': nom_feuille, 'COLONNES': f'doublons {petit} mais pas {grand}',
+                       'LIGNES': int(masque.sum()), 'GROUPES': int(resultats[petit]['groupe'][masque].nunique()),
+                       'LIGNES_EN_TROP': None})
+    feuilles['SANS_DOUBLONS'] = donnees[sans_doublons(resultats, principal).to_numpy()]
+    resume.append({'FEUILLE': 'SANS_DOUBLONS', 'COLONNES': f'première occurrence des doublons {principal}',
+                   'LIGNES': int(len(feuilles['SANS_DOUBLONS'])), 'GROUPES': None, 'LIGNES_EN_TROP': None})
+    resume = pd.DataFrame(resume).astype({'GROUPES': 'Int64', 'LIGNES_EN_TROP': 'Int64'})
+    return {'RESUME': resume, **feuilles}
+
+
+def ecrire_classeur(feuilles, chemin, controle=None):
+    """Write the result sheets, then ``controle`` (CONTROLE sheet DataFrame) when given."""
+    from controle_totaux import FEUILLE_CONTROLE
+    from xlsx_writer import write_formatted_xlsx
+
+    if controle is not None:
+        feuilles = {**feuilles, FEUILLE_CONTROLE: controle}
+    write_formatted_xlsx(chemin, feuilles, max_width=MAX_LARGEUR)
+    return chemin
+
+
+def doublons_multicles(fichier, jeux=None, fichier_sortie=None, feuille=0, principal=None):
+    """Read ``fichier``, analyse every key set in one pass and write all result sheets into one workbook."""
+    from xlsx_loader import read_excel_cached
+
+    jeux = jeux or JEUX_PRECOMPTES
+    fichier_sortie = fichier_sortie or os.path.splitext(fichier)[0] + '_doublons_multicles.xlsx'
+    print(f"Lecture du fichier {fichier}...")
+    df = read_excel_cached(fichier, sheet_name=feuille)
+    resultats = analyser_doublons(df, jeux)
+    feuilles = feuilles_resultats(df, jeux, resultats, principal=principal)
+    print(feuilles['RESUME'].to_string(index=False))
+    # Totals of the input and of each row sheet, on the input's columns (LIGNE_ORIGINE, OCCURRENCE left out)
+    from controle_totaux import controles_de_feuilles, feuille_controle
+
+    lignes = {nom: f for nom, f in feuilles.items() if nom != 'RESUME'}
+    controle = feuille_controle(controles_de_feuilles({'ENTREE': df, **lignes}, colonnes=df.columns))
+    ecrire_classeur(feuilles, fichier_sortie, controle)
+    print(f"\n✅ {len(feuilles)} feuilles enregistrées dans {fichier_sortie}")
+    return fichier_sortie
+
+
+def _jeu(texte):
+    nom, sep, colonnes = texte.partition('=')
+    if not sep or not colonnes:
+        raise argparse.ArgumentTypeError(f"jeu de clés attendu sous la forme NOM=col1,col2: {texte}")
+    return nom.strip(), [c.strip() for c in colonnes.split(',')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Doublons sur plusieurs jeux de clés, en une passe, dans un classeur.")
+    parser.add_argument('fichier', nargs='?', default='precomptes_mupol.xlsx', help='Classeur à analyser')
+    parser.add_argument('-o', '--output', default=None, help='Classeur de résultats (défaut: <fichier>_doublons_multicles.xlsx)')
+    parser.add_argument('--feuille', default=0, help='Feuille à lire (défaut: la première)')
+    parser.add_argument('--jeu', action='append', type=_jeu, default=None, metavar='NOM=col1,col2',
+                        help='Jeu de clés (répétable); défaut: COMPLETS (4 colonnes) et PARTIELS (3 colonnes)')
+    parser.add_argument('--principal', default=None, help='Jeu utilisé pour la feuille SANS_DOUBLONS (défaut: le premier)')
+    args = parser.parse_args()
+    doublons_multicles(args.fichier, dict(args.jeu) if args.jeu else None, args.output, args.feuille, args.principal)
+
+
+if __name__ == '__main__':
+    main()
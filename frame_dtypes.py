@@ -0,0 +1,178 @@
+"""
+Typage vectorisé des colonnes de montants et d'identifiants des relevés.
+
+Les tables Camelot ne contiennent que du texte: "8 160 000" (espaces ou espaces
+insécables comme séparateurs de milliers), "1 250,50", "0012345"... Ce module
+repère, colonne par colonne, celles dont presque toutes les cellules non vides
+sont des nombres (même heuristique que NUM_LIKE_RE du convertisseur) et les
+convertit en une seule passe pandas:
+
+- entiers -> Int64 (entier nullable), nombres à décimales -> Float64;
+- colonnes d'identifiants avec zéros en tête ("0012345") laissées en texte,
+  pour ne pas perdre ces zéros;
+- cellules non convertibles d'une colonne convertie (reste d'en-tête, texte
+  parasite) comptées et échantillonnées dans un rapport, enregistré à côté
+  du classeur (<sortie>_types.json).
+
+Le classeur Excel reçoit alors de vraies cellules numériques.
+
+compact_frame réduit par ailleurs la mémoire du tableau fusionné sans changer
+son contenu: colonnes texte répétitives en 'category', colonnes numériques
+entières en entier nullable le plus petit possible (Int8...Int64), autres
+colonnes texte en dtype 'string' quand pyarrow est installé (sans pyarrow, le
+dtype 'string' stocke les mêmes objets Python et n'apporte rien: elles restent
+'object').
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+# Whole (trimmed) cell: optional sign, digits either ungrouped or in groups of three
+# separated by one space (NBSP and narrow NBSP included), optional decimal part with
+# comma or dot. "8 160 000 10 000" (two amounts in one cell) does not match.
+NUMBER_PATTERN = r'-?(?:\d{1,3}(?:[ \u00a0\u202f]\d{3})+|\d+)(?:[.,]\d{1,2})?'
+LEADING_ZERO_PATTERN = r'-?0\d'
+# More integer digits than Int64 always holds: a reference number, not an amount (left as text)
+MAX_INTEGER_DIGITS = 18
+DEFAULT_MIN_SHARE = 0.9
+DEFAULT_MAX_CATEGORY_SHARE = 0.5
+NULLABLE_INTS = ('Int8', 'Int16', 'Int32', 'Int64')
+REPORT_EXAMPLES = 10
+
+
+def parse_french_numbers(values):
+    """Parse French-formatted numbers, vectorized.
+
+    Returns (parsed, unparseable, identifier): parsed is Int64 when no value has a
+    decimal part, Float64 otherwise; unparseable flags non-empty cells that are not
+    numbers; identifier flags numbers written as identifiers: with leading zeros, or with
+    more than MAX_INTEGER_DIGITS integer digits (those are left <NA> in parsed).
+    """
+    text = pd.Series(values, copy=False).astype('string').str.strip()
+    empty = text.isna() | text.eq('')
+    ok = text.str.fullmatch(NUMBER_PATTERN).fillna(False).astype(bool)
+    # Thousands separators removed only once the grouping has been validated
+    numbers = text.where(ok).str.replace(r'\s', '', regex=True)
+    # Checked before the cast: Int64 overflows past 19 digits
+    too_long = (ok & numbers.str.replace(r'^-|[.,]\d*$', '', regex=True).str.len().gt(MAX_INTEGER_DIGITS)
+                .fillna(False)).astype(bool)
+    numbers = numbers.where(~too_long)
+    has_decimals = numbers.str.contains(r'[.,]', regex=True).fillna(False).astype(bool)
+    if has_decimals.any():
+        parsed = numbers.str.replace(',', '.', regex=False).astype('Float64')
+    else:
+        parsed = numbers.astype('Int64')
+    identifier = (ok & text.str.match(LEADING_ZERO_PATTERN).fillna(False)).astype(bool) | too_long
+    return parsed, (~empty & ~ok).astype(bool), identifier
+
+
+def convert_numeric_columns(df, min_share=DEFAULT_MIN_SHARE):
+    """Return (frame with amount/number columns typed, report).
+
+    A text column is converted when at least ``min_share`` of its non-empty cells
+    parse as numbers and none of them is an identifier (leading zeros, too many
+    digits). The report maps each converted column to its dtype, parsed/unparseable
+    counts and a few examples of unparseable cells (row index, value); those cells
+    become <NA>.
+    """
+    out = df.copy()
+    report = {}
+    for i, col in enumerate(df.columns):
+        values = df.iloc[:, i]
+        if not (pd.api.types.is_object_dtype(values) or pd.api.types.is_string_dtype(values)
+                or isinstance(values.dtype, pd.CategoricalDtype)):
+            continue
+        parsed, unparseable, identifier = parse_french_numbers(values)
+        n_numbers = int(parsed.notna().sum())
+        n_bad = int(unparseable.sum())
+        if n_numbers == 0 or n_numbers < min_share * (n_numbers + n_bad) or identifier.any():
+            continue
+        parsed.index = df.index
+        out.isetitem(i, parsed)
+        bad = values[unparseable.to_numpy()]
+        report[str(col)] = {'dtype': str(parsed.dtype), 'parsed': n_numbers, 'unparseable': n_bad,
+                            'examples': [[int(k) if isinstance(k, int) else str(k), str(v)]
+                                         for k, v in bad.head(REPORT_EXAMPLES).items()]}
+    return out, report
+
+
+def print_type_report(report):
+    if not report:
+        print("🔢 Aucune colonne numérique détectée.")
+        return
+    n_bad = sum(r['unparseable'] for r in report.values())
+    print(f"🔢 {len(report)} colonne(s) typée(s) en nombres, {n_bad} cellule(s) non convertible(s):")
+    for col, r in report.items():
+        print(f"   {col}: {r['dtype']} ({r['parsed']} valeur(s), {r['unparseable']} non convertible(s))")
+
+
+def save_type_report(report, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def frame_memory_mb(df):
+    return df.memory_usage(index=True, deep=True).sum() / (1024 * 1024)
+
+
+def _string_dtype():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return None
+    return 'string[pyarrow]'
+
+
+def _smallest_nullable_int(values):
+    """Smallest nullable integer dtype holding ``values`` (numeric, integral), or None."""
+    finite = values.dropna()
+    if len(finite) and not np.array_equal(finite, np.floor(finite)):
+        return None
+    low, high = (finite.min(), finite.max()) if len(finite) else (0, 0)
+    for dtype in NULLABLE_INTS:
+        info = np.iinfo(dtype.lower())
+        if info.min <= low and high <= info.max:
+            return dtype
+    return None
+
+
+def compact_frame(df, max_category_share=DEFAULT_MAX_CATEGORY_SHARE):
+    """Return (frame with compact dtypes, {column: new dtype}); cell values are unchanged.
+
+    Text columns whose distinct values are at most ``max_category_share`` of their
+    non-empty cells become 'category'; integral numeric columns get the smallest
+    nullable integer dtype; other text columns become 'string' when pyarrow provides
+    a compact storage for it.
+    """
+    out = df.copy()
+    changes = {}
+    string_dtype = _string_dtype()
+    for i, col in enumerate(df.columns):
+        values = df.iloc[:, i]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            continue
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            dtype = _smallest_nullable_int(values)
+        elif pd.api.types.is_object_dtype(values) and pd.api.types.infer_dtype(values, skipna=True) in ('string', 'empty'):
+            n_values = int(values.notna().sum())
+            if n_values and values.nunique(dropna=True) <= max_category_share * n_values:
+                dtype = 'category'
+            else:
+                dtype = string_dtype
+        else:
+            dtype = None
+        if dtype is None or str(values.dtype) == dtype:
+            continue
+        out.isetitem(i, values.astype(dtype))
+        changes[str(col)] = dtype
+    return out, changes
+
+
+def print_compaction(before_mb, after_mb, changes):
+    by_dtype = {}
+    for dtype in changes.values():
+        by_dtype[dtype] = by_dtype.get(dtype, 0) + 1
+    detail = ', '.join(f"{n} en {dtype}" for dtype, n in sorted(by_dtype.items())) or 'aucune colonne modifiée'
+    print(f"🗜️ Mémoire du tableau fusionné: {before_mb:.1f} Mo -> {after_mb:.1f} Mo ({detail})")
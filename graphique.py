@@ -1,25 +1,41 @@
-import matplotlib.pyplot as plt
+import sys
 
 annees = [2015, 2016, 2017, 2018, 2019, 2020, 2021, 2022, 2023, 2024, 2025]
 tt_type = [755, 864, 1130, 1480, 1960, 2310, 3010, 3220, 5280, 7850, 5820]
 slr = [31, 37, 49, 69, 88, 166, 227, 262, 546, 935, 1050]
 
-fig, ax1 = plt.subplots()
 
-# Courbe TT TYPE
-l1, = ax1.plot(annees, tt_type, marker='o', label='TT TYPE')
-ax1.set_xlabel('Année')
-ax1.set_ylabel('TT TYPE')
+def tracer_graphique(fichier_sortie=None):
+    """Trace TT TYPE et SLR (deux axes); enregistre dans fichier_sortie si donné, sinon affiche."""
+    import matplotlib
+    if fichier_sortie:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
 
-# Deuxième axe
-ax2 = ax1.twinx()
+    fig, ax1 = plt.subplots()
 
-# Courbe SLR
-l2, = ax2.plot(annees, slr, marker='s', linestyle='--', color='red', label='SLR')
-ax2.set_ylabel('SLR', color='red')
+    # Courbe TT TYPE
+    l1, = ax1.plot(annees, tt_type, marker='o', label='TT TYPE')
+    ax1.set_xlabel('Année')
+    ax1.set_ylabel('TT TYPE')
 
-# Fusionner les deux légendes
-plt.legend(handles=[l1, l2], loc='upper left')
+    # Deuxième axe
+    ax2 = ax1.twinx()
 
-plt.title("Évolution de TT TYPE et SLR (2015-2025)")
-plt.show()
+    # Courbe SLR
+    l2, = ax2.plot(annees, slr, marker='s', linestyle='--', color='red', label='SLR')
+    ax2.set_ylabel('SLR', color='red')
+
+    # Fusionner les deux légendes
+    plt.legend(handles=[l1, l2], loc='upper left')
+
+    plt.title("Évolution de TT TYPE et SLR (2015-2025)")
+    if fichier_sortie:
+        fig.savefig(fichier_sortie, bbox_inches='tight')
+        print(f"✅ Graphique enregistré: {fichier_sortie}")
+    else:
+        plt.show()
+
+
+if __name__ == "__main__":
+    tracer_graphique(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,144 @@
+"""
+Reconversion incrémentale page par page des relevés révisés.
+
+Chaque page du PDF reçoit une empreinte (sha256 de son flux de contenu, de sa
+MediaBox et de sa rotation, lus avec pypdf). Les tables brutes extraites de
+chaque page sont gardées à côté du fichier Excel, dans un dossier
+'<sortie>_pages/':
+
+    index.json          empreintes par page + paramètres d'extraction
+    page-0001.json.gz   grilles des tables de la page (format camelot_cache)
+
+À la conversion suivante vers la même sortie, seules les pages dont l'empreinte
+a changé (ou nouvelles) sont réanalysées par Camelot; les autres sont relues
+depuis ce dossier et l'ensemble est recomposé dans l'ordre des pages avant le
+nettoyage habituel. Si les paramètres d'extraction changent, tout est réanalysé.
+
+Limite: une page dont seules les ressources changent (police, image référencée)
+sans modification de son flux de contenu garde la même empreinte.
+"""
+
+import glob
+import gzip
+import hashlib
+import json
+import os
+
+from camelot_cache import record_to_table, table_to_record
+
+SIDECAR_VERSION = 1
+
+
+def sidecar_dir(excel_path):
+    return os.path.splitext(excel_path)[0] + '_pages'
+
+
+def page_fingerprints(pdf_path, page_numbers):
+    """{page: sha256 of the page's content stream, MediaBox and rotation} for 1-based page numbers."""
+    from pypdf import PdfReader
+
+    reader = PdfReader(pdf_path)
+    fingerprints = {}
+    for p in page_numbers:
+        page = reader.pages[p - 1]
+        contents = page.get_contents()
+        h = hashlib.sha256(contents.get_data() if contents is not None else b'')
+        h.update(repr(([float(v) for v in page.mediabox], page.get('/Rotate', 0))).encode('ascii'))
+        fingerprints[p] = h.hexdigest()
+    return fingerprints
+
+
+def _page_file(directory, page):
+    return os.path.join(directory, f"page-{int(page):04d}.json.gz")
+
+
+def load_index(directory):
+    try:
+        with open(os.path.join(directory, 'index.json'), encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return index if index.get('version') == SIDECAR_VERSION else None
+
+
+def _load_page_entry(directory, page):
+    try:
+        with gzip.open(_page_file(directory, page), 'rt', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError, EOFError):
+        return None
+
+
+def _atomic_write(path, data):
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _write_sidecar(directory, params, fingerprints, entries):
+    """Write changed page entries then the index; remove entries of pages no longer present."""
+    os.makedirs(directory, exist_ok=True)
+    for p, entry in entries.items():
+        payload = json.dumps(entry, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        _atomic_write(_page_file(directory, p), gzip.compress(payload, mtime=0))
+    keep = {os.path.basename(_page_file(directory, p)) for p in fingerprints}
+    for path in glob.glob(os.path.join(directory, 'page-*.json.gz')):
+        if os.path.basename(path) not in keep:
+            os.remove(path)
+    index = {'version': SIDECAR_VERSION, 'params': params,
+             'pages': {str(p): fp for p, fp in fingerprints.items()}}
+    _atomic_write(os.path.join(directory, 'index.json'), json.dumps(index, indent=1, sort_keys=True).encode('utf-8'))
+
+
+def read_tables_incremental(pdf_path, excel_path, page_numbers, read_tables, params=None, text_sink=None):
+    """Tables of ``page_numbers``, re-extracting only pages changed since the last run to ``excel_path``.
+
+    ``read_tables(pages_spec, text_sink, errors)`` performs the real extraction for a
+    page spec such as '3,4,9' and returns a table list (None: no table on these pages).
+    Extraction errors are appended to the ``errors`` list: then only the pages that got
+    tables are cached, the others are re-parsed next run instead of being reused as
+    empty. With ``text_sink`` (a dict) page text lines are stored in the sidecar too and
+    copied back for reused pages. Returns (tables sorted by page/order, reused page
+    count, re-parsed page count).
+    """
+    directory = sidecar_dir(excel_path)
+    params = params or {}
+    with_text = text_sink is not None
+    fingerprints = page_fingerprints(pdf_path, page_numbers)
+    index = load_index(directory)
+    previous = index['pages'] if index and index.get('params') == params else {}
+
+    tables = []
+    changed = []
+    for p in page_numbers:
+        entry = _load_page_entry(directory, p) if previous.get(str(p)) == fingerprints[p] else None
+        if entry is None or (with_text and entry.get('text') is None):
+            changed.append(p)
+            continue
+        tables.extend(record_to_table(r, p) for r in entry['tables'])
+        if with_text:
+            text_sink[p] = entry['text']
+
+    fresh_entries = {}
+    if changed:
+        fresh_text = {} if with_text else None
+        errors = []
+        fresh = read_tables(','.join(str(p) for p in changed), fresh_text, errors)
+        fresh_entries = {p: {'tables': [], 'text': fresh_text.get(p) if with_text else None} for p in changed}
+        for t in fresh or []:
+            if int(t.page) in fresh_entries:
+                fresh_entries[int(t.page)]['tables'].append(table_to_record(t))
+        for p, entry in fresh_entries.items():
+            tables.extend(record_to_table(r, p) for r in entry['tables'])
+            if with_text and entry['text'] is not None:
+                text_sink[p] = entry['text']
+        if errors:
+            # A page left without tables by a failed extraction is not known to be empty: not cached
+            failed = {p for p, entry in fresh_entries.items() if not entry['tables']}
+            fresh_entries = {p: entry for p, entry in fresh_entries.items() if p not in failed}
+            fingerprints = {p: fp for p, fp in fingerprints.items() if p not in failed}
+
+    # Pages without a fresh entry keep their sidecar file as is; failed pages are left out of the index
+    _write_sidecar(directory, params, fingerprints, fresh_entries)
+    return sorted(tables), len(page_numbers) - len(changed), len(changed)
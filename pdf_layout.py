@@ -0,0 +1,78 @@
+"""
+Couche de mise en page partagée: une seule analyse pdfminer par page.
+
+Camelot analyse déjà chaque page avec pdfminer (caractères, lignes de texte,
+images). Ce module garde ce résultat et s'en sert pour deux usages:
+- extraire les tables (parseurs Camelot alimentés avec la mise en page calculée),
+- reconstruire le texte de la page comme pdfplumber le ferait (extract_text),
+au lieu de rouvrir le PDF avec pdfplumber et de refaire l'analyse.
+
+S'appuie sur PDFHandler._save_page de camelot-py 1.0.0 (version épinglée dans
+requirements.txt).
+"""
+
+import os
+from collections import namedtuple
+
+from camelot.core import TableList
+from camelot.handlers import PARSERS, PDFHandler
+from camelot.utils import TemporaryDirectory
+from pdfplumber.utils import extract_text
+
+PageLayout = namedtuple('PageLayout', 'page path layout dimensions images chars horizontal_text vertical_text')
+
+
+def load_page_layout(handler, page, tempdir, layout_kwargs=None):
+    """Write page ``page`` to ``tempdir`` and run pdfminer layout analysis on it once."""
+    layout, dimensions, images, chars, horizontal_text, vertical_text = handler._save_page(
+        handler.filepath, page, tempdir, **(layout_kwargs or {}))
+    path = os.path.join(tempdir, f"page-{page}.pdf")
+    return PageLayout(page, path, layout, dimensions, images, chars, horizontal_text, vertical_text)
+
+
+def page_text_lines(page_layout):
+    """Non-empty, stripped text lines of a page, clustered like pdfplumber's extract_text()."""
+    height = page_layout.dimensions[1]
+    chars = []
+    for c in page_layout.chars:
+        top = height - c.y1
+        chars.append({'text': c.get_text(), 'x0': c.x0, 'x1': c.x1, 'top': top, 'doctop': top,
+                      'bottom': height - c.y0, 'upright': c.upright, 'size': c.size, 'fontname': c.fontname})
+    text = extract_text(chars) if chars else ''
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+
+def extract_page_tables(page_layout, parser, layout_kwargs=None):
+    """Run an already-built Camelot parser on a precomputed page layout."""
+    parser.prepare_page_parse(page_layout.path, page_layout.layout, page_layout.dimensions, page_layout.page,
+                              page_layout.images, page_layout.horizontal_text, page_layout.vertical_text,
+                              layout_kwargs=layout_kwargs or {})
+    return parser.extract_tables()
+
+
+def iter_page_layouts(pdf_path, pages="all", layout_kwargs=None):
+    """Yield the PageLayout of each page in turn (one page on disk/in memory at a time)."""
+    handler = PDFHandler(pdf_path, pages=pages)
+    with TemporaryDirectory() as tempdir:
+        for p in handler.pages:
+            page_layout = load_page_layout(handler, p, tempdir, layout_kwargs)
+            yield page_layout
+            try:
+                os.remove(page_layout.path)
+            except OSError:
+                pass
+
+
+def read_pdf_with_text(pdf_path, pages="all", flavor="stream", layout_kwargs=None, **kwargs):
+    """Equivalent of camelot.read_pdf that also returns each page's text lines.
+
+    Each page is laid out once; tables and text are both derived from that layout.
+    Returns (camelot.TableList, {page_number: [lines]}).
+    """
+    parser = PARSERS[flavor](**kwargs)
+    tables = []
+    text_by_page = {}
+    for page_layout in iter_page_layouts(pdf_path, pages, layout_kwargs):
+        text_by_page[page_layout.page] = page_text_lines(page_layout)
+        tables.extend(extract_page_tables(page_layout, parser, layout_kwargs))
+    return TableList(sorted(tables)), text_by_page
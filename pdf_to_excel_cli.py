@@ -0,0 +1,196 @@
+"""
+Point d'entrée unique des outils PDF_TO_EXCEL, à démarrage rapide.
+
+    python pdf_to_excel_cli.py convert JAN_2026.pdf -o resultat_jan_2026.xlsx [options de pdf_to_excel_dec2025]
+    python pdf_to_excel_cli.py nomenclature [PDF] [-o nomenclature_complete.xlsx] [--gabarits JSON] [--famille NOM]
+    python pdf_to_excel_cli.py doublons {colonne,adherents,supprimer,precomptes,feuilles,multicles,flous} ...
+    python pdf_to_excel_cli.py totaux [ORIGINAL] [TRAITE] [--feuille SANS_DOUBLONS]
+    python pdf_to_excel_cli.py controle A.xlsx B.xlsx [--feuille-a Sheet1] [--feuille-b SANS_DOUBLONS]
+    python pdf_to_excel_cli.py rapprochement MOIS1.xlsx MOIS2.xlsx [...] [-o rapprochement_mensuel.xlsx]
+    python pdf_to_excel_cli.py graph [-o graphique.png]
+
+Seuls argparse et la bibliothèque standard sont importés au démarrage: chaque
+sous-commande importe ses dépendances lourdes (Camelot, pdfplumber, pandas,
+matplotlib) au moment de s'exécuter, si bien que --help et les vérifications de
+doublons, qui n'ouvrent aucun PDF, ne chargent jamais Camelot.
+Les scripts des dossiers JAN_2026 et 16022026 (noms non importables) sont
+chargés par chemin de fichier.
+"""
+
+import argparse
+import importlib.util
+import os
+import runpy
+import sys
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+PROG = 'python pdf_to_excel_cli.py'
+
+
+def load_script(relpath):
+    """Import a repo script by file path (works for folders such as 16022026 that are not valid package names)."""
+    path = os.path.join(REPO_DIR, relpath)
+    name = '_pdf_to_excel_' + os.path.splitext(relpath)[0].replace(os.sep, '_').replace('/', '_')
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_script(relpath, argv=()):
+    """Run a module-level script (no main function) as if launched with python script argv..."""
+    path = os.path.join(REPO_DIR, relpath)
+    saved_argv = sys.argv
+    sys.argv = [path] + [str(a) for a in argv]
+    try:
+        runpy.run_path(path, run_name='__main__')
+    finally:
+        sys.argv = saved_argv
+
+
+def cmd_convert(args, rest):
+    if REPO_DIR not in sys.path:
+        sys.path.insert(0, REPO_DIR)
+    from pdf_to_excel_dec2025 import main as convert_main
+    convert_main(rest, prog=f'{PROG} convert')
+
+
+def cmd_nomenclature(args, rest):
+    module = load_script(os.path.join('NOMENCLATURE_ANRP_2024', 'pdf_to_excel_complet.py'))
+    layouts_path = None if args.sans_gabarit else (args.gabarits or module.DEFAULT_LAYOUTS_PATH)
+    module.pdf_to_excel(args.pdf, args.output, layouts_path, args.famille)
+
+
+def cmd_doublons(args, rest):
+    if args.mode == 'colonne':
+        module = load_script(os.path.join('JAN_2026', 'verifier_doublons.py'))
+        module.verifier_doublons(args.fichier or 'resultat_jan_2026.xlsx', args.colonne or 'col', args.top)
+    elif args.mode == 'adherents':
+        module = load_script(os.path.join('JAN_2026', 'verifier_doublons_adherents.py'))
+        module.verifier_doublons_adherents(args.fichier or 'ADHERENTS_JAN2026.xlsx', args.colonne or 'MATRICULE',
+                                           args.top)
+    elif args.mode == 'supprimer':
+        module = load_script(os.path.join('JAN_2026', 'supprimer_doublons_adherents.py'))
+        module.supprimer_doublons_adherents(args.fichier or 'ADHERENTS_JAN2026.xlsx', args.colonne or 'MATRICULE')
+    elif args.mode == 'multicles':
+        if REPO_DIR not in sys.path:
+            sys.path.insert(0, REPO_DIR)
+        from doublons_multicles import doublons_multicles
+        doublons_multicles(args.fichier or 'precomptes_mupol.xlsx')
+    elif args.mode == 'flous':
+        if REPO_DIR not in sys.path:
+            sys.path.insert(0, REPO_DIR)
+        from doublons_flous import COLONNE_NOM, DEFAULT_SEUIL, doublons_flous
+        doublons_flous(args.fichier or 'precomptes_mupol.xlsx', colonne_nom=args.colonne or COLONNE_NOM,
+                       seuil=DEFAULT_SEUIL if args.seuil is None else args.seuil)
+    elif args.mode == 'precomptes':
+        run_script(os.path.join('16022026', 'verifier_doublons.py'), [args.top])
+    else:
+        run_script(os.path.join('16022026', 'ajouter_feuilles_doublons.py'))
+
+
+def cmd_totaux(args, rest):
+    module = load_script(os.path.join('16022026', 'verifier_totaux.py'))
+    module.verifier_totaux(args.original, args.traite, args.feuille)
+
+
+def cmd_controle(args, rest):
+    if REPO_DIR not in sys.path:
+        sys.path.insert(0, REPO_DIR)
+    from controle_totaux import afficher_comparaison, comparer_controles
+    comparaison = comparer_controles(args.fichier_a, args.fichier_b, args.feuille_a, args.feuille_b)
+    if afficher_comparaison(comparaison, args.fichier_a, args.fichier_b):
+        sys.exit(1)
+
+
+def cmd_rapprochement(args, rest):
+    if len(args.fichiers) < 2:
+        raise SystemExit(f"{PROG} rapprochement: au moins deux fichiers mensuels sont nécessaires")
+    if REPO_DIR not in sys.path:
+        sys.path.insert(0, REPO_DIR)
+    from rapprochement_mensuel import rapprochement_mensuel
+    rapprochement_mensuel(args.fichiers, args.output, feuille=args.feuille)
+
+
+def cmd_graph(args, rest):
+    module = load_script('graphique.py')
+    module.tracer_graphique(args.output)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog=PROG, description="Outils PDF_TO_EXCEL: conversion des relevés PDF, "
+                                                            "nomenclature ANRP, doublons, totaux, graphique.")
+    sub = parser.add_subparsers(dest='command', metavar='COMMANDE')
+    sub.required = True
+
+    # Options are parsed by pdf_to_excel_dec2025 itself ('convert --help' lists them)
+    p = sub.add_parser('convert', add_help=False, help='Convertir un relevé PDF en Excel (pdf_to_excel_dec2025)')
+    p.set_defaults(func=cmd_convert, passthrough=True)
+
+    p = sub.add_parser('nomenclature', help='Extraire la nomenclature ANRP (NOMENCLATURE_ANRP_2024/pdf_to_excel_complet)')
+    p.add_argument('pdf', nargs='?', default='NOMENCLATURE_NATIONALE_ANRP _ 2024.pdf', help='PDF de la nomenclature')
+    p.add_argument('-o', '--output', default='nomenclature_complete.xlsx', help='Fichier Excel de sortie')
+    p.add_argument('--gabarits', default=None, metavar='JSON',
+                   help='Fichier des gabarits de mise en page (défaut: ~/.cache/pdf_to_excel/nomenclature_layouts.json)')
+    p.add_argument('--famille', default=None,
+                   help="Famille de documents du gabarit (défaut: nom du PDF sans l'année)")
+    p.add_argument('--sans-gabarit', action='store_true', dest='sans_gabarit',
+                   help="Ne pas lire ni enregistrer de gabarit (colonnes apprises sur la première page d'en-tête)")
+    p.set_defaults(func=cmd_nomenclature)
+
+    p = sub.add_parser('doublons', help='Vérifier ou supprimer les doublons (JAN_2026, 16022026)')
+    p.add_argument('mode', choices=['colonne', 'adherents', 'supprimer', 'precomptes', 'feuilles', 'multicles', 'flous'],
+                   help="colonne: doublons d'une colonne (resultat_jan_2026.xlsx, col); "
+                        "adherents: doublons de MATRICULE; supprimer: retirer les vrais doublons d'ADHERENTS; "
+                        "precomptes: doublons complets/partiels de precomptes_mupol.xlsx; "
+                        "feuilles: classeur traité avec feuilles de doublons; "
+                        "multicles: doublons complets/partiels de precomptes_mupol.xlsx en un classeur (doublons_multicles); "
+                        "flous: noms d'agent proches comparés par blocs, feuille de revue (doublons_flous)")
+    p.add_argument('fichier', nargs='?', default=None, help='Fichier Excel (modes colonne, adherents, supprimer, multicles, flous)')
+    p.add_argument('colonne', nargs='?', default=None, help='Colonne à vérifier (modes colonne, adherents, supprimer, flous)')
+    p.add_argument('--top', type=int, default=20,
+                   help="Valeurs/lignes affichées au maximum à l'écran, détail complet dans le fichier exporté "
+                        "(modes colonne, adherents, precomptes; 0 = tout afficher)")
+    p.add_argument('--seuil', type=float, default=None, help='Similarité minimale des noms, entre 0 et 1 (mode flous)')
+    p.set_defaults(func=cmd_doublons)
+
+    p = sub.add_parser('totaux', help='Comparer lignes et totaux avant/après suppression des doublons')
+    p.add_argument('original', nargs='?', default='precomptes_mupol.xlsx', help='Fichier original')
+    p.add_argument('traite', nargs='?', default=None,
+                   help='Fichier traité (défaut: le plus récent precomptes_mupol_traite_*.xlsx)')
+    p.add_argument('--feuille', default='SANS_DOUBLONS', help='Feuille du fichier traité')
+    p.set_defaults(func=cmd_totaux)
+
+    p = sub.add_parser('controle', help='Comparer deux classeurs par leurs feuilles CONTROLE, sans relire les données')
+    p.add_argument('fichier_a', help='Premier classeur (référence)')
+    p.add_argument('fichier_b', help='Second classeur')
+    p.add_argument('--feuille-a', default=None, dest='feuille_a',
+                   help='Feuille contrôlée à comparer dans A (nécessaire si CONTROLE en décrit plusieurs)')
+    p.add_argument('--feuille-b', default=None, dest='feuille_b', help='Feuille contrôlée à comparer dans B')
+    p.set_defaults(func=cmd_controle)
+
+    p = sub.add_parser('rapprochement', help='Ajouts, retraits et modifications de précomptes d\'un mois sur l\'autre')
+    p.add_argument('fichiers', nargs='+', help='Fichiers mensuels (xlsx ou dossier .cols), du plus ancien au plus récent')
+    p.add_argument('-o', '--output', default='rapprochement_mensuel.xlsx', help='Classeur de sortie')
+    p.add_argument('--feuille', default=0, help='Feuille à lire dans chaque classeur (défaut: la première)')
+    p.set_defaults(func=cmd_rapprochement)
+
+    p = sub.add_parser('graph', help='Tracer le graphique TT TYPE / SLR (graphique.py)')
+    p.add_argument('-o', '--output', default=None, help="Enregistrer l'image au lieu de l'afficher")
+    p.set_defaults(func=cmd_graph)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args, rest = parser.parse_known_args(argv)
+    if rest and not getattr(args, 'passthrough', False):
+        parser.error(f"arguments non reconnus: {' '.join(rest)}")
+    args.func(args, rest)
+
+
+if __name__ == '__main__':
+    main()
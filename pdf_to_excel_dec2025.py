@@ -1,13 +1,17 @@
 import os
 import sys
+import time
 import argparse
-import camelot
 import re
-import pdfplumber
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
-from openpyxl import load_workbook
-from openpyxl.utils import get_column_letter
-from openpyxl.styles import Font, Alignment
+import camelot_cache
+from stage_profiler import profile_stage
+
+# Camelot (which loads OpenCV, matplotlib and pdfminer), pdfplumber and openpyxl are
+# imported inside the functions that need them, so that --help and the unified CLI
+# (pdf_to_excel_cli.py) start without paying for them.
 
 # Path to Ghostscript (adjust if needed)
 GS_PATH = r"C:\Program Files\gs\gs10.06.0\bin"
@@ -15,91 +19,332 @@ if os.path.isdir(GS_PATH):
     os.environ['PATH'] += f";{GS_PATH}"
 
 
-def read_tables_with_fallback(pdf_path, pages="all"):
-    """Try Camelot with stream then lattice as fallback. Returns camelot.TableList."""
+# Heavy per-table attributes Camelot keeps for plotting/debugging; dropped before
+# sending tables back from worker processes (~1 MB per table otherwise).
+_HEAVY_TABLE_ATTRS = ('cells', 'parse', 'parse_details', '_image', '_segments', '_text', 'textlines', '_textedges')
+
+
+def _slim_table(table):
+    """Strip plotting/debug data from a camelot Table so it pickles cheaply."""
+    for attr in _HEAVY_TABLE_ATTRS:
+        if hasattr(table, attr):
+            setattr(table, attr, None)
+    return table
+
+
+def _chunk_pages(page_numbers, workers, chunk_size=None):
+    """Split page numbers into contiguous chunks (about 4 chunks per worker by default)."""
+    if not chunk_size:
+        chunk_size = max(1, -(-len(page_numbers) // (workers * 4)))
+    return [page_numbers[i:i + chunk_size] for i in range(0, len(page_numbers), chunk_size)]
+
+
+def _read_chunk(pdf_path, chunk, flavor, with_text=False):
+    """Worker: parse one chunk of pages. Returns (pid, n_pages, seconds, tables, text_by_page)."""
+    import camelot
+    import pdf_layout
+
+    start = time.perf_counter()
+    pages_spec = ','.join(str(p) for p in chunk)
+    if with_text:
+        tables, text_by_page = pdf_layout.read_pdf_with_text(pdf_path, pages=pages_spec, flavor=flavor)
+    else:
+        tables, text_by_page = camelot.read_pdf(pdf_path, pages=pages_spec, flavor=flavor), {}
+    elapsed = time.perf_counter() - start
+    return os.getpid(), len(chunk), elapsed, [_slim_table(t) for t in tables], text_by_page
+
+
+def print_worker_summary(stats, wall):
+    """Print per-worker throughput (pages, tables, busy time, pages/s) to size the pool."""
+    total_pages = sum(s['pages'] for s in stats.values())
+    print(f"📊 Débit par worker ({len(stats)} processus, {total_pages} pages en {wall:.1f}s, "
+          f"{total_pages / wall if wall else 0:.2f} pages/s au total):")
+    for i, (pid, s) in enumerate(sorted(stats.items()), start=1):
+        rate = s['pages'] / s['busy'] if s['busy'] else 0
+        print(f"   - worker {i} (pid {pid}): {s['chunks']} lot(s), {s['pages']} pages, "
+              f"{s['tables']} table(s), {s['busy']:.1f}s actif, {rate:.2f} pages/s")
+
+
+def read_pdf_parallel(pdf_path, pages="all", flavor="stream", workers=2, chunk_size=None, text_sink=None):
+    """Parse page chunks in a process pool and merge them back in page order.
+
+    Tables are re-sorted with the same (page, order) key Camelot uses, so the result
+    matches a single ``camelot.read_pdf`` call on the same pages. If ``text_sink`` is a
+    dict it receives each page's text lines from the shared layout (see pdf_layout).
+    """
+    from camelot.core import TableList
+    from camelot.handlers import PDFHandler
+
+    page_numbers = PDFHandler(pdf_path, pages=pages).pages
+    chunks = _chunk_pages(page_numbers, workers, chunk_size)
+    print(f"⚙️ {len(page_numbers)} page(s) réparties en {len(chunks)} lot(s) sur {workers} worker(s) ({flavor})...")
+
+    all_tables = []
+    stats = {}
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_read_chunk, pdf_path, chunk, flavor, text_sink is not None) for chunk in chunks]
+        for future in futures:
+            pid, n_pages, elapsed, tables, text_by_page = future.result()
+            if text_sink is not None:
+                text_sink.update(text_by_page)
+            s = stats.setdefault(pid, {'chunks': 0, 'pages': 0, 'tables': 0, 'busy': 0.0})
+            s['chunks'] += 1
+            s['pages'] += n_pages
+            s['tables'] += len(tables)
+            s['busy'] += elapsed
+            all_tables.extend(tables)
+    print_worker_summary(stats, time.perf_counter() - start)
+
+    return TableList(sorted(all_tables))
+
+
+def _read_pdf(pdf_path, pages, flavor, workers=1, chunk_size=None, cache_dir=None, text_sink=None):
+    import camelot
+    import pdf_layout
+    from camelot.core import TableList
+    from camelot.handlers import PDFHandler
+
+    def read(pages_spec):
+        if workers and workers > 1:
+            return read_pdf_parallel(pdf_path, pages=pages_spec, flavor=flavor, workers=workers,
+                                     chunk_size=chunk_size, text_sink=text_sink)
+        if text_sink is not None:
+            tables, text_by_page = pdf_layout.read_pdf_with_text(pdf_path, pages=pages_spec, flavor=flavor)
+            text_sink.update(text_by_page)
+            return tables
+        return camelot.read_pdf(pdf_path, pages=pages_spec, flavor=flavor)
+
+    if not cache_dir:
+        return read(pages)
+    page_numbers = PDFHandler(pdf_path, pages=pages).pages
+    tables, hits = camelot_cache.cached_read_pdf(pdf_path, page_numbers, flavor, read, cache_dir=cache_dir,
+                                                 text_sink=text_sink)
+    print(f"🗄️ Cache Camelot ({flavor}): {hits}/{len(page_numbers)} page(s) servie(s) depuis {cache_dir}")
+    return TableList(tables)
+
+
+def _table_rows(tables):
+    return sum(t.df.shape[0] for t in tables) if tables else 0
+
+
+def read_tables_with_fallback(pdf_path, pages="all", workers=1, chunk_size=None, cache_dir=None, text_sink=None,
+                              profiler=None, errors=None):
+    """Try Camelot with stream then lattice as fallback. Returns camelot.TableList.
+
+    With ``workers > 1`` each flavor is parsed page-parallel (see read_pdf_parallel).
+    With ``cache_dir`` pages already parsed for this PDF content are read from the
+    on-disk cache (see camelot_cache) instead of Camelot.
+    With ``text_sink`` (a dict) page text lines are collected from the same layout
+    analysis as the tables (see pdf_layout), for the --include-text check.
+    With ``profiler`` (stage_profiler.StageProfiler) each flavor is timed as a stage.
+    With ``errors`` (a list), extraction errors are appended to it, so that a failed
+    extraction can be told from a PDF without tables (both return None).
+    """
     print("🔍 Tentative de lecture avec Camelot (stream)...")
     try:
-        tables = camelot.read_pdf(pdf_path, pages=pages, flavor="stream")
+        with profile_stage(profiler, 'camelot stream') as record:
+            tables = _read_pdf(pdf_path, pages, "stream", workers, chunk_size, cache_dir, text_sink)
+            record['rows'] = _table_rows(tables)
         if tables.n > 0:
             print(f"✅ {tables.n} table(s) détectée(s) avec 'stream'.")
             return tables
     except Exception as e:
         print(f"⚠️ Erreur stream: {e}")
+        if errors is not None:
+            errors.append(f"stream: {e}")
 
     print("🔁 Fallback vers 'lattice'...")
     try:
-        tables = camelot.read_pdf(pdf_path, pages=pages, flavor="lattice")
+        with profile_stage(profiler, 'camelot lattice') as record:
+            tables = _read_pdf(pdf_path, pages, "lattice", workers, chunk_size, cache_dir, text_sink)
+            record['rows'] = _table_rows(tables)
         if tables.n > 0:
             print(f"✅ {tables.n} table(s) détectée(s) avec 'lattice'.")
             return tables
     except Exception as e:
         print(f"⚠️ Erreur lattice: {e}")
+        if errors is not None:
+            errors.append(f"lattice: {e}")
 
     return None
 
 
-def sanitize_and_merge_tables(tables):
-    """Convert a camelot TableList into a single cleaned DataFrame.
+def _page_quality(page_tables):
+    """Score a page's tables from Camelot's parsing_report: (mean accuracy, -mean whitespace)."""
+    if not page_tables:
+        return None
+    reports = [t.parsing_report for t in page_tables]
+    accuracy = sum(r['accuracy'] for r in reports) / len(reports)
+    whitespace = sum(r['whitespace'] for r in reports) / len(reports)
+    return accuracy, -whitespace
 
-    Handles non-unique column names by appending suffixes, removes fully-empty columns,
-    and drops repeated header rows if detected.
+
+def _group_by_page(tables):
+    by_page = {}
+    for t in tables or []:
+        by_page.setdefault(int(t.page), []).append(t)
+    return by_page
+
+
+def read_tables_adaptive(pdf_path, pages="all", fallback_flavor="lattice", min_accuracy=90.0,
+                         max_whitespace=60.0, workers=1, chunk_size=None, cache_dir=None, text_sink=None,
+                         profiler=None, errors=None):
+    """Per-page flavor selection: one stream pass, then re-parse only the weak pages.
+
+    A page is weak when stream found no table on it, or when its mean parsing_report
+    accuracy is below ``min_accuracy`` or its whitespace above ``max_whitespace``.
+    Weak pages are re-read with ``fallback_flavor`` (lattice, network or hybrid) and
+    the better-scoring result is kept. Returns a camelot.TableList or None; extraction
+    errors are appended to ``errors`` (a list) when given.
     """
-    dfs = []
-    for i, table in enumerate(tables):
-        df = table.df.copy()
-        # drop fully empty columns
-        df = df.dropna(axis=1, how='all')
-        if df.shape[0] == 0:
+    from camelot.core import TableList
+    from camelot.handlers import PDFHandler
+
+    page_numbers = PDFHandler(pdf_path, pages=pages).pages
+    print(f"🔍 Lecture adaptative page par page (stream puis '{fallback_flavor}' sur les pages faibles)...")
+    try:
+        with profile_stage(profiler, 'camelot stream') as record:
+            stream_tables = _read_pdf(pdf_path, pages, "stream", workers, chunk_size, cache_dir, text_sink)
+            record['rows'] = _table_rows(stream_tables)
+        stream_pages = _group_by_page(stream_tables)
+    except Exception as e:
+        print(f"⚠️ Erreur stream: {e}")
+        if errors is not None:
+            errors.append(f"stream: {e}")
+        stream_pages = {}
+
+    weak = []
+    for p in page_numbers:
+        quality = _page_quality(stream_pages.get(p))
+        if quality is None or quality[0] < min_accuracy or -quality[1] > max_whitespace:
+            weak.append(p)
+
+    fallback_pages = {}
+    if weak:
+        print(f"🔁 {len(weak)}/{len(page_numbers)} page(s) faible(s) relue(s) avec '{fallback_flavor}'...")
+        try:
+            with profile_stage(profiler, f'camelot {fallback_flavor}') as record:
+                fallback_tables = _read_pdf(pdf_path, ','.join(str(p) for p in weak), fallback_flavor, workers,
+                                            chunk_size, cache_dir)
+                record['rows'] = _table_rows(fallback_tables)
+            fallback_pages = _group_by_page(fallback_tables)
+        except Exception as e:
+            print(f"⚠️ Erreur {fallback_flavor}: {e}")
+            if errors is not None:
+                errors.append(f"{fallback_flavor}: {e}")
+
+    selected = []
+    for p in page_numbers:
+        stream_q = _page_quality(stream_pages.get(p))
+        fallback_q = _page_quality(fallback_pages.get(p))
+        stream_txt = f"acc={stream_q[0]:.1f} ws={-stream_q[1]:.1f}" if stream_q else "aucune table en stream"
+        if p not in weak:
+            choice = 'stream'
+            print(f"   page {p}: stream ({stream_txt})")
+        elif fallback_q is not None and (stream_q is None or fallback_q > stream_q):
+            choice = fallback_flavor
+            print(f"   page {p}: {fallback_flavor} (stream {stream_txt} → "
+                  f"acc={fallback_q[0]:.1f} ws={-fallback_q[1]:.1f})")
+        elif stream_q is not None:
+            choice = 'stream'
+            print(f"   page {p}: stream conservé ({stream_txt}, {fallback_flavor} pas meilleur)")
+        else:
+            print(f"   page {p}: aucune table")
             continue
+        selected.extend(stream_pages.get(p, []) if choice == 'stream' else fallback_pages[p])
 
-        # Detect header row candidates: often first row, but try to find a row with non-numeric vals
-        header = df.iloc[0].astype(str).str.strip()
-        # Make columns unique if not
-        cols = list(header)
-        if len(set(cols)) != len(cols):
-            # append suffix to duplicates
-            seen = {}
-            new_cols = []
-            for c in cols:
-                key = c if c != '' else 'col'
-                seen[key] = seen.get(key, 0) + 1
-                if seen[key] > 1:
-                    new_cols.append(f"{key}_{seen[key]}")
-                else:
-                    new_cols.append(key)
-            cols = new_cols
-
-        df.columns = cols
-        # remove the header row from data
-        df = df[1:].reset_index(drop=True)
-
-        dfs.append(df)
+    if not selected:
+        return None
+    print(f"✅ {len(selected)} table(s) retenue(s) après sélection par page.")
+    return TableList(sorted(selected))
 
-    if not dfs:
-        return pd.DataFrame()
 
-    # concatenate, align columns
-    combined = pd.concat(dfs, ignore_index=True, sort=False)
+def sanitize_table_df(table_df):
+    """Clean one table's DataFrame: drop empty columns, first row as (unique) header.
+
+    Returns None for a table without rows.
+    """
+    df = table_df.copy()
+    # drop fully empty columns
+    df = df.dropna(axis=1, how='all')
+    if df.shape[0] == 0:
+        return None
+
+    # Detect header row candidates: often first row, but try to find a row with non-numeric vals
+    header = df.iloc[0].astype(str).str.strip()
+    # Make columns unique if not
+    cols = list(header)
+    if len(set(cols)) != len(cols):
+        # append suffix to duplicates
+        seen = {}
+        new_cols = []
+        for c in cols:
+            key = c if c != '' else 'col'
+            seen[key] = seen.get(key, 0) + 1
+            if seen[key] > 1:
+                new_cols.append(f"{key}_{seen[key]}")
+            else:
+                new_cols.append(key)
+        cols = new_cols
 
+    df.columns = cols
+    # remove the header row from data
+    return df[1:].reset_index(drop=True)
+
+
+def finalize_column_names(columns):
+    """Final names of the merged frame: stripped, empty names -> Column_i, duplicates suffixed."""
     # Reset columns: strip whitespace and fill empty names
-    combined.columns = [str(c).strip() if str(c).strip() != '' else f'Column_{i}'
-                        for i, c in enumerate(combined.columns, start=1)]
+    names = [str(c).strip() if str(c).strip() != '' else f'Column_{i}'
+             for i, c in enumerate(columns, start=1)]
 
     # If duplicate column names remain, make them unique by adding suffix
-    if combined.columns.duplicated().any():
+    if len(set(names)) != len(names):
         cols = []
         seen = {}
-        for c in combined.columns:
+        for c in names:
             seen[c] = seen.get(c, 0) + 1
             if seen[c] > 1:
                 cols.append(f"{c}_{seen[c]}")
             else:
                 cols.append(c)
-        combined.columns = cols
+        names = cols
+    return names
+
+
+def sanitize_and_merge_tables(tables, with_sections=False):
+    """Convert a camelot TableList into a single cleaned DataFrame.
 
+    Handles non-unique column names by appending suffixes, removes fully-empty columns,
+    and drops repeated header rows if detected. With ``with_sections``, returns
+    (DataFrame, section label of each row): see table_sections.
+    """
+    dfs = []
+    labels = []
+    section = None
+    for i, table in enumerate(tables):
+        df = sanitize_table_df(table.df)
+        if df is not None:
+            dfs.append(df)
+            if with_sections:
+                sections = table_sections(table.df, df, section)
+                section = sections[-1] if len(sections) else header_section(table.df) or section
+                labels.append(sections)
+
+    if not dfs:
+        return (pd.DataFrame(), np.empty(0, dtype=object)) if with_sections else pd.DataFrame()
+
+    # concatenate, align columns
+    combined = pd.concat(dfs, ignore_index=True, sort=False)
+    combined.columns = finalize_column_names(combined.columns)
+    if with_sections:
+        return combined, np.concatenate(labels)
     return combined
 
-def export_to_excel(df, excel_path):
+
+def writable_output_path(excel_path):
+    """Return excel_path, or a timestamped alternate name if an existing file cannot be removed."""
     # If file exists, try to remove it first so openpyxl can write; if not possible, fallback to alternate name
     target_path = excel_path
     if os.path.exists(target_path):
@@ -112,43 +357,156 @@ def export_to_excel(df, excel_path):
             ts = datetime.now().strftime('%Y%m%d_%H%M%S')
             target_path = f"{base}_new_{ts}{ext}"
             print(f"⚠️ Ne peut pas écraser '{excel_path}'. Sauvegarde vers '{target_path}' à la place.")
+    return target_path
 
-    # Write DataFrame to excel
-    try:
-        df.to_excel(target_path, index=False, engine='openpyxl')
-    except Exception as e:
-        print(f"⚠️ Erreur lors de l'écriture initiale Excel: {e}")
-        raise
 
-    # Apply workbook formatting
-    try:
-        wb = load_workbook(target_path)
-        ws = wb.active
+def export_to_excel(df, excel_path, timings=None, extra_sheets=None):
+    """Write df to excel_path (or an alternate name); ``timings`` (a dict) receives format/write seconds.
 
-        # Adjust column widths
-        for col in ws.columns:
-            max_length = max(len(str(cell.value)) if cell.value else 0 for cell in col)
-            ws.column_dimensions[get_column_letter(col[0].column)].width = max_length + 2
+    ``extra_sheets`` (sheet name -> DataFrame) are written after the data sheet, e.g. CONTROLE.
+    """
+    from xlsx_writer import write_formatted_xlsx
 
-        # Bold and center header
-        for cell in ws[1]:
-            cell.font = Font(bold=True)
-            cell.alignment = Alignment(horizontal="center")
+    target_path = writable_output_path(excel_path)
 
-        wb.save(target_path)
+    # Write DataFrame with header styling and fitted column widths in a single streaming pass
+    try:
+        written = write_formatted_xlsx(target_path, {'Sheet1': df, **(extra_sheets or {})})
     except PermissionError:
         # If still cannot save (file opened), inform user and leave the file written (or written to alternate name above)
         print(f"⚠️ Permission refusée lors de la sauvegarde du fichier Excel: '{target_path}'. Fermez le fichier s'il est ouvert et relancez.")
         raise
     except Exception as e:
-        print(f"⚠️ Erreur lors de la mise en forme/sauvegarde Excel: {e}")
+        print(f"⚠️ Erreur lors de l'écriture Excel: {e}")
         raise
+    print(f"⏱️ Excel: mise en forme {written['format']:.2f}s, écriture {written['write']:.2f}s")
+    if timings is not None:
+        timings.update(written)
 
     # Return the actual saved path for caller use
     return target_path
 
 
-def remove_repeated_header_rows_and_blocks(df_in: pd.DataFrame) -> pd.DataFrame:
+# Patterns for each of the five header lines in order
+HEADER_BLOCK_PATTERNS = [
+    re.compile(r"^\s*\d+\s*-\s*Mutuelle\s+Police", re.IGNORECASE),
+    re.compile(r"\bRetenues\b", re.IGNORECASE),
+    re.compile(r"\bReste\s+a\s+recouvrer\b", re.IGNORECASE),
+    re.compile(r"\bAgent\b.*\bReferences\b.*\bMontant", re.IGNORECASE),
+    re.compile(r"\bAnterieures\b.*\bMois\b.*\bTotal\b", re.IGNORECASE),
+]
+# Single header-like lines, combined into one alternation (one regex pass per row)
+HEADER_SINGLE_PATTERN = re.compile(
+    r"^\s*\d+\s*-\s*Mutuelle\s+Police"
+    r"|\bRetenues\b"
+    r"|\bReste\s+a\s+recouvrer\b"
+    r"|\bAgent\b"
+    r"|\bAnterieures\b",
+    re.IGNORECASE)
+# Cell text that looks like a numeric amount/id (e.g. '8 160 000', '10000', '2085524')
+NUM_LIKE_RE = re.compile(r'^[\d\s,./-]+$')
+# First line of a header block: its number identifies the statement section ("12 - Mutuelle Police Nationale")
+SECTION_PATTERN = re.compile(r"^\s*(\d+)\s*-\s*Mutuelle\s+Police", re.IGNORECASE)
+
+
+def cell_tokens(df_in: pd.DataFrame, nan_as_text=True):
+    """Column-wise stripped cell text and per-row non-empty / numeric-like counts.
+
+    A cell is non-empty when it is not None and str(cell).strip() != ''. By default NaN
+    counts as the text 'nan', as in the original row loop; ``nan_as_text=False`` treats
+    NaN (e.g. cells of columns a table did not have) as empty. Returns (tokens per
+    column as object ndarrays, '' for empty cells; non-empty counts; numeric-like counts).
+    """
+    n = len(df_in)
+    tokens = []
+    non_empty_counts = np.zeros(n, dtype=np.int64)
+    numeric_counts = np.zeros(n, dtype=np.int64)
+    for i in range(df_in.shape[1]):
+        column = df_in.iloc[:, i]
+        values = column.to_numpy(dtype=object)
+        if not isinstance(column.dtype, np.dtype):
+            # category/string/Int64 columns (see frame_dtypes.compact_frame): missing cells as NaN
+            values[pd.isna(values)] = np.nan
+        col = pd.Series(values).astype(str).str.strip().to_numpy(dtype=object)
+        if nan_as_text:
+            col[values == None] = ''  # noqa: E711 - elementwise; NaN must stay 'nan'
+        else:
+            col[pd.isna(values)] = ''
+        present = col != ''
+        non_empty_counts += present
+        if present.any():
+            # \s already matches NBSP, so no '\xa0' -> ' ' replacement is needed
+            numeric_counts[present] += pd.Series(col[present]).str.match(NUM_LIKE_RE.pattern).to_numpy()
+        tokens.append(col)
+    return tokens, non_empty_counts, numeric_counts
+
+
+def join_tokens(tokens, rows):
+    """' '.join of the non-empty tokens of the selected rows (boolean mask), in column order."""
+    joined = np.full(int(rows.sum()), '', dtype=object)
+    for col in tokens:
+        tok = col[rows]
+        present = tok != ''
+        sep = np.where(joined[present] != '', ' ', '')
+        joined[present] = joined[present] + sep + tok[present]
+    return pd.Series(joined, dtype=object)
+
+
+def header_drop_mask(df_in: pd.DataFrame, nan_as_text=True):
+    """Boolean mask of the rows remove_repeated_header_rows_and_blocks drops (see there)."""
+    n = len(df_in)
+    tokens, non_empty_counts, numeric_counts = cell_tokens(df_in, nan_as_text=nan_as_text)
+    # Only rows with text, <= 6 non-empty cells and <= 2 numeric-like tokens can be headers
+    eligible = (non_empty_counts > 0) & (non_empty_counts <= 6) & (numeric_counts <= 2)
+    eligible_idx = np.flatnonzero(eligible)
+    joined = join_tokens(tokens, eligible)
+    drop = np.zeros(n, dtype=bool)
+
+    # 1) Detect consecutive blocks of length 5 matching HEADER_BLOCK_PATTERNS
+    k = len(HEADER_BLOCK_PATTERNS)
+    if n >= k:
+        starts = np.ones(n - k + 1, dtype=bool)
+        for j, pat in enumerate(HEADER_BLOCK_PATTERNS):
+            ok = np.zeros(n, dtype=bool)
+            ok[eligible_idx] = joined.str.contains(pat.pattern, flags=pat.flags, regex=True).to_numpy()
+            starts &= ok[j:n - k + 1 + j]
+        for j in range(k):
+            drop[j:n - k + 1 + j] |= starts
+
+    # 2) Remove remaining single header-like rows (<= 4 non-empty cells)
+    single = (non_empty_counts[eligible_idx] <= 4) & ~drop[eligible_idx]
+    if single.any():
+        drop[eligible_idx[single]] = joined[single].str.contains(
+            HEADER_SINGLE_PATTERN.pattern, flags=HEADER_SINGLE_PATTERN.flags, regex=True).to_numpy()
+    return drop
+
+
+def row_sections(df_in: pd.DataFrame, current=None):
+    """Section label of each row ('section N' from the last "N - Mutuelle Police" line seen, ``current``
+    before the first one), the header lines included. Only header-eligible rows are joined and matched;
+    NaN cells (columns a table did not have) count as empty, in memory and in streaming alike."""
+    tokens, non_empty_counts, numeric_counts = cell_tokens(df_in, nan_as_text=False)
+    eligible = (non_empty_counts > 0) & (non_empty_counts <= 6) & (numeric_counts <= 2)
+    numbers = join_tokens(tokens, eligible).str.extract(SECTION_PATTERN, expand=False)
+    labels = pd.Series(None, index=np.arange(len(df_in)), dtype=object)
+    labels[np.flatnonzero(eligible)] = ('section ' + numbers).to_numpy(dtype=object)
+    labels = labels.where(labels.notna(), None).ffill()
+    return labels.where(labels.notna(), current).to_numpy(dtype=object)
+
+
+def header_section(table_df):
+    """'section N' when a raw table's first row, which sanitize_table_df turns into column names,
+    is a "N - Mutuelle Police" line; None otherwise."""
+    return row_sections(table_df.iloc[:1])[0] if table_df.shape[0] else None
+
+
+def table_sections(table_df, clean_df, current=None):
+    """Section label of each row of ``clean_df`` = sanitize_table_df(``table_df``): from the raw
+    header row (lost as column names), then from the section lines among the rows."""
+    return row_sections(clean_df, current=header_section(table_df) or current)
+
+
+def remove_repeated_header_rows_and_blocks(df_in: pd.DataFrame, keep_index=False) -> pd.DataFrame:
     """Remove single header-like rows and consecutive header blocks (5 lines).
 
     Strategy:
@@ -156,84 +514,89 @@ def remove_repeated_header_rows_and_blocks(df_in: pd.DataFrame) -> pd.DataFrame:
     2) Then remove any remaining single-row header-like lines using heuristics.
 
     Safety: only drop rows with few non-empty cells to avoid deleting real data.
+    Vectorized: cell stats are computed column by column, row text is only joined
+    for the few rows that can be headers, and block starts are found with shifted
+    boolean masks.
     """
-    # Patterns for each of the five header lines in order
-    block_patterns = [
-        re.compile(r"^\s*\d+\s*-\s*Mutuelle\s+Police", re.IGNORECASE),
-        re.compile(r"\bRetenues\b", re.IGNORECASE),
-        re.compile(r"\bReste\s+a\s+recouvrer\b", re.IGNORECASE),
-        re.compile(r"\bAgent\b.*\bReferences\b.*\bMontant", re.IGNORECASE),
-        re.compile(r"\bAnterieures\b.*\bMois\b.*\bTotal\b", re.IGNORECASE),
-    ]
-
-    n = len(df_in)
-    drop_indices = set()
-
-    # Precompute joined non-empty cell text and numeric-like token counts for each row
-    joined_rows = []
-    non_empty_counts = []
-    numeric_counts = []
-    num_like_re = re.compile(r'^[\d\s,./-]+$')
-    for idx, row in df_in.iterrows():
-        non_empty = [str(x).strip() for x in row.tolist() if x is not None and str(x).strip() != '']
-        non_empty_counts.append(len(non_empty))
-        joined = ' '.join(non_empty)
-        joined_rows.append(joined)
-        # count tokens that look like numeric amounts/ids (e.g. '8 160 000', '10000', '2085524')
-        n_num = 0
-        for tok in non_empty:
-            if num_like_re.match(tok.replace('\xa0', ' ')):
-                n_num += 1
-        numeric_counts.append(n_num)
-
-    # 1) Detect consecutive blocks of length 5 matching block_patterns
-    for i in range(0, n - len(block_patterns) + 1):
-        ok = True
-        for j, pat in enumerate(block_patterns):
-            text = joined_rows[i + j]
-            # require small number of non-empty cells to be safe (<=6)
-            if non_empty_counts[i + j] > 6 or not text:
-                ok = False
-                break
-            # also avoid marking as header if the row contains many numeric-like tokens (likely data)
-            if numeric_counts[i + j] > 2:
-                ok = False
-                break
-            if not pat.search(text):
-                ok = False
-                break
-        if ok:
-            # mark these indices for dropping
-            for j in range(len(block_patterns)):
-                drop_indices.add(i + j)
-
-    # 2) Remove remaining single header-like rows
-    single_patterns = [
-        re.compile(r"^\s*\d+\s*-\s*Mutuelle\s+Police", re.IGNORECASE),
-        re.compile(r"\bRetenues\b", re.IGNORECASE),
-        re.compile(r"\bReste\s+a\s+recouvrer\b", re.IGNORECASE),
-        re.compile(r"\bAgent\b", re.IGNORECASE),
-        re.compile(r"\bAnterieures\b", re.IGNORECASE),
-    ]
-
-    for idx, text in enumerate(joined_rows):
-        if idx in drop_indices:
-            continue
-        if not text:
-            continue
-        # keep rows that contain many numeric-like tokens (probably data)
-        if numeric_counts[idx] > 2:
+    drop = header_drop_mask(df_in)
+    # Build result keeping rows not dropped (``keep_index``: original row labels kept, to trace the rows)
+    kept = df_in[~drop]
+    return kept if keep_index else kept.reset_index(drop=True)
+
+
+def table_row_pages(tables):
+    """Page number of each row produced by sanitize_and_merge_tables(tables), in the same order."""
+    pages = []
+    for table in tables:
+        n_rows = table.df.shape[0]
+        if n_rows == 0:
             continue
-        if non_empty_counts[idx] <= 4 and any(p.search(text) for p in single_patterns):
-            drop_indices.add(idx)
+        pages.extend([int(table.page)] * (n_rows - 1))
+    return np.asarray(pages, dtype=np.int64)
 
-    # Build result keeping indices not in drop_indices
-    keep = [i for i in range(n) if i not in drop_indices]
-    return df_in.loc[keep].reset_index(drop=True)
+
+def row_signatures(df_in: pd.DataFrame) -> pd.Series:
+    """Normalized, number-masked text of each row: accents/case removed, digit runs -> '#',
+    words sorted so that the same line split over differently aligned columns matches."""
+    tokens, _non_empty, _numeric = cell_tokens(df_in, nan_as_text=False)
+    text = join_tokens(tokens, np.ones(len(df_in), dtype=bool))
+    return (text.str.normalize('NFKD').str.replace(r'[\u0300-\u036f]', '', regex=True).str.lower()
+            .str.replace(r'\d[\d\s.,/-]*\d|\d', '#', regex=True)
+            .str.split().map(lambda words: ' '.join(sorted(words))))
+
+
+def remove_boilerplate_rows_auto(df_in: pd.DataFrame, pages, min_page_share=0.5, max_per_page=2.0, keep_index=False):
+    """Drop page boilerplate learned from row-signature frequency, without layout-specific regexes.
+
+    One O(n) pass hashes each row's signature (see row_signatures). A signature is
+    boilerplate when it contains letters, appears on at least ``min_page_share`` of the
+    pages (and on 2 pages or more) and at most ``max_per_page`` times per page on
+    average, which keeps repetitive data rows. Returns (cleaned frame, report frame); with
+    ``keep_index`` the cleaned frame keeps the row labels of ``df_in``.
+    """
+    report_cols = ['signature', 'exemple', 'pages', 'occurrences']
+    pages = np.asarray(pages)
+    n_pages = len(np.unique(pages))
+    if df_in.empty or n_pages < 2:
+        return (df_in if keep_index else df_in.reset_index(drop=True)), pd.DataFrame(columns=report_cols)
+
+    signatures = row_signatures(df_in)
+    stats = pd.DataFrame({'sig': pd.util.hash_pandas_object(signatures, index=False).to_numpy(),
+                          'page': pages, 'row': np.arange(len(df_in))})
+    per_sig = stats.groupby('sig').agg(pages=('page', 'nunique'), occurrences=('row', 'size'), first=('row', 'min'))
+    has_letters = signatures.iloc[per_sig['first']].str.contains('[a-z]', regex=True).to_numpy()
+    learned = per_sig[has_letters
+                      & (per_sig['pages'] >= max(2, min_page_share * n_pages))
+                      & (per_sig['occurrences'] / per_sig['pages'] <= max_per_page)]
+
+    drop = stats['sig'].isin(learned.index).to_numpy()
+    report = pd.DataFrame({
+        'signature': signatures.iloc[learned['first']].to_numpy(),
+        'exemple': join_tokens(cell_tokens(df_in.iloc[learned['first']], nan_as_text=False)[0],
+                               np.ones(len(learned), dtype=bool)).to_numpy(),
+        'pages': learned['pages'].to_numpy(),
+        'occurrences': learned['occurrences'].to_numpy(),
+    }, columns=report_cols).sort_values('occurrences', ascending=False, ignore_index=True)
+    kept = df_in[~drop]
+    return (kept if keep_index else kept.reset_index(drop=True)), report
+
+
+def print_boilerplate_report(report, n_pages, limit=20):
+    if report.empty:
+        print("🧠 Mode auto: aucune ligne répétitive de page apprise.")
+        return
+    print(f"🧠 Mode auto: {len(report)} signature(s) apprise(s) comme en-têtes/pieds de page "
+          f"({int(report['occurrences'].sum())} ligne(s) supprimée(s), {n_pages} pages):")
+    for row in report.head(limit).itertuples(index=False):
+        print(f"   - [{row.pages} pages, {row.occurrences}x] {row.exemple!r}  ->  {row.signature!r}")
+    if len(report) > limit:
+        print(f"   ... {len(report) - limit} autre(s)")
 
 
 def extract_trailing_text(pdf_path, pages="all"):
     """Extract textual content from PDF (all pages or specified pages) and return as list of lines."""
+    import pdfplumber
+
     lines = []
     try:
         with pdfplumber.open(pdf_path) as pdf:
@@ -264,45 +627,129 @@ def extract_trailing_text(pdf_path, pages="all"):
     return lines
 
 
-def pdf_to_excel_robust(pdf_path, excel_path, pages="all", include_text=False):
+def _text_lines(pdf_path, pages, page_text):
+    """Text lines gathered during table extraction; reopen with pdfplumber only if none were."""
+    if page_text:
+        return [line for p in sorted(page_text) for line in page_text[p]]
+    return extract_trailing_text(pdf_path, pages=pages)
+
+
+def print_controle(totaux):
+    sommes = ', '.join(f"{col}={somme:,.0f}".replace(',', ' ') for col, somme in list(totaux.sommes.items())[:4])
+    print(f"🧮 Contrôle: {totaux.lignes} ligne(s), {len(totaux.sections)} section(s)"
+          + (f", sommes {sommes}" if sommes else '')
+          + (f", {totaux.matricules} matricule(s) ({totaux.colonne_matricule})" if totaux.colonne_matricule else ''))
+
+
+def pdf_to_excel_robust(pdf_path, excel_path, pages="all", include_text=False, workers=1, chunk_size=None,
+                        adaptive=False, fallback_flavor="lattice", min_accuracy=90.0, max_whitespace=60.0,
+                        cache_dir=None, header_mode="patterns", incremental=False, profiler=None,
+                        typed_numbers=False, compact_dtypes=False, columnar=False, controle=False,
+                        controle_matricule=None):
+    """Convert the tables of a PDF into one Excel sheet. Returns the saved path, or None on failure.
+
+    With ``controle``, control totals of the written rows (see controle_totaux) go to a CONTROLE
+    sheet, subtotalled per statement section.
+    """
     if not os.path.isfile(pdf_path):
         print(f"❌ Le fichier PDF spécifié n'existe pas: {pdf_path}")
         return
 
     print(f"📂 Lecture du fichier PDF : {pdf_path} ...")
-    tables = read_tables_with_fallback(pdf_path, pages=pages)
+    # With --include-text, page text comes from the same layout pass as the tables
+    page_text = {} if include_text else None
+
+    def read_tables(pages_spec, text_sink, errors=None):
+        if adaptive:
+            return read_tables_adaptive(pdf_path, pages=pages_spec, fallback_flavor=fallback_flavor,
+                                        min_accuracy=min_accuracy, max_whitespace=max_whitespace,
+                                        workers=workers, chunk_size=chunk_size, cache_dir=cache_dir,
+                                        text_sink=text_sink, profiler=profiler, errors=errors)
+        return read_tables_with_fallback(pdf_path, pages=pages_spec, workers=workers, chunk_size=chunk_size,
+                                         cache_dir=cache_dir, text_sink=text_sink, profiler=profiler, errors=errors)
+
+    if incremental:
+        # Only pages whose content fingerprint changed since the last run to excel_path are re-parsed
+        extraction_params = {'adaptive': adaptive, 'fallback_flavor': fallback_flavor,
+                             'min_accuracy': min_accuracy, 'max_whitespace': max_whitespace}
+        import incremental_pages
+        from camelot.core import TableList
+        from camelot.handlers import PDFHandler
+
+        page_numbers = PDFHandler(pdf_path, pages=pages).pages
+        found, reused, reparsed = incremental_pages.read_tables_incremental(
+            pdf_path, excel_path, page_numbers, read_tables, params=extraction_params, text_sink=page_text)
+        print(f"♻️ Incrémental: {reused} page(s) réutilisée(s), {reparsed} page(s) réanalysée(s) "
+              f"(dossier {incremental_pages.sidecar_dir(excel_path)})")
+        tables = TableList(found)
+    else:
+        tables = read_tables(pages, page_text)
     if not tables or tables.n == 0:
         print("❌ Aucun tableau trouvé dans le PDF après tentatives.")
         # But still optionally extract text
         if include_text:
-            lines = extract_trailing_text(pdf_path, pages=pages)
+            lines = _text_lines(pdf_path, pages, page_text)
             if lines:
                 df = pd.DataFrame({'Extra_Text': lines})
                 try:
                     saved = export_to_excel(df, excel_path)
                     print(f"✅ Export texte terminé : {saved}")
+                    return saved
                 except Exception as e:
                     print(f"⚠️ Erreur lors de l'export texte: {e}")
             else:
                 print("❌ Aucun texte extrait non plus.")
         return
 
-    df = sanitize_and_merge_tables(tables)
+    with profile_stage(profiler, 'sanitize_merge') as record:
+        # Section of each merged row, taken per table (raw header row included) before header lines are
+        # removed; rows keep their labels through the cleaning steps below
+        if controle:
+            df, sections = sanitize_and_merge_tables(tables, with_sections=True)
+            if df.empty:
+                sections = None
+        else:
+            df, sections = sanitize_and_merge_tables(tables), None
+        record['rows'] = len(df)
+    if compact_dtypes:
+        import frame_dtypes
+        with profile_stage(profiler, 'compact_dtypes') as record:
+            before = frame_dtypes.frame_memory_mb(df)
+            df, changes = frame_dtypes.compact_frame(df)
+            record['rows'] = len(df)
+        frame_dtypes.print_compaction(before, frame_dtypes.frame_memory_mb(df), changes)
+    # Learn page boilerplate from row-signature frequency (header_mode 'auto' or 'both')
+    if header_mode in ('auto', 'both'):
+        try:
+            with profile_stage(profiler, 'boilerplate_auto') as record:
+                pages_of_rows = table_row_pages(tables)
+                df, report = remove_boilerplate_rows_auto(df, pages_of_rows, keep_index=sections is not None)
+                record['rows'] = len(df)
+            print_boilerplate_report(report, len(np.unique(pages_of_rows)))
+        except Exception as e:
+            print(f"⚠️ Erreur lors de l'apprentissage des lignes répétitives: {e}")
     # Remove repeated header blocks/lines that may appear between tables
-    try:
-        df = remove_repeated_header_rows_and_blocks(df)
-    except Exception as e:
-        print(f"⚠️ Erreur lors du nettoyage des lignes d'en-tête: {e}")
+    if header_mode in ('patterns', 'both'):
+        try:
+            with profile_stage(profiler, 'header_removal') as record:
+                df = remove_repeated_header_rows_and_blocks(df, keep_index=sections is not None)
+                record['rows'] = len(df)
+        except Exception as e:
+            print(f"⚠️ Erreur lors du nettoyage des lignes d'en-tête: {e}")
+    if sections is not None:
+        sections = sections[df.index.to_numpy()]
+        df = df.reset_index(drop=True)
     if df.empty:
         print("❌ Aucun contenu tabulaire extrait après nettoyage.")
         # fallback to extracting text only
         if include_text:
-            lines = extract_trailing_text(pdf_path, pages=pages)
+            lines = _text_lines(pdf_path, pages, page_text)
             if lines:
                 df = pd.DataFrame({'Extra_Text': lines})
                 try:
                     saved = export_to_excel(df, excel_path)
                     print(f"✅ Export texte terminé : {saved}")
+                    return saved
                 except Exception as e:
                     print(f"⚠️ Erreur lors de l'export texte: {e}")
             else:
@@ -311,7 +758,9 @@ def pdf_to_excel_robust(pdf_path, excel_path, pages="all", include_text=False):
 
     # If requested, extract text lines and check for trailing lines not present in tables
     if include_text:
-        text_lines = extract_trailing_text(pdf_path, pages=pages)
+        with profile_stage(profiler, 'include_text') as record:
+            text_lines = _text_lines(pdf_path, pages, page_text)
+            record['rows'] = len(text_lines)
         if text_lines:
             # Heuristic: if last text line not present anywhere in df values, append as Extra_Text
             last_line = text_lines[-1]
@@ -322,24 +771,151 @@ def pdf_to_excel_robust(pdf_path, excel_path, pages="all", include_text=False):
                 new_row = {c: '' for c in df.columns}
                 new_row['Extra_Text'] = last_line
                 df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True, sort=False)
+                if sections is not None:
+                    sections = np.append(sections, None)
+
+    # Parse amount/number columns once so the workbook gets real numeric cells
+    type_report = None
+    if typed_numbers:
+        import frame_dtypes
+        try:
+            with profile_stage(profiler, 'typed_numbers') as record:
+                df, type_report = frame_dtypes.convert_numeric_columns(df)
+                record['rows'] = len(df)
+            frame_dtypes.print_type_report(type_report)
+        except Exception as e:
+            print(f"⚠️ Erreur lors du typage des colonnes numériques (colonnes laissées en texte): {e}")
+
+    extra_sheets = None
+    if controle:
+        from controle_totaux import FEUILLE_CONTROLE, ControleTotaux, feuille_controle
+        with profile_stage(profiler, 'controle') as record:
+            record['rows'] = len(df)
+            totaux = ControleTotaux(colonne_matricule=controle_matricule).ajouter(df, sections)
+            extra_sheets = {FEUILLE_CONTROLE: feuille_controle({'Sheet1': totaux})}
+        print_controle(totaux)
 
     try:
-        saved = export_to_excel(df, excel_path)
+        with profile_stage(profiler, 'excel') as record:
+            record['rows'] = len(df)
+            saved = export_to_excel(df, excel_path, timings=record.setdefault('detail', {}),
+                                    extra_sheets=extra_sheets)
         print(f"✅ Conversion terminée ! Résultat final : {saved}")
+        if type_report is not None:
+            report_path = os.path.splitext(saved)[0] + '_types.json'
+            frame_dtypes.save_type_report(type_report, report_path)
+            print(f"🔢 Rapport de typage: {report_path}")
     except Exception as e:
         print(f"⚠️ Erreur lors de l'export Excel : {e}")
+        return
+    if columnar:
+        # Same frame as the sheet, reloadable memory-mapped by columnar_bundle.load_bundle
+        import columnar_bundle
+        try:
+            with profile_stage(profiler, 'columnar') as record:
+                record['rows'] = len(df)
+                bundle = columnar_bundle.write_bundle(df, columnar_bundle.bundle_path_for(saved))
+            print(f"📦 Format colonnaire: {bundle}")
+        except Exception as e:
+            print(f"⚠️ Erreur lors de l'écriture du format colonnaire : {e}")
+    return saved
 
 
-def main():
-    parser = argparse.ArgumentParser(description='Convert PDF tables to a single Excel sheet (robust).')
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description='Convert PDF tables to a single Excel sheet (robust).')
     parser.add_argument('pdf', help='Chemin vers le fichier PDF à convertir')
     parser.add_argument('-o', '--output', help='Chemin du fichier Excel de sortie', default='resultat_dec_2025.xlsx')
     parser.add_argument('-p', '--pages', help='Pages à analyser (ex: 1-3,5 or all)', default='all')
     parser.add_argument('--include-text', action='store_true', dest='include_text',
                         help="Inclure le texte non-tabulaire (extrait et ajouté en colonne 'Extra_Text' si absent des tables)")
-
-    args = parser.parse_args()
-    pdf_to_excel_robust(args.pdf, args.output, pages=args.pages, include_text=args.include_text)
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                        help='Nombre de processus Camelot en parallèle (1 = lecture séquentielle)')
+    parser.add_argument('--chunk-size', type=int, default=None, dest='chunk_size',
+                        help='Pages par lot envoyé à un worker (défaut: ~4 lots par worker)')
+    parser.add_argument('--adaptive', action='store_true',
+                        help="Choix du mode Camelot page par page: stream partout, relecture des seules pages faibles")
+    parser.add_argument('--fallback-flavor', default='lattice', choices=['lattice', 'network', 'hybrid'],
+                        dest='fallback_flavor', help="Mode utilisé pour relire les pages faibles (avec --adaptive)")
+    parser.add_argument('--min-accuracy', type=float, default=90.0, dest='min_accuracy',
+                        help="Précision stream minimale (parsing_report) pour garder une page (avec --adaptive)")
+    parser.add_argument('--max-whitespace', type=float, default=60.0, dest='max_whitespace',
+                        help="Taux de cellules vides maximal (parsing_report) pour garder une page (avec --adaptive)")
+    parser.add_argument('--header-mode', default='patterns', choices=['patterns', 'auto', 'both'], dest='header_mode',
+                        help="Suppression des en-têtes répétés: motifs Mutuelle Police (patterns), "
+                             "apprentissage automatique des lignes répétées sur les pages (auto), ou les deux")
+    parser.add_argument('--cache-dir', default=camelot_cache.DEFAULT_CACHE_DIR, dest='cache_dir',
+                        help="Activer le cache des tables Camelot dans ce dossier (clé: contenu du PDF, page, flavor). "
+                             "Désactivé par défaut, sauf si la variable PDF_TO_EXCEL_CACHE est définie")
+    parser.add_argument('--no-cache', action='store_true', dest='no_cache',
+                        help="Désactiver le cache Camelot même si PDF_TO_EXCEL_CACHE est définie (toujours réanalyser le PDF)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Ne réanalyser que les pages modifiées depuis la conversion précédente vers la même "
+                             "sortie (tables par page gardées dans le dossier '<sortie>_pages')")
+    parser.add_argument('--typed-numbers', action='store_true', dest='typed_numbers',
+                        help="Convertir les colonnes de montants/nombres ('8 160 000') en cellules numériques "
+                             "(rapport des cellules non convertibles dans <sortie>_types.json)")
+    parser.add_argument('--compact-dtypes', action='store_true', dest='compact_dtypes',
+                        help="Réduire la mémoire du tableau fusionné (colonnes répétitives en catégories, "
+                             "entiers nullables), journalisée avant/après; contenu inchangé")
+    parser.add_argument('--columnar', action='store_true',
+                        help="Écrire aussi le tableau au format colonnaire '<sortie>.cols' (NumPy + dictionnaires), "
+                             "relu en mémoire mappée par columnar_bundle.load_bundle bien plus vite que l'Excel")
+    parser.add_argument('--controle', action='store_true',
+                        help="Ajouter une feuille CONTROLE: lignes, sommes par colonne, sous-totaux par section et "
+                             "somme de contrôle des matricules (comparables sans relire les données, controle_totaux)")
+    parser.add_argument('--controle-matricule', default=None, dest='controle_matricule', metavar='COLONNE',
+                        help="Colonne de la somme de contrôle des matricules (défaut: première colonne nommée "
+                             "MATRICULE ou REFERENCE)")
+    parser.add_argument('--profile', nargs='?', const='', default=None, metavar='JSON',
+                        help="Profil par étape (temps réel/CPU, lignes, mémoire): tableau affiché et rapport JSON "
+                             "(défaut: <sortie>.profile.json)")
+    parser.add_argument('--profile-cprofile', action='store_true', dest='profile_cprofile',
+                        help="Avec --profile: passer les étapes sous cProfile et enregistrer celle de l'étape la "
+                             "plus lente (<rapport>.prof)")
+    parser.add_argument('--stream', action='store_true',
+                        help="Conversion en flux, page par page, mémoire bornée (voir pdf_to_excel_streaming)")
+    parser.add_argument('--queue-size', type=int, default=4, dest='queue_size',
+                        help="Pages extraites en attente au maximum entre extraction et écriture (avec --stream)")
+
+    args = parser.parse_args(argv)
+    if args.stream:
+        ignored = [opt for opt, used in (('--workers', args.workers > 1), ('--adaptive', args.adaptive),
+                                         ('--header-mode', args.header_mode != 'patterns'),
+                                         ('--profile', args.profile is not None),
+                                         ('--columnar', args.columnar)) if used]
+        if ignored:
+            print(f"⚠️ Options ignorées en mode flux: {', '.join(ignored)}")
+        from pdf_to_excel_streaming import pdf_to_excel_streaming
+        pdf_to_excel_streaming(args.pdf, args.output, pages=args.pages, include_text=args.include_text,
+                               queue_size=args.queue_size, controle=args.controle,
+                               controle_matricule=args.controle_matricule)
+        return
+    profiler = None
+    if args.profile is not None:
+        from stage_profiler import StageProfiler
+        profiler = StageProfiler(cprofile=args.profile_cprofile)
+    pdf_to_excel_robust(args.pdf, args.output, pages=args.pages, include_text=args.include_text,
+                        workers=args.workers, chunk_size=args.chunk_size, adaptive=args.adaptive,
+                        fallback_flavor=args.fallback_flavor, min_accuracy=args.min_accuracy,
+                        max_whitespace=args.max_whitespace,
+                        cache_dir=None if args.no_cache else args.cache_dir, header_mode=args.header_mode,
+                        incremental=args.incremental, profiler=profiler, typed_numbers=args.typed_numbers,
+                        compact_dtypes=args.compact_dtypes, columnar=args.columnar, controle=args.controle,
+                        controle_matricule=args.controle_matricule)
+    if profiler is not None:
+        from stage_profiler import print_profile, save_profile
+        report_path = args.profile or os.path.splitext(args.output)[0] + '.profile.json'
+        options = {k: v for k, v in vars(args).items() if k not in ('pdf', 'output', 'profile', 'profile_cprofile')}
+        report = profiler.report(pdf=args.pdf, output=args.output, options=options)
+        if args.profile_cprofile:
+            prof_path = os.path.splitext(report_path)[0] + '.prof'
+            stage = profiler.dump_slowest(prof_path)
+            if stage:
+                report['cprofile'] = {'stage': stage, 'path': prof_path}
+        print_profile(report)
+        save_profile(report, report_path)
+        print(f"💾 Profil enregistré: {report_path}" + (f" (cProfile de '{report['cprofile']['stage']}': "
+                                                        f"{report['cprofile']['path']})" if 'cprofile' in report else ''))
 
 
 if __name__ == '__main__':
@@ -2,9 +2,7 @@
 import os
 import camelot
 import pandas as pd
-from openpyxl import load_workbook
-from openpyxl.utils import get_column_letter
-from openpyxl.styles import Font, Alignment
+from xlsx_writer import write_formatted_xlsx
 
 # 🔹 Chemin complet vers Ghostscript
 GS_PATH = r"C:\Program Files\gs\gs10.06.0\bin"
@@ -21,25 +19,11 @@ def pdf_to_excel(pdf_path, excel_path):
             print("❌ Aucun tableau trouvé dans le PDF.")
             return
 
-        # Exporter chaque tableau dans une feuille Excel
-        tables.export("temp.xlsx", f="excel")
-
-        # Amélioration de la mise en forme avec openpyxl
-        wb = load_workbook("temp.xlsx")
-        for sheet_name in wb.sheetnames:
-            ws = wb[sheet_name]
-            
-            # Ajuster la largeur des colonnes
-            for col in ws.columns:
-                max_length = max(len(str(cell.value)) if cell.value else 0 for cell in col)
-                ws.column_dimensions[get_column_letter(col[0].column)].width = max_length + 2
-            
-            # Mettre le header en gras et centré
-            for cell in ws[1]:
-                cell.font = Font(bold=True)
-                cell.alignment = Alignment(horizontal="center")
-
-        wb.save(excel_path)
+        # Exporter chaque tableau dans une feuille Excel (mêmes noms de feuilles que tables.export),
+        # en-tête en gras/centré et largeurs ajustées écrits en une seule passe
+        sheets = {f"page-{table.page}-table-{table.order}": table.df for table in tables}
+        timings = write_formatted_xlsx(excel_path, sheets, index=True)
+        print(f"⏱️ Excel: mise en forme {timings['format']:.2f}s, écriture {timings['write']:.2f}s")
         print(f"✅ Conversion terminée ! Résultat final : {excel_path}")
 
     except Exception as e:
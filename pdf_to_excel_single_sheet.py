@@ -2,9 +2,7 @@
 import os
 import camelot
 import pandas as pd
-from openpyxl import load_workbook
-from openpyxl.utils import get_column_letter
-from openpyxl.styles import Font, Alignment
+from xlsx_writer import write_formatted_xlsx
 
 # 🔹 Chemin complet vers Ghostscript
 GS_PATH = r"C:\Program Files\gs\gs10.06.0\bin"
@@ -33,24 +31,9 @@ def pdf_to_excel_single_sheet(pdf_path, excel_path):
 
         final_df = pd.concat(all_dfs, ignore_index=True)
 
-        # Exporter dans Excel
-        final_df.to_excel(excel_path, index=False, engine="openpyxl")
-
-        # Amélioration mise en forme avec openpyxl
-        wb = load_workbook(excel_path)
-        ws = wb.active
-
-        # Ajuster largeur des colonnes
-        for col in ws.columns:
-            max_length = max(len(str(cell.value)) if cell.value else 0 for cell in col)
-            ws.column_dimensions[get_column_letter(col[0].column)].width = max_length + 2
-
-        # Mettre le header en gras et centré
-        for cell in ws[1]:
-            cell.font = Font(bold=True)
-            cell.alignment = Alignment(horizontal="center")
-
-        wb.save(excel_path)
+        # Exporter dans Excel: en-tête en gras/centré et largeurs ajustées en une seule passe
+        timings = write_formatted_xlsx(excel_path, final_df)
+        print(f"⏱️ Excel: mise en forme {timings['format']:.2f}s, écriture {timings['write']:.2f}s")
         print(f"✅ Conversion terminée ! Résultat final : {excel_path}")
 
     except Exception as e:
@@ -0,0 +1,285 @@
+"""
+Conversion en flux (mémoire bornée) pour pdf_to_excel_dec2025.
+
+Le mode classique garde en mémoire toute la TableList Camelot, une copie par
+table, le DataFrame concaténé puis le DataFrame nettoyé avant d'écrire. Ici les
+pages traversent une chaîne de générateurs:
+
+    extraction (processus dédié) -> file bornée -> nettoyage de la table
+    -> suppression des en-têtes répétés -> spool disque -> écriture xlsx
+
+- L'extraction tourne dans un processus séparé qui analyse une page à la fois
+  (pdf_layout.iter_page_layouts) et pousse ses tables dans une multiprocessing.Queue
+  de taille bornée: l'analyse de la page N+1 se fait pendant que la page N est
+  nettoyée et écrite, et l'extraction se bloque si l'aval prend du retard.
+- Les en-têtes répétés sont détectés avec header_drop_mask sur une fenêtre
+  glissante: les 4 dernières lignes de chaque lot sont retenues pour qu'un bloc
+  d'en-tête de 5 lignes à cheval sur deux pages soit reconnu.
+- Les largeurs de colonnes Excel doivent être connues avant la première ligne
+  (openpyxl write_only): les lots nettoyés sont donc écrits dans un fichier
+  temporaire (pickle, un lot à la fois) pendant que les noms de colonnes et les
+  longueurs maximales sont accumulés, puis relus en flux vers le xlsx.
+
+Différences avec le mode classique: repli 'lattice' page par page (au lieu du
+document entier) quand 'stream' ne trouve aucune table, cellules NaN (colonnes
+absentes d'une table) traitées comme vides par le nettoyage des en-têtes, et
+seul --header-mode patterns est disponible (le mode auto a besoin de toutes les
+pages pour compter les lignes répétées).
+"""
+
+import multiprocessing as mp
+import os
+import pickle
+import queue
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import pdf_layout
+from pdf_to_excel_dec2025 import (HEADER_BLOCK_PATTERNS, _text_lines, export_to_excel, finalize_column_names,
+                                  header_drop_mask, header_section, print_controle, sanitize_table_df,
+                                  table_sections, writable_output_path)
+from xlsx_writer import display_lengths, write_formatted_xlsx_frames
+
+# Rows held back between batches so a header block split across pages is still seen whole
+HEADER_CARRY = len(HEADER_BLOCK_PATTERNS) - 1
+WIDTH_PADDING = 2
+
+
+def _extract_worker(pdf_path, pages, out_queue, with_text):
+    """Producer process: put ('page', page, [table dfs], last text line) per page, then ('done',)."""
+    try:
+        from camelot.handlers import PARSERS
+        stream = PARSERS['stream']()
+        lattice = PARSERS['lattice']()
+        for page_layout in pdf_layout.iter_page_layouts(pdf_path, pages):
+            tables = pdf_layout.extract_page_tables(page_layout, stream)
+            if not tables:
+                tables = pdf_layout.extract_page_tables(page_layout, lattice)
+            lines = pdf_layout.page_text_lines(page_layout) if with_text else []
+            out_queue.put(('page', page_layout.page, [t.df for t in sorted(tables)], lines[-1] if lines else None))
+        out_queue.put(('done',))
+    except Exception as e:
+        out_queue.put(('error', f"{type(e).__name__}: {e}"))
+
+
+def iter_extracted_pages(pdf_path, pages="all", queue_size=4, with_text=False, text_state=None):
+    """Yield (page, [table DataFrames]) from a background extraction process, in page order.
+
+    At most ``queue_size`` parsed pages wait in the queue. With ``with_text`` the last
+    non-empty text line seen so far is kept in ``text_state['last_line']``.
+    """
+    out_queue = mp.Queue(maxsize=max(1, queue_size))
+    proc = mp.Process(target=_extract_worker, args=(pdf_path, pages, out_queue, with_text), daemon=True)
+    proc.start()
+    try:
+        while True:
+            try:
+                msg = out_queue.get(timeout=1.0)
+            except queue.Empty:
+                if proc.is_alive():
+                    continue
+                try:
+                    msg = out_queue.get(timeout=1.0)
+                except queue.Empty:
+                    raise RuntimeError(f"le processus d'extraction s'est arrêté (code {proc.exitcode})")
+            if msg[0] == 'page':
+                _kind, page, dfs, last_line = msg
+                if text_state is not None and last_line is not None:
+                    text_state['last_line'] = last_line
+                yield page, dfs
+            elif msg[0] == 'done':
+                return
+            else:
+                raise RuntimeError(msg[1])
+    finally:
+        if proc.is_alive():
+            proc.terminate()
+        proc.join()
+
+
+def sanitize_pages(page_tables, columns, with_sections=False):
+    """Yield (table cleaned by sanitize_table_df, section label of each row or None); raw column names
+    are appended to ``columns`` in first-seen order. Sections are labelled as sanitize_and_merge_tables does."""
+    seen = set(columns)
+    section = None
+    for _page, dfs in page_tables:
+        for table_df in dfs:
+            df = sanitize_table_df(table_df)
+            if df is None:
+                continue
+            sections = None
+            if with_sections:
+                sections = table_sections(table_df, df, section)
+                section = sections[-1] if len(sections) else header_section(table_df) or section
+            if df.empty:
+                continue
+            for c in df.columns:
+                if c not in seen:
+                    seen.add(c)
+                    columns.append(c)
+            yield df, sections
+
+
+def strip_repeated_headers(frames, carry=HEADER_CARRY, controle=None):
+    """Streaming remove_repeated_header_rows_and_blocks over consecutive (frame, sections) pairs.
+
+    Each frame is checked together with the last ``carry`` rows of the previous one;
+    those rows are only emitted once the following frame (or the end) has been seen.
+    With ``controle`` (controle_totaux.ControleTotaux), the emitted rows are added to the
+    control totals with their section label (see sanitize_pages), as they go.
+    """
+    pending = None
+    pending_drop = np.zeros(0, dtype=bool)
+    pending_sections = np.empty(0, dtype=object)
+    for frame, frame_sections in frames:
+        buf = frame if pending is None else pd.concat([pending, frame], ignore_index=True, sort=False)
+        drop = header_drop_mask(buf, nan_as_text=False)
+        drop[:len(pending_drop)] |= pending_drop
+        cut = max(len(buf) - carry, 0)
+        kept = buf.iloc[:cut][~drop[:cut]]
+        if controle is not None:
+            sections = np.concatenate([pending_sections, frame_sections])
+            if len(kept):
+                controle.ajouter(kept, sections[:cut][~drop[:cut]])
+            pending_sections = sections[cut:]
+        if len(kept):
+            yield kept
+        pending = buf.iloc[cut:].reset_index(drop=True)
+        pending_drop = drop[cut:]
+    if pending is not None and len(pending):
+        kept = pending[~pending_drop]
+        if controle is not None and len(kept):
+            controle.ajouter(kept, pending_sections[~pending_drop])
+        if len(kept):
+            yield kept
+
+
+def spool_frames(frames, spool):
+    """Pickle frames one after another into the open file ``spool``.
+
+    Returns ({raw column: longest displayed cell}, number of rows spooled).
+    """
+    lengths = {}
+    n_rows = 0
+    for frame in frames:
+        for c in frame.columns:
+            longest = int(display_lengths(frame[c]).max())
+            lengths[c] = max(lengths.get(c, 0), longest)
+        pickle.dump(frame, spool, protocol=pickle.HIGHEST_PROTOCOL)
+        n_rows += len(frame)
+    return lengths, n_rows
+
+
+def iter_spool(spool):
+    spool.seek(0)
+    while True:
+        try:
+            yield pickle.load(spool)
+        except EOFError:
+            return
+
+
+def _line_in_spool(spool, line):
+    # Same check as the in-memory path: str.contains over every cell (pattern semantics included)
+    for frame in iter_spool(spool):
+        if frame.apply(lambda col: col.astype(str).str.contains(line, na=False)).any().any():
+            return True
+    return False
+
+
+def pdf_to_excel_streaming(pdf_path, excel_path, pages="all", include_text=False, queue_size=4, controle=False,
+                           controle_matricule=None):
+    """Convert a PDF to one Excel sheet with memory bounded by a few pages, whatever the page count.
+
+    With ``controle``, control totals accumulated while the rows stream go to a CONTROLE sheet.
+    Returns the saved path, or None on failure.
+    """
+    if not os.path.isfile(pdf_path):
+        print(f"❌ Le fichier PDF spécifié n'existe pas: {pdf_path}")
+        return
+
+    print(f"📂 Lecture en flux du fichier PDF : {pdf_path} (file de {queue_size} page(s)) ...")
+    start = time.perf_counter()
+    columns = []
+    text_state = {}
+    n_pages = 0
+    totaux = None
+    if controle:
+        from controle_totaux import FEUILLE_CONTROLE, ControleTotaux, feuille_controle
+        totaux = ControleTotaux(colonne_matricule=controle_matricule)
+
+    def counted(page_tables):
+        nonlocal n_pages
+        for item in page_tables:
+            n_pages += 1
+            yield item
+
+    with tempfile.TemporaryFile(suffix='.pkl') as spool:
+        pages_iter = counted(iter_extracted_pages(pdf_path, pages, queue_size, include_text, text_state))
+        try:
+            frames = sanitize_pages(pages_iter, columns, with_sections=totaux is not None)
+            lengths, n_rows = spool_frames(strip_repeated_headers(frames, controle=totaux), spool)
+        except Exception as e:
+            print(f"⚠️ Erreur lors de la conversion en flux: {e}")
+            return
+        t_extract = time.perf_counter() - start
+        print(f"✅ {n_pages} page(s) traitée(s), {n_rows} ligne(s) retenue(s) en {t_extract:.2f}s")
+
+        if n_rows == 0:
+            print("❌ Aucun contenu tabulaire extrait après nettoyage.")
+            if include_text:
+                lines = _text_lines(pdf_path, pages, None)
+                if lines:
+                    try:
+                        saved = export_to_excel(pd.DataFrame({'Extra_Text': lines}), excel_path)
+                        print(f"✅ Export texte terminé : {saved}")
+                        return saved
+                    except Exception as e:
+                        print(f"⚠️ Erreur lors de l'export texte: {e}")
+                else:
+                    print("❌ Aucun texte extrait non plus.")
+            return
+
+        header = finalize_column_names(columns)
+        widths = [max(lengths.get(raw, 0), len(name)) + WIDTH_PADDING for raw, name in zip(columns, header)]
+        frames = (frame.reindex(columns=columns) for frame in iter_spool(spool))
+
+        # If the PDF's last text line is not found in the tables, append it in an Extra_Text column
+        last_line = text_state.get('last_line')
+        if include_text and last_line and not _line_in_spool(spool, last_line):
+            header = header + ['Extra_Text']
+            widths.append(max(len(last_line), len('Extra_Text')) + WIDTH_PADDING)
+            extra_row = pd.DataFrame([[''] * len(columns) + [last_line]], columns=columns + ['Extra_Text'])
+            frames = _with_extra_text(frames, extra_row)
+            if totaux is not None:
+                totaux.ajouter(extra_row[['Extra_Text']], [None])
+
+        extra_sheets = None
+        if totaux is not None:
+            # Totals were accumulated under the raw table headers: report them under the sheet's names
+            totaux.renommer(dict(zip(columns, header)))
+            extra_sheets = {FEUILLE_CONTROLE: feuille_controle({'Sheet1': totaux})}
+            print_controle(totaux)
+
+        target_path = writable_output_path(excel_path)
+        start = time.perf_counter()
+        try:
+            write_formatted_xlsx_frames(target_path, header, frames, widths, extra_sheets=extra_sheets)
+        except PermissionError:
+            print(f"⚠️ Permission refusée lors de la sauvegarde du fichier Excel: '{target_path}'. Fermez le fichier s'il est ouvert et relancez.")
+            return
+        except Exception as e:
+            print(f"⚠️ Erreur lors de l'export Excel : {e}")
+            return
+        print(f"⏱️ Excel: écriture {time.perf_counter() - start:.2f}s")
+    print(f"✅ Conversion terminée ! Résultat final : {target_path}")
+    return target_path
+
+
+def _with_extra_text(frames, extra_row):
+    for frame in frames:
+        yield frame.assign(Extra_Text='')
+    yield extra_row
@@ -0,0 +1,198 @@
+"""
+Rapprochement d'un mois sur l'autre des précomptes (precomptes_mupol.xlsx).
+
+Pour deux fichiers mensuels ou plus, dans l'ordre chronologique, chaque mois est
+comparé au précédent:
+
+- jointure par hachage sur NO_MATRICULE: chaque matricule est haché (empreinte
+  64 bits vectorisée, voir doublons_multicles) et les deux mois sont joints sur
+  cette empreinte et le rang de la ligne parmi celles du même matricule (un
+  matricule présent deux fois est rapproché ligne à ligne, dans l'ordre);
+- empreinte de ligne complète (NO_MATRICULE, nom, MT_MENSUALITE,
+  NOMBRE_AYANTS_DROIT par défaut) pour repérer les lignes modifiées sans
+  comparer les colonnes une à une;
+- les nombres sont comparés en valeur (7500 et 7500.0 sont égaux), le texte
+  sans les espaces en début et fin.
+
+Le classeur de sortie contient RESUME (une ligne par passage d'un mois au
+suivant), AJOUTES, SUPPRIMES et MODIFIES (anciens et nouveaux montants, écart),
+avec la colonne PERIODE et les numéros de ligne (LIGNE_ORIGINE) dans chaque mois.
+Les lignes sans matricule sont comptées dans RESUME mais pas rapprochées.
+
+Un dossier de format colonnaire (.cols, option --columnar du convertisseur) peut
+remplacer un classeur: il se charge sans relire le xlsx.
+
+    python rapprochement_mensuel.py precomptes_dec.xlsx precomptes_jan.xlsx precomptes_fev.xlsx -o rapprochement.xlsx
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from doublons_multicles import COLONNES_TOUTES, COLONNE_LIGNE, MAX_LARGEUR, combiner_empreintes
+
+COLONNE_CLE = 'NO_MATRICULE'
+COLONNE_MONTANT = 'MT_MENSUALITE'
+
+
+def charger_mois(chemin, feuille=0):
+    """Monthly frame from a workbook (through the xlsx cache) or from a columnar bundle directory."""
+    if os.path.isdir(chemin):
+        from columnar_bundle import load_bundle
+
+        return load_bundle(chemin)
+    from xlsx_loader import read_excel_cached
+
+    return read_excel_cached(chemin, sheet_name=feuille)
+
+
+def _hacher(valeurs):
+    return pd.util.hash_array(np.asarray(valeurs), categorize=True)
+
+
+def empreinte_colonne(serie, numerique=False):
+    """
+    64-bit hash of each value, numbers hashed by value (7500, 7500.0 and '7500' with ``numerique``
+    are equal), text without surrounding spaces, every missing value alike.
+    """
+    if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+        return _hacher(serie.astype('float64').to_numpy())
+    serie = serie.astype(object)
+    genre = pd.api.types.infer_dtype(serie, skipna=True)
+    if genre in ('integer', 'floating', 'mixed-integer-float', 'decimal'):
+        return _hacher(pd.to_numeric(serie, errors='coerce').astype('float64').to_numpy())
+    manquant = _hacher(np.array([np.nan]))[0]
+    if genre in ('string', 'empty') and not numerique:
+        texte = serie.str.strip()
+        return np.where(texte.isna().to_numpy(), manquant, _hacher(texte.fillna('').to_numpy()))
+    # Numbers mixed with text (or text matricules): numeric-looking values compared as numbers
+    nombres = pd.to_numeric(serie, errors='coerce').astype('float64')
+    texte = serie.astype('string').str.strip().astype(object)
+    est_texte = (nombres.isna() & texte.notna()).to_numpy()
+    return np.where(est_texte, _hacher(texte.where(est_texte, '').to_numpy()), _hacher(nombres.to_numpy()))
+
+
+def empreintes_mois(df, colonnes):
+    """
+    Join keys and row fingerprints of one month: (matricule hash, rank within the matricule, row
+    fingerprint, row position), rows without a matricule left out.
+    """
+    empreintes = {col: empreinte_colonne(df[col], numerique=col == COLONNE_CLE) for col in colonnes}
+    avec_cle = df[COLONNE_CLE].notna().to_numpy()
+    table = pd.DataFrame({'cle': empreintes[COLONNE_CLE], 'empreinte': combiner_empreintes(empreintes, colonnes),
+                          'position': np.arange(len(df))})[avec_cle]
+    table['rang'] = table.groupby('cle', sort=False).cumcount()
+    return table
+
+
+def rapprocher_tables(table_ancien, table_nouveau):
+    """Vectorized hash join of two ``empreintes_mois`` tables: (added positions, removed positions, changed pairs)."""
+    jointure = table_ancien.merge(table_nouveau, on=['cle', 'rang'], how='outer', suffixes=('_ancien', '_nouveau'),
+                                  indicator=True, sort=False)
+    ajoutes = jointure.loc[jointure['_merge'] == 'right_only', 'position_nouveau'].astype(np.int64).to_numpy()
+    supprimes = jointure.loc[jointure['_merge'] == 'left_only', 'position_ancien'].astype(np.int64).to_numpy()
+    communs = jointure[jointure['_merge'] == 'both']
+    modifies = communs[communs['empreinte_ancien'] != communs['empreinte_nouveau']]
+    return (np.sort(ajoutes), np.sort(supprimes),
+            modifies[['position_ancien', 'position_nouveau']].astype(np.int64).sort_values('position_nouveau').to_numpy())
+
+
+def rapprocher(ancien, nouveau, colonnes):
+    """Hash join of two months on ``colonnes`` (NO_MATRICULE first): added, removed and changed rows."""
+    return rapprocher_tables(empreintes_mois(ancien, colonnes), empreintes_mois(nouveau, colonnes))
+
+
+def _lignes(df, positions, periode, colonnes):
+    out = df[colonnes].iloc[positions].reset_index(drop=True)
+    out.insert(0, COLONNE_LIGNE, positions + 2)
+    out.insert(0, 'PERIODE', periode)
+    return out
+
+
+def _modifications(ancien, nouveau, paires, periode, colonnes):
+    """Changed rows: matricule, then old and new value of each compared column, and the amount difference."""
+    pos_ancien, pos_nouveau = paires[:, 0], paires[:, 1]
+    out = pd.DataFrame({'PERIODE': periode, f'{COLONNE_LIGNE}_ANCIEN': pos_ancien + 2,
+                        f'{COLONNE_LIGNE}_NOUVEAU': pos_nouveau + 2,
+                        COLONNE_CLE: nouveau[COLONNE_CLE].to_numpy()[pos_nouveau]})
+    for col in colonnes:
+        if col == COLONNE_CLE:
+            continue
+        out[f'{col}_ANCIEN'] = ancien[col].to_numpy()[pos_ancien]
+        out[f'{col}_NOUVEAU'] = nouveau[col].to_numpy()[pos_nouveau]
+    if COLONNE_MONTANT in colonnes:
+        out['ECART_' + COLONNE_MONTANT] = (pd.to_numeric(out[f'{COLONNE_MONTANT}_NOUVEAU'], errors='coerce')
+                                           - pd.to_numeric(out[f'{COLONNE_MONTANT}_ANCIEN'], errors='coerce'))
+    return out
+
+
+def _somme(df, positions=None):
+    if COLONNE_MONTANT not in df.columns:
+        return None
+    montants = df[COLONNE_MONTANT] if positions is None else df[COLONNE_MONTANT].iloc[positions]
+    return float(pd.to_numeric(montants, errors='coerce').sum())
+
+
+def rapprochement_mensuel(fichiers, fichier_sortie='rapprochement_mensuel.xlsx', colonnes=None, feuille=0):
+    """Compare each monthly file with the previous one and write RESUME, AJOUTES, SUPPRIMES, MODIFIES."""
+    from xlsx_writer import write_formatted_xlsx
+
+    if len(fichiers) < 2:
+        raise ValueError("Au moins deux fichiers mensuels sont nécessaires")
+    noms = [os.path.splitext(os.path.basename(f.rstrip(os.sep)))[0] for f in fichiers]
+    resume, ajoutes, supprimes, modifies = [], [], [], []
+    precedent = None
+    for fichier, nom in zip(fichiers, noms):
+        print(f"Lecture du fichier {fichier}...")
+        mois = charger_mois(fichier, feuille)
+        if COLONNE_CLE not in mois.columns:
+            raise KeyError(f"Colonne {COLONNE_CLE} absente de {fichier}")
+        table = cols = None
+        if precedent is not None:
+            ancien, nom_ancien, table_ancien, cols_ancien = precedent
+            cols = list(colonnes or [c for c in COLONNES_TOUTES if c in ancien.columns and c in mois.columns])
+            if COLONNE_CLE not in cols:
+                cols.insert(0, COLONNE_CLE)
+            periode = f'{nom_ancien} -> {nom}'
+            # Each month is hashed once, then reused as the old side of the next comparison
+            if table_ancien is None or cols_ancien != cols:
+                table_ancien = empreintes_mois(ancien, cols)
+            table = empreintes_mois(mois, cols)
+            pos_ajoutes, pos_supprimes, paires = rapprocher_tables(table_ancien, table)
+            ajoutes.append(_lignes(mois, pos_ajoutes, periode, cols))
+            supprimes.append(_lignes(ancien, pos_supprimes, periode, cols))
+            modifies.append(_modifications(ancien, mois, paires, periode, cols))
+            resume.append({'PERIODE': periode, 'LIGNES_ANCIEN': len(ancien), 'LIGNES_NOUVEAU': len(mois),
+                           'SANS_MATRICULE_NOUVEAU': int(mois[COLONNE_CLE].isna().sum()),
+                           'AJOUTES': len(pos_ajoutes), 'SUPPRIMES': len(pos_supprimes), 'MODIFIES': len(paires),
+                           f'{COLONNE_MONTANT}_ANCIEN': _somme(ancien),
+                           f'{COLONNE_MONTANT}_NOUVEAU': _somme(mois),
+                           f'{COLONNE_MONTANT}_AJOUTES': _somme(mois, pos_ajoutes),
+                           f'{COLONNE_MONTANT}_SUPPRIMES': _somme(ancien, pos_supprimes)})
+            print(f"   {periode}: ➕ {len(pos_ajoutes)} ajouté(s), ➖ {len(pos_supprimes)} supprimé(s), "
+                  f"✏️ {len(paires)} modifié(s)")
+        precedent = (mois, nom, table, cols)
+    feuilles = {'RESUME': pd.DataFrame(resume), 'AJOUTES': pd.concat(ajoutes, ignore_index=True),
+                'SUPPRIMES': pd.concat(supprimes, ignore_index=True), 'MODIFIES': pd.concat(modifies, ignore_index=True)}
+    write_formatted_xlsx(fichier_sortie, feuilles, max_width=MAX_LARGEUR)
+    print(f"\n✅ Rapprochement de {len(fichiers)} mois enregistré dans {fichier_sortie}")
+    return fichier_sortie
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rapprochement mois par mois des précomptes: ajouts, retraits, modifications.")
+    parser.add_argument('fichiers', nargs='+', help='Fichiers mensuels (xlsx ou dossier .cols), du plus ancien au plus récent')
+    parser.add_argument('-o', '--output', default='rapprochement_mensuel.xlsx', help='Classeur de sortie')
+    parser.add_argument('--feuille', default=0, help='Feuille à lire dans chaque classeur (défaut: la première)')
+    parser.add_argument('--colonnes', nargs='+', default=None,
+                        help="Colonnes de l'empreinte de ligne (défaut: NO_MATRICULE, nom, MT_MENSUALITE, NOMBRE_AYANTS_DROIT)")
+    args = parser.parse_args()
+    if len(args.fichiers) < 2:
+        parser.error('au moins deux fichiers mensuels sont nécessaires')
+    rapprochement_mensuel(args.fichiers, args.output, args.colonnes, args.feuille)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""
+Profil par étape des conversions (--profile de pdf_to_excel_dec2025).
+
+Chaque étape (lecture Camelot stream, repli lattice, nettoyage/fusion, en-têtes
+répétés, écriture Excel...) est mesurée: temps réel, temps CPU du processus,
+nombre de lignes produites, RSS au début de l'étape et pic de RSS pendant
+l'étape. Le rapport est affiché sous forme de tableau et enregistré en JSON.
+
+Avec cprofile=True, chaque étape est aussi passée sous cProfile et seules les
+statistiques de l'étape la plus lente sont gardées (fichier .prof, lisible avec
+pstats ou snakeviz).
+
+Pic de RSS par étape: sous Linux le compteur du noyau (VmHWM) est remis à zéro
+au début de chaque étape (/proc/self/clear_refs); ailleurs c'est le pic du
+processus depuis son lancement (resource.getrusage), et rien sous Windows.
+La mémoire des processus workers (--workers > 1) n'est pas comptée.
+"""
+
+import cProfile
+import json
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+
+_PROC_STATUS = '/proc/self/status'
+
+
+def _proc_status_mb(field):
+    try:
+        with open(_PROC_STATUS) as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss():
+    """Reset the kernel's peak RSS counter (Linux only). Returns True when per-stage peaks are available."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def current_rss_mb():
+    return _proc_status_mb('VmRSS')
+
+
+def peak_rss_mb():
+    """Peak RSS in MB: since the last reset on Linux, since process start elsewhere, None on Windows."""
+    peak = _proc_status_mb('VmHWM')
+    if peak is not None:
+        return peak
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+class StageProfiler:
+    """Collects one record per stage; use ``with profiler.stage(name) as record:``.
+
+    The yielded record is a dict: callers may set record['rows'] (rows produced)
+    or add other figures (e.g. a timing breakdown).
+    """
+
+    def __init__(self, cprofile=False):
+        self.cprofile = cprofile
+        self.stages = []
+        self._slowest_profile = None
+        self._start_wall = time.perf_counter()
+        self._start_cpu = time.process_time()
+        self._peak = peak_rss_mb()
+
+    @contextmanager
+    def stage(self, name):
+        record = {'stage': name, 'rows': None}
+        profile = cProfile.Profile() if self.cprofile else None
+        record['rss_start_mb'] = current_rss_mb()
+        self._peak = max(filter(None, [self._peak, peak_rss_mb()]), default=None)
+        _reset_peak_rss()
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        if profile:
+            profile.enable()
+        try:
+            yield record
+        finally:
+            if profile:
+                profile.disable()
+            record['wall'] = round(time.perf_counter() - wall, 4)
+            record['cpu'] = round(time.process_time() - cpu, 4)
+            record['rss_peak_mb'] = peak_rss_mb()
+            self._peak = max(filter(None, [self._peak, record['rss_peak_mb']]), default=None)
+            self.stages.append(record)
+            if profile and (self._slowest_profile is None or record['wall'] > self._slowest_profile[0]['wall']):
+                self._slowest_profile = (record, profile)
+
+    def report(self, **context):
+        """JSON-serialisable report: context (pdf, options...), totals and per-stage records."""
+        return {**context,
+                'total_wall': round(time.perf_counter() - self._start_wall, 4),
+                'total_cpu': round(time.process_time() - self._start_cpu, 4),
+                'peak_rss_mb': max(filter(None, [self._peak, peak_rss_mb()]), default=None),
+                'stages': self.stages}
+
+    def dump_slowest(self, path):
+        """Write the cProfile stats of the slowest stage to ``path``; returns that stage's name (or None)."""
+        if self._slowest_profile is None:
+            return None
+        record, profile = self._slowest_profile
+        profile.dump_stats(path)
+        return record['stage']
+
+
+def profile_stage(profiler, name):
+    """profiler.stage(name), or a no-op context yielding a throwaway record when profiling is off."""
+    return profiler.stage(name) if profiler is not None else nullcontext({})
+
+
+def print_profile(report):
+    print("📊 Profil par étape:")
+    print(f"   {'étape':<22}{'réel (s)':>10}{'CPU (s)':>10}{'lignes':>9}{'RSS début (Mo)':>16}{'pic RSS (Mo)':>14}")
+    for r in report['stages']:
+        rows = '-' if r['rows'] is None else str(r['rows'])
+        start = '-' if r['rss_start_mb'] is None else f"{r['rss_start_mb']:.0f}"
+        peak = '-' if r['rss_peak_mb'] is None else f"{r['rss_peak_mb']:.0f}"
+        print(f"   {r['stage']:<22}{r['wall']:>10.2f}{r['cpu']:>10.2f}{rows:>9}{start:>16}{peak:>14}")
+    print(f"   {'total':<22}{report['total_wall']:>10.2f}{report['total_cpu']:>10.2f}")
+
+
+def save_profile(report, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
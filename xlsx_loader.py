@@ -0,0 +1,192 @@
+"""
+Chargement rapide, en lecture seule, des classeurs Excel des scripts de doublons
+et de totaux, avec cache binaire à côté du classeur.
+
+read_excel_cached(chemin, feuille, usecols, dtype) rend le même DataFrame que
+pd.read_excel (mêmes conversions de cellules, même inférence des types par le
+TextParser de pandas), mais:
+
+- lit la feuille en flux avec openpyxl (read_only, valeurs seules, sans créer
+  d'objet cellule) et ne garde que les colonnes demandées;
+- applique les types explicites demandés; 'numeric' convertit comme
+  pd.to_numeric(errors='coerce');
+- enregistre le résultat dans un cache pickle, dossier .xlsx_cache/ à côté du
+  classeur, une entrée par (classeur, feuille, colonnes, types). L'entrée est
+  valide tant que la taille et la date de modification du classeur sont
+  inchangées; sinon son sha256 est comparé à celui de l'entrée (classeur
+  recopié à l'identique, simple touch: entrée gardée, sinon relecture).
+
+Un script relancé sur le même classeur, ou un autre script lisant les mêmes
+colonnes, le charge alors presque instantanément.
+
+    python xlsx_loader.py precomptes_mupol.xlsx [--feuille NOM] [--colonnes A B] [--no-cache]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from camelot_cache import file_sha256
+
+CACHE_VERSION = 1
+CACHE_DIR_NAME = '.xlsx_cache'
+NUMERIC = 'numeric'
+
+
+def _convert_value(value, error_codes):
+    """Cell value as pandas' openpyxl reader converts it (integral floats -> int, errors -> NaN)."""
+    if value is None:
+        return ''
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else value
+    if isinstance(value, str) and value in error_codes:
+        return np.nan
+    return value
+
+
+def read_sheet_rows(path, sheet_name=0):
+    """Rows of a sheet as lists, trimmed like pandas (trailing empty cells and rows removed, rows padded)."""
+    from openpyxl import load_workbook
+    from openpyxl.cell.cell import ERROR_CODES
+
+    wb = load_workbook(path, read_only=True, data_only=True, keep_links=False)
+    try:
+        ws = wb.worksheets[sheet_name] if isinstance(sheet_name, int) else wb[sheet_name]
+        ws.reset_dimensions()
+        data = []
+        last_row_with_data = -1
+        for row in ws.iter_rows(values_only=True):
+            converted = [_convert_value(v, ERROR_CODES) for v in row]
+            while converted and converted[-1] == '':
+                converted.pop()
+            if converted:
+                last_row_with_data = len(data)
+            data.append(converted)
+    finally:
+        wb.close()
+    data = data[:last_row_with_data + 1]
+    if data:
+        width = max(len(r) for r in data)
+        data = [r + [''] * (width - len(r)) for r in data]
+    return data
+
+
+def _select_columns(rows, usecols):
+    if usecols is None or not rows:
+        return rows
+    header = rows[0]
+    missing = [c for c in usecols if c not in header]
+    if missing:
+        raise KeyError(f"Colonnes absentes du classeur: {', '.join(map(str, missing))}")
+    idx = [header.index(c) for c in usecols]
+    return [[r[i] for i in idx] for r in rows]
+
+
+def _apply_dtypes(df, dtype):
+    for col, kind in (dtype or {}).items():
+        if col not in df.columns:
+            continue
+        if kind == NUMERIC:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+        else:
+            df[col] = df[col].astype(kind)
+    return df
+
+
+def parse_sheet(path, sheet_name=0, usecols=None, dtype=None):
+    """Parse a sheet without cache: openpyxl streaming, then pandas' own type inference."""
+    from pandas.io.parsers import TextParser
+
+    rows = _select_columns(read_sheet_rows(path, sheet_name), usecols)
+    if not rows:
+        return pd.DataFrame(columns=list(usecols or []))
+    df = TextParser(rows, header=0).read()
+    return _apply_dtypes(df, dtype)
+
+
+def _cache_path(path, sheet_name, usecols, dtype, cache_dir):
+    request = json.dumps([os.path.abspath(path), sheet_name, usecols, {k: str(v) for k, v in (dtype or {}).items()},
+                          CACHE_VERSION], ensure_ascii=False)
+    key = hashlib.sha256(request.encode('utf-8')).hexdigest()[:16]
+    directory = cache_dir or os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR_NAME)
+    return os.path.join(directory, f'{os.path.basename(path)}.{key}.pkl')
+
+
+def _load_entry(cache_file):
+    try:
+        with open(cache_file, 'rb') as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        # Corrupt or unreadable entry (interrupted write from an old version, pandas upgrade): re-parse
+        return None
+
+
+def _save_entry(cache_file, entry):
+    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(cache_file), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, cache_file)
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def read_excel_cached(path, sheet_name=0, usecols=None, dtype=None, cache=True, cache_dir=None):
+    """Read a sheet like pd.read_excel, restricted to ``usecols`` (column names) and typed with ``dtype``.
+
+    ``dtype`` maps column names to a pandas dtype or to 'numeric' (pd.to_numeric with
+    errors='coerce'). With ``cache``, the parsed frame is kept in a pickle sidecar keyed by
+    the request and validated against the workbook's size/mtime, then its sha256.
+    """
+    usecols = list(usecols) if usecols is not None else None
+    if not cache:
+        return parse_sheet(path, sheet_name, usecols, dtype)
+    st = os.stat(path)
+    cache_file = _cache_path(path, sheet_name, usecols, dtype, cache_dir)
+    entry = _load_entry(cache_file)
+    if entry is not None and entry.get('version') == CACHE_VERSION:
+        if (entry['size'], entry['mtime_ns']) == (st.st_size, st.st_mtime_ns):
+            return entry['frame'].copy()
+        sha256 = file_sha256(path)
+        if entry['sha256'] == sha256:
+            # Same content under a new mtime (restored copy, touch): keep the entry, refresh its stamp
+            entry.update(size=st.st_size, mtime_ns=st.st_mtime_ns)
+            _save_entry(cache_file, entry)
+            return entry['frame'].copy()
+    df = parse_sheet(path, sheet_name, usecols, dtype)
+    try:
+        _save_entry(cache_file, {'version': CACHE_VERSION, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns,
+                                 'sha256': file_sha256(path), 'frame': df})
+    except OSError as e:
+        print(f"⚠️ Cache du classeur non enregistré ({cache_file}): {e}")
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Charger un classeur via le cache (et mesurer le temps de chargement).")
+    parser.add_argument('fichier', help='Classeur Excel')
+    parser.add_argument('--feuille', default=0, help='Nom de la feuille (défaut: la première)')
+    parser.add_argument('--colonnes', nargs='+', default=None, help='Colonnes à lire (défaut: toutes)')
+    parser.add_argument('--no-cache', action='store_true', dest='no_cache', help='Ignorer le cache')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    df = read_excel_cached(args.fichier, args.feuille, args.colonnes, cache=not args.no_cache)
+    print(f"📗 {args.fichier}: {len(df)} lignes, {len(df.columns)} colonnes "
+          f"en {time.perf_counter() - start:.3f}s")
+
+
+if __name__ == '__main__':
+    main()